@@ -0,0 +1,51 @@
+"""
+Time loading status changes in NumPy arrays and computing the analytics
+metrics over them, checking the totals against `epic_stats_many`.
+
+    python -m benchmarks.analytics [--events 1000000] [--epics 100]
+"""
+import argparse
+import sys
+
+from .utils import seed, setup_django, test_database, timed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--epics", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from django.utils import timezone
+    from epics.models import Epic
+    from tracking import analytics
+    from tracking.models import StatusChange
+
+    with test_database():
+        with timed(f"seeding {args.events} status changes"):
+            seed(args.events, epics=args.epics)
+        now = timezone.now()
+        with timed(f"loading {args.events} status changes"):
+            events = analytics.load_events()
+        with timed("story metrics"):
+            analytics.story_metrics(events, now=now)
+        with timed("throughput per week"):
+            analytics.throughput_per_week(events)
+        with timed("totals by epic"):
+            totals = analytics.totals_by_epic(events, now=now)
+        expected = StatusChange.epic_stats_many(
+            Epic.objects.filter(story__isnull=False).distinct(),
+            time=now,
+        )
+    differing = [
+        epic for epic, stats in expected.items() if totals.get(epic) != stats
+    ]
+    if differing:
+        print(f"analytics totals differ from epic_stats_many for {differing}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""
+Compare serializing and rendering a list of stories or epics with the DRF
+serializers and JSON renderer and with the compiled serializers and the
+orjson renderer.
+
+    python -m benchmarks.api_lists [--rows 10000]
+"""
+import argparse
+import sys
+
+from .utils import seed, setup_django, test_database, timed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000)
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+    from epics.compiled import compile_serializer
+    from epics.models import Epic, UserStory
+    from epics.optimizer import optimize
+    from epics.renderers import FastJSONRenderer
+    from epics.serializers import EpicSerializer, UserStorySerializer
+
+    context = {"request": Request(
+        APIRequestFactory().get("/", HTTP_HOST="localhost")
+    )}
+    differs = False
+    with test_database():
+        with timed(f"seeding {args.rows} stories"):
+            seed(
+                2 * args.rows,
+                epics=args.rows // 10,
+                events_per_story=2,
+            )
+        for serializer_class, queryset in (
+            (UserStorySerializer, UserStory.objects.order_by("-pub_date")),
+            (EpicSerializer, Epic.objects.order_by("-pub_date")),
+        ):
+            name = serializer_class.__name__
+            serializer = serializer_class(context=context)
+            with timed(f"{name}, {queryset.count()} rows"):
+                data = serializer_class(
+                    optimize(queryset, serializer),
+                    many=True,
+                    context=context,
+                ).data
+                expected = JSONRenderer().render(data)
+            with timed(f"compiled {name}"):
+                compiled = compile_serializer(serializer)
+                data = compiled.serialize(list(compiled.rows(queryset)))
+                rendered = FastJSONRenderer().render(data)
+            if rendered != expected:
+                print(f"compiled {name} output differs")
+                differs = True
+    return 1 if differs else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+"""
+Compare computing the stats of every epic with one `epic_stats` call per
+epic and with a single `epic_stats_many` call. The stats cache is turned
+off so both sides query the database.
+
+    python -m benchmarks.epic_stats [--events 200000] [--epics 100]
+"""
+import argparse
+import sys
+
+from .utils import seed, setup_django, test_database, timed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--epics", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from django.test import override_settings
+    from django.utils import timezone
+    from epics.models import Epic
+    from tracking.models import StatusChange
+
+    with test_database(), override_settings(EPICS_CACHE_ENABLED=False):
+        with timed(f"seeding {args.events} status changes"):
+            seed(args.events, epics=args.epics)
+        epics = list(Epic.objects.all())
+        now = timezone.now()
+        with timed(f"epic_stats for {len(epics)} epics"):
+            looped = {
+                epic.pk: StatusChange.epic_stats(epic, time=now)
+                for epic in epics
+            }
+        with timed(f"epic_stats_many for {len(epics)} epics"):
+            many = StatusChange.epic_stats_many(epics, time=now)
+    if looped != many:
+        print("epic_stats_many differs from epic_stats")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""
+Seed a large status history and check that the workflow and tracking hot
+queries are answered through an index rather than a full table scan.
+
+    python -m benchmarks.query_plans [--events 1000000]
+"""
+import argparse
+import sys
+from datetime import datetime, timezone
+
+from .utils import seed, setup_django, test_database, timed
+
+
+FULL_SCAN_MARKERS = {
+    "sqlite": ("SCAN {table}",),
+    "postgresql": ("Seq Scan on {table}",),
+    "mysql": ("type: ALL",),
+}
+
+
+def full_scan(plan, table, vendor):
+    for marker in FULL_SCAN_MARKERS.get(vendor, ()):
+        marker = marker.format(table=table)
+        for line in plan.splitlines():
+            if marker in line and "USING" not in line:
+                return True
+    return False
+
+
+def hot_queries():
+    from epics.models import Contributor, Epic, StoryStatus, UserStory
+    from tracking.models import StatusChange
+
+    contributor = Contributor.objects.first()
+    epic = Epic.objects.first()
+    story = UserStory.objects.first()
+    start = datetime(2020, 3, 1, tzinfo=timezone.utc)
+    end = datetime(2020, 4, 1, tzinfo=timezone.utc)
+    work = StatusChange.objects.filter(new_status=StoryStatus.IN_PROGRESS)
+    return [
+        (
+            "record_new_status last change",
+            "tracking_statuschange",
+            StatusChange.objects.filter(story=story).order_by("-time")[:1],
+        ),
+        (
+            "period_contributor_time",
+            "tracking_statuschange",
+            work.filter(contributor=contributor)
+            .filter(time__gte=start, time__lte=end),
+        ),
+        (
+            "story_contributor_time",
+            "tracking_statuschange",
+            work.filter(story=story, contributor=contributor),
+        ),
+        (
+            "epic_contributor_time",
+            "tracking_statuschange",
+            work.filter(story__epic=epic, contributor=contributor),
+        ),
+        (
+            "epic stories by status",
+            "epics_userstory",
+            UserStory.objects.filter(epic=epic, status=StoryStatus.CREATED),
+        ),
+        (
+            "stories_in_progress",
+            "epics_userstory",
+            contributor.stories_in_progress,
+        ),
+        (
+            "stories_suspended",
+            "epics_userstory",
+            contributor.stories_suspended,
+        ),
+        (
+            "epic stories by date",
+            "epics_userstory",
+            UserStory.objects.filter(epic=epic).order_by("-pub_date")[:50],
+        ),
+        (
+            "stories by status, newest first",
+            "epics_userstory",
+            UserStory.objects.filter(status=StoryStatus.SUSPENDED)
+            .order_by("-pub_date", "id")[:100],
+        ),
+        (
+            "stories of an assignee, newest first",
+            "epics_userstory",
+            UserStory.objects.filter(assigned_to=contributor)
+            .order_by("-pub_date", "id")[:100],
+        ),
+        (
+            "stories published in a period",
+            "epics_userstory",
+            UserStory.objects.filter(pub_date__gte=start, pub_date__lt=end)
+            .order_by("-pub_date", "id")[:100],
+        ),
+        (
+            "stories by title",
+            "epics_userstory",
+            UserStory.objects.order_by("title", "id")[:100],
+        ),
+        (
+            "epics of an owner, newest first",
+            "epics_epic",
+            Epic.objects.filter(owner=contributor)
+            .order_by("-pub_date", "id")[:100],
+        ),
+        (
+            "epics by title",
+            "epics_epic",
+            Epic.objects.order_by("title", "id")[:100],
+        ),
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from django.db import connection
+
+    failures = []
+    with test_database():
+        with timed(f"seeding {args.events} status changes"):
+            seed(args.events)
+        with connection.cursor() as cursor:
+            if connection.vendor == "sqlite":
+                cursor.execute("ANALYZE")
+        for name, table, queryset in hot_queries():
+            with timed(name):
+                list(queryset)
+            plan = queryset.explain()
+            print(f"  {plan.replace(chr(10), chr(10) + '  ')}")
+            if full_scan(plan, table, connection.vendor):
+                failures.append(name)
+    if failures:
+        print(f"full table scan for: {', '.join(failures)}")
+        return 1
+    print("every hot query uses an index")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+Helpers shared by the benchmarks.
+
+Benchmarks run against a throw-away test database (an in-memory one with
+the default sqlite settings) so they never touch the project data:
+
+    python -m benchmarks.query_plans --events 1000000
+"""
+import os
+import random
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+import django
+
+
+def setup_django():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "epics_project.settings")
+    django.setup()
+
+
+@contextmanager
+def test_database():
+    from django.db import connection
+
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+@contextmanager
+def timed(label):
+    start = time.perf_counter()
+    yield
+    print(f"{label}: {time.perf_counter() - start:.3f}s")
+
+
+FINAL_STATUSES = ["finished"] * 7 + ["canceled", "in progress", "suspended"]
+
+
+def story_statuses(events_per_story, final_status):
+    """
+    Created, then alternating between in progress and suspended, ending
+    with `final_status`.
+    """
+    middle = ["in progress", "suspended"] * events_per_story
+    return ["created"] + middle[:events_per_story - 2] + [final_status]
+
+
+def seed(events, contributors=200, epics=100, events_per_story=20, seed=0):
+    """
+    Fill the database with `events` status changes spread over stories of
+    `events_per_story` changes each, bypassing the workflow for speed.
+    """
+    from django.contrib.auth.models import User
+    from epics.models import Contributor, Epic, EpicCounters, UserStory
+    from tracking.models import StatusChange
+
+    rng = random.Random(seed)
+    User.objects.bulk_create(
+        User(username=f"user{i}") for i in range(contributors)
+    )
+    Contributor.objects.bulk_create(
+        Contributor(user=user) for user in User.objects.all()
+    )
+    contributor_ids = list(Contributor.objects.values_list("id", flat=True))
+    Epic.objects.bulk_create(
+        Epic(
+            title=f"epic {i}",
+            description="benchmark epic",
+            owner_id=rng.choice(contributor_ids),
+        )
+        for i in range(epics)
+    )
+    epic_ids = list(Epic.objects.values_list("id", flat=True))
+    stories = max(1, events // events_per_story)
+
+    def new_story(i):
+        status = rng.choice(FINAL_STATUSES)
+        return UserStory(
+            title=f"story {i}",
+            description="benchmark story",
+            epic_id=rng.choice(epic_ids),
+            status=status,
+            assigned_to_id=(
+                status in ("in progress", "suspended")
+                and rng.choice(contributor_ids)
+                or None
+            ),
+        )
+
+    UserStory.objects.bulk_create(
+        (new_story(i) for i in range(stories)),
+        batch_size=5000,
+    )
+    start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+    def changes():
+        for story_id, status in UserStory.objects.values_list("id", "status"):
+            statuses = story_statuses(events_per_story, status)
+            when = start + timedelta(minutes=rng.randrange(500000))
+            for i, status in enumerate(statuses):
+                duration = timedelta(minutes=rng.randrange(1, 3000))
+                yield StatusChange(
+                    story_id=story_id,
+                    time=when,
+                    new_status=status,
+                    contributor_id=rng.choice(contributor_ids),
+                    duration=duration if i < len(statuses) - 1 else None,
+                )
+                when += duration
+
+    StatusChange.objects.bulk_create(changes(), batch_size=5000)
+    for epic_id in epic_ids:
+        EpicCounters.rebuild(epic_id)
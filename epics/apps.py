@@ -4,3 +4,20 @@ from django.apps import AppConfig
 class EpicsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "epics"
+
+    def ready(self):
+        from django.contrib.auth.models import User
+        from django.db.models.signals import post_delete, post_save
+        from .models import Contributor, Epic, UserStory
+        from .handlers import (
+            contributor_changed,
+            data_removed,
+            discount_deleted_story,
+            user_changed,
+        )
+
+        post_delete.connect(discount_deleted_story, UserStory, weak=False)
+        post_save.connect(user_changed, User, weak=False)
+        post_save.connect(contributor_changed, Contributor, weak=False)
+        post_delete.connect(data_removed, Epic, weak=False)
+        post_delete.connect(data_removed, Contributor, weak=False)
@@ -0,0 +1,87 @@
+"""
+Cache of values computed from the stories of an epic.
+
+Entries are keyed by the epic's `EpicCounters.version`, which changes with
+every change of its stories: stale entries are never read again and just
+expire. Any cache backend works, the one used is the `EPICS_CACHE_ALIAS`
+cache and `EPICS_CACHE_ENABLED = False` turns caching off.
+"""
+from django.conf import settings
+from django.core.cache import caches
+
+
+class EpicCache:
+    """
+    Values named `name` of each epic. `hits` and `misses` count the
+    lookups of this process.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        return getattr(settings, "EPICS_CACHE_ENABLED", True)
+
+    @property
+    def cache(self):
+        return caches[getattr(settings, "EPICS_CACHE_ALIAS", "default")]
+
+    def key(self, epic_id, version):
+        return f"epics:{self.name}:{epic_id}:{version}"
+
+    def get_many(self, versions, compute):
+        """
+        Values of the epics of `versions`, a dict of versions keyed by epic
+        id, `compute(epic_ids)` returning the missing ones as a dict.
+        """
+        if not self.enabled:
+            return compute(list(versions))
+        keys = {
+            self.key(epic_id, version): epic_id
+            for epic_id, version in versions.items()
+        }
+        values = {
+            keys[key]: value
+            for key, value in self.cache.get_many(list(keys)).items()
+        }
+        missing = [epic_id for epic_id in versions if epic_id not in values]
+        self.hits += len(values)
+        self.misses += len(missing)
+        if missing:
+            computed = compute(missing)
+            self.cache.set_many(
+                {
+                    self.key(epic_id, versions[epic_id]): computed[epic_id]
+                    for epic_id in missing
+                },
+                getattr(settings, "EPICS_CACHE_TIMEOUT", 3600),
+            )
+            values.update(computed)
+        return values
+
+    def get(self, epic_id, version):
+        """
+        Value of `epic_id` at `version`, None when it is not cached.
+        """
+        if not self.enabled:
+            return None
+        value = self.cache.get(self.key(epic_id, version))
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, epic_id, version, value):
+        if self.enabled:
+            self.cache.set(
+                self.key(epic_id, version),
+                value,
+                getattr(settings, "EPICS_CACHE_TIMEOUT", 3600),
+            )
+
+    def reset_counters(self):
+        self.hits = self.misses = 0
@@ -0,0 +1,266 @@
+"""
+Compiled serialization of the API lists.
+
+`compile_serializer(serializer)` turns the fields of a model serializer
+into accessors over `values()` rows: model fields read their column,
+hyperlinks fill a URL template reversed once, nested serializers of
+forward relations read the columns of the join and properties are
+computed from the columns listed in the model's `property_columns`.
+Hyperlink lists of reverse relations are read with one more query for the
+whole page, capped like the prefetches of `epics.optimizer`.
+
+The rows give the same data as the serializer would from instances,
+without building the instances nor going through the fields one by one.
+Serializers using anything else are not compiled and the lists fall back
+to the serializer.
+"""
+from django.conf import settings
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from rest_framework import serializers
+from rest_framework.relations import (
+    HyperlinkedIdentityField,
+    HyperlinkedRelatedField,
+    ManyRelatedField,
+)
+from rest_framework.response import Response
+
+from .optimizer import model_field
+
+
+# Stands for the key in the URLs reversed once for all the rows.
+KEY_SENTINEL = 9876543210123
+
+
+class NotCompilable(Exception):
+    pass
+
+
+class CompiledSerializer:
+    """
+    Serializer of the `values(*columns)` rows of a queryset.
+    """
+
+    def __init__(self, columns, build, lists):
+        self.columns = columns
+        self.build = build
+        self.lists = lists
+
+    def rows(self, queryset, *columns):
+        """
+        `queryset` giving the rows to serialize, with `columns` as well.
+        """
+        return (
+            queryset
+            .prefetch_related(None)
+            .values(*dict.fromkeys(self.columns + list(columns)))
+        )
+
+    def serialize(self, rows):
+        related = {
+            name: related_list(rows) for name, related_list in self.lists
+        }
+        return [self.build(row, related) for row in rows]
+
+
+def compile_serializer(serializer):
+    """
+    `CompiledSerializer` equivalent to `serializer`, None when it uses
+    fields that cannot be read from rows.
+    """
+    try:
+        columns, build, lists = compile_fields(
+            serializer,
+            serializer.Meta.model,
+            top=True,
+        )
+    except NotCompilable:
+        return None
+    return CompiledSerializer(columns, build, lists)
+
+
+def compile_fields(serializer, model, prefix="", top=False):
+    columns = []
+    accessors = []
+    lists = []
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        if isinstance(field, ManyRelatedField):
+            if not top:
+                raise NotCompilable
+            accessor, key_column, related_list = compile_related_list(
+                field, model,
+            )
+            columns.append(key_column)
+            lists.append((field.field_name, related_list))
+        else:
+            field_columns, accessor = compile_field(field, model, prefix)
+            columns.extend(field_columns)
+        accessors.append((field.field_name, accessor))
+
+    def build(row, related):
+        return {name: accessor(row, related) for name, accessor in accessors}
+
+    return columns, build, lists
+
+
+def compile_field(field, model, prefix):
+    if isinstance(field, HyperlinkedIdentityField):
+        column = prefix + field.lookup_field
+        return [column], hyperlink(field, column)
+    if field.source == "*" or len(field.source_attrs) != 1:
+        raise NotCompilable
+    source = field.source
+    model_attr = model_field(model._meta, source)
+    if model_attr is None:
+        return compile_property(field, model, prefix, source)
+    column = prefix + source
+    if isinstance(field, HyperlinkedRelatedField):
+        if not is_forward(model_attr) or field.lookup_field != "pk":
+            raise NotCompilable
+        return [column], hyperlink(field, column)
+    if isinstance(field, serializers.ListSerializer):
+        raise NotCompilable
+    if isinstance(field, serializers.BaseSerializer):
+        if not is_forward(model_attr):
+            raise NotCompilable
+        columns, build, lists = compile_fields(
+            field,
+            model_attr.related_model,
+            prefix=column + "__",
+        )
+
+        def nested(row, related):
+            if row[column] is None:
+                return None
+            return build(row, related)
+
+        return [column] + columns, nested
+    if model_attr.is_relation:
+        raise NotCompilable
+    to_representation = field.to_representation
+
+    def value(row, related):
+        value = row[column]
+        return None if value is None else to_representation(value)
+
+    return [column], value
+
+
+def is_forward(relation):
+    return relation.concrete and (relation.many_to_one or relation.one_to_one)
+
+
+def compile_property(field, model, prefix, name):
+    if name not in getattr(model, "property_columns", {}):
+        raise NotCompilable
+    columns, compute = model.property_columns[name]
+    columns = [prefix + column for column in columns]
+    to_representation = field.to_representation
+
+    def value(row, related):
+        value = compute(*(row[column] for column in columns))
+        return None if value is None else to_representation(value)
+
+    return columns, value
+
+
+def compile_related_list(field, model):
+    """
+    Accessor of a hyperlink list of a reverse relation, the key column it
+    needs and the function reading the lists of a page of rows.
+    """
+    child = field.child_relation
+    relation = model_field(model._meta, field.source)
+    if (
+        relation is None
+        or not relation.one_to_many
+        or not isinstance(child, HyperlinkedRelatedField)
+        or child.lookup_field != "pk"
+    ):
+        raise NotCompilable
+    link = url_template(child)
+    key = relation.field.name
+    limit = getattr(settings, "EPICS_API_NESTED_LIMIT", 100)
+
+    def related_list(rows):
+        lists = {row["pk"]: [] for row in rows}
+        if not lists:
+            return lists
+        related = (
+            relation.related_model._default_manager
+            .filter(**{f"{key}__in": list(lists)})
+            .annotate(rank=Window(
+                RowNumber(),
+                partition_by=F(key),
+                order_by=F("pk").desc(),
+            ))
+            .filter(rank__lte=limit)
+            .order_by(key, "-pk")
+            .values_list(key, "pk")
+        )
+        for owner, pk in related:
+            lists[owner].append(link(pk))
+        return lists
+
+    def accessor(row, related):
+        return related[field.field_name][row["pk"]]
+
+    return accessor, "pk", related_list
+
+
+def url_template(field):
+    """
+    Function giving the URL of a key as `field` gives it for an object.
+    """
+    if field.format:
+        raise NotCompilable
+    request = field.context["request"]
+    url = field.reverse(
+        field.view_name,
+        kwargs={field.lookup_url_kwarg: KEY_SENTINEL},
+        request=request,
+        format=field.context.get("format"),
+    )
+    head, sentinel, tail = url.partition(str(KEY_SENTINEL))
+    if not sentinel or str(KEY_SENTINEL) in tail:
+        raise NotCompilable
+    return lambda key: f"{head}{key}{tail}"
+
+
+def hyperlink(field, column):
+    link = url_template(field)
+
+    def value(row, related):
+        key = row[column]
+        return None if key is None else link(key)
+
+    return value
+
+
+class CompiledListMixin:
+    """
+    Viewset mixin serializing the lists from `values()` rows with the
+    compiled serializer when it can be compiled.
+    """
+
+    def list(self, request, *args, **kwargs):
+        compiled = None
+        if getattr(settings, "EPICS_API_COMPILED_SERIALIZERS", True):
+            compiled = compile_serializer(self.get_serializer())
+        if compiled is None:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        ordering = ()
+        if hasattr(self.paginator, "get_ordering"):
+            ordering = self.paginator.get_ordering(request, queryset, self)
+        queryset = compiled.rows(
+            queryset,
+            # read by the cursor of the page
+            *(name.lstrip("-") for name in ordering),
+        )
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response(compiled.serialize(list(queryset)))
+        return self.get_paginated_response(compiled.serialize(page))
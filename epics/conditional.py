@@ -0,0 +1,93 @@
+"""
+Conditional GET and response cache from the versions of the epics.
+
+A response is tagged with a digest of the `EpicCounters` versions it was
+made from, and of what else it depends on (URL, user, media type). A
+request whose `If-None-Match` holds the same tag gets a 304 after looking
+the versions up, without serializing or rendering anything. Otherwise the
+serialized data is read from the epics cache under the same versions, so
+that any process sharing the cache serves it until a story changes.
+Profile changes (`Contributor.profile_changed`) change the versions of the
+epics showing them and the `DataVersion` the lists are tagged with, so that
+payloads holding names are not served stale either.
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from rest_framework.response import Response
+
+from .cache import EpicCache
+
+
+response_cache = EpicCache("responses")
+
+
+def make_etag(*parts):
+    return hashlib.md5(
+        ":".join(str(part) for part in parts).encode(),
+        usedforsecurity=False,
+    ).hexdigest()
+
+
+class ConditionalGetMixin:
+    """
+    Viewset mixin answering list and retrieve with a 304 when the
+    `get_version()` of the data is the one the client has, and from the
+    response cache when another client asked for it.
+    """
+
+    def get_version(self):
+        return None
+
+    def get_cache_scope(self):
+        """
+        What the data depends on besides the URL and the version, the
+        access level of the user.
+        """
+        user = self.request.user
+        return (user.is_authenticated, user.is_staff, user.is_superuser)
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(super().retrieve, request, *args, **kwargs)
+
+    def conditional(self, handler, request, *args, **kwargs):
+        version = self.get_version()
+        if version is None:
+            return handler(request, *args, **kwargs)
+        etag = '"%s"' % make_etag(
+            request.build_absolute_uri(),
+            request.accepted_media_type,
+            request.user.pk,
+            version,
+        )
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = self.cached(handler, request, version, *args, **kwargs)
+            if response.status_code == 200:
+                response["ETag"] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def cached(self, handler, request, version, *args, **kwargs):
+        key = make_etag(request.build_absolute_uri(), self.get_cache_scope())
+        data = response_cache.get(key, version)
+        if data is not None:
+            return Response(data)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            response_cache.set(key, version, plain(response.data))
+        return response
+
+
+def plain(data):
+    # hyperlinks keep their instance, which pickling would turn to a string
+    if isinstance(data, dict):
+        return {key: plain(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [plain(value) for value in data]
+    if isinstance(data, str):
+        return str(data)
+    return data
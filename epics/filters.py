@@ -0,0 +1,29 @@
+"""
+Filters of the story and epic lists.
+
+Each filter has an index leading with its field, and with the publication
+date after it for the filters used with the default ordering.
+"""
+from django_filters import rest_framework as filters
+
+from .models import Epic, UserStory
+
+
+class UserStoryFilter(filters.FilterSet):
+    class Meta:
+        model = UserStory
+        fields = {
+            'status': ['exact', 'in'],
+            'assigned_to': ['exact', 'isnull'],
+            'epic': ['exact'],
+            'pub_date': ['gte', 'lt'],
+        }
+
+
+class EpicFilter(filters.FilterSet):
+    class Meta:
+        model = Epic
+        fields = {
+            'owner': ['exact'],
+            'pub_date': ['gte', 'lt'],
+        }
@@ -0,0 +1,36 @@
+from .models import Contributor, DataVersion, EpicCounters, counter_name
+
+
+def discount_deleted_story(sender, instance, **kwargs):
+    EpicCounters.shift(
+        instance.epic_id,
+        rebuild=False,
+        **{counter_name(instance.status): -1},
+    )
+
+
+def user_changed(sender, instance, created, raw=False, update_fields=None,
+                 **kwargs):
+    if created or raw:
+        return
+    # logins only write last_login, which is not serialized
+    if update_fields and set(update_fields) <= {"last_login"}:
+        return
+    try:
+        contributor = instance.contributor
+    except Contributor.DoesNotExist:
+        return
+    contributor.profile_changed()
+
+
+def contributor_changed(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        DataVersion.bump()
+    else:
+        instance.profile_changed()
+
+
+def data_removed(sender, **kwargs):
+    DataVersion.bump()
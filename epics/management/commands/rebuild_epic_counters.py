@@ -0,0 +1,54 @@
+from dataclasses import asdict
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from epics.models import Epic, EpicCounters, Stats
+
+
+class Command(BaseCommand):
+    help = "Recompute the per epic story counters from the stories."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "epics",
+            nargs="*",
+            type=int,
+            help="ids of the epics to rebuild (all epics by default)",
+        )
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="only report the epics whose counters are wrong",
+        )
+
+    @transaction.atomic
+    def handle(self, *args, epics, check, **options):
+        epic_ids = epics or list(Epic.objects.values_list("id", flat=True))
+        counts = EpicCounters.count_stories(epic_ids)
+        stored = EpicCounters.objects.in_bulk(epic_ids)
+        wrong = 0
+        for epic_id in epic_ids:
+            expected = Stats(**counts.get(epic_id, {}))
+            current = stored.get(epic_id)
+            if current and current.stats == expected:
+                continue
+            wrong += 1
+            self.stdout.write(
+                f"epic {epic_id}: "
+                f"{current and asdict(current.stats)} != {asdict(expected)}"
+            )
+            if not check:
+                EpicCounters.objects.update_or_create(
+                    epic_id=epic_id,
+                    defaults=asdict(expected),
+                )
+                EpicCounters.bump([epic_id])
+        if check and wrong:
+            raise CommandError(f"{wrong} epic(s) with wrong counters")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(epic_ids)} epic(s) checked, {wrong} "
+                + ("wrong" if check else "repaired")
+            )
+        )
@@ -0,0 +1,64 @@
+# Generated by Django 5.0.4 on 2024-05-12 10:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+STATUS_COUNTERS = {
+    "created": "created",
+    "in progress": "in_progress",
+    "suspended": "suspended",
+    "canceled": "canceled",
+    "finished": "finished",
+}
+
+
+def count_stories(apps, schema_editor):
+    Epic = apps.get_model("epics", "Epic")
+    EpicCounters = apps.get_model("epics", "EpicCounters")
+    UserStory = apps.get_model("epics", "UserStory")
+    counts = {}
+    for elem in (
+        UserStory.objects
+        .values("epic", "status")
+        .annotate(count=models.Count("id"))
+        .order_by()
+    ):
+        counts.setdefault(elem["epic"], {})[
+            STATUS_COUNTERS[elem["status"]]
+        ] = elem["count"]
+    EpicCounters.objects.bulk_create(
+        EpicCounters(epic_id=epic_id, **counts.get(epic_id, {}))
+        for epic_id in Epic.objects.values_list("id", flat=True)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('epics', '0004_alter_userstory_assigned_to'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EpicCounters',
+            fields=[
+                ('epic', models.OneToOneField(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    primary_key=True,
+                    related_name='counters',
+                    serialize=False,
+                    to='epics.epic')),
+                ('created', models.IntegerField(default=0)),
+                ('in_progress', models.IntegerField(default=0)),
+                ('suspended', models.IntegerField(default=0)),
+                ('canceled', models.IntegerField(default=0)),
+                ('finished', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Epic counters',
+                'verbose_name_plural': 'Epic counters',
+            },
+        ),
+        migrations.RunPython(count_stories, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.0.4 on 2024-05-14 18:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('epics', '0005_epic_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userstory',
+            index=models.Index(
+                fields=['epic', 'status'],
+                name='userstory_epic_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userstory',
+            index=models.Index(
+                fields=['assigned_to', 'status'],
+                name='userstory_assignee_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userstory',
+            index=models.Index(
+                fields=['epic', '-pub_date'],
+                name='userstory_epic_pub_date_idx'),
+        ),
+    ]
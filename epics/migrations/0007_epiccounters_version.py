@@ -0,0 +1,19 @@
+# Generated by Django 5.0.4 on 2024-05-28 08:37
+
+import epics.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('epics', '0006_workflow_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='epiccounters',
+            name='version',
+            field=models.BigIntegerField(default=epics.models.initial_version),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.0.4 on 2024-05-30 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('epics', '0007_epiccounters_version'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='epic',
+            index=models.Index(
+                fields=['-pub_date', 'id'],
+                name='epic_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userstory',
+            index=models.Index(
+                fields=['-pub_date', 'id'],
+                name='userstory_pub_date_idx'),
+        ),
+    ]
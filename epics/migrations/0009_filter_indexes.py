@@ -0,0 +1,43 @@
+# Generated by Django 5.0.4 on 2024-06-03 09:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('epics', '0008_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='epic',
+            index=models.Index(
+                fields=['owner', '-pub_date'],
+                name='epic_owner_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='epic',
+            index=models.Index(
+                fields=['title', 'id'],
+                name='epic_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userstory',
+            index=models.Index(
+                fields=['status', '-pub_date'],
+                name='userstory_status_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userstory',
+            index=models.Index(
+                fields=['assigned_to', '-pub_date'],
+                name='userstory_assignee_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userstory',
+            index=models.Index(
+                fields=['title', 'id'],
+                name='userstory_title_idx'),
+        ),
+    ]
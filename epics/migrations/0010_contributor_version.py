@@ -0,0 +1,19 @@
+# Generated by Django 5.0.4 on 2024-06-24 09:12
+
+import epics.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('epics', '0009_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contributor',
+            name='version',
+            field=models.BigIntegerField(default=epics.models.initial_version),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.0.4 on 2024-06-26 10:05
+
+import epics.models
+from django.db import migrations, models
+
+
+def create_data_version(apps, schema_editor):
+    DataVersion = apps.get_model("epics", "DataVersion")
+    DataVersion.objects.get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('epics', '0010_contributor_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataVersion',
+            fields=[
+                ('id', models.BigAutoField(
+                    auto_created=True,
+                    primary_key=True,
+                    serialize=False,
+                    verbose_name='ID')),
+                ('version', models.BigIntegerField(
+                    default=epics.models.initial_version)),
+            ],
+        ),
+        migrations.RemoveField(
+            model_name='contributor',
+            name='version',
+        ),
+        migrations.RunPython(
+            create_data_version,
+            migrations.RunPython.noop,
+        ),
+    ]
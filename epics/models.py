@@ -1,13 +1,71 @@
-from dataclasses import dataclass
+import random
+from dataclasses import asdict, dataclass, field
 
 from django.contrib.auth.models import User
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 
-from .signals import status_changed
+from .signals import status_changed, statuses_changed
 from .exceptions import BadCommand
 
 
+class StoryStatus(models.TextChoices):
+    CREATED = "created"
+    IN_PROGRESS = "in progress"
+    SUSPENDED = "suspended"
+    CANCELED = "canceled"
+    FINISHED = "finished"
+
+
+def full_name(first_name, last_name, username):
+    if first_name:
+        if last_name:
+            return f"{first_name} {last_name}"
+        else:
+            return f"{first_name}"
+    else:
+        return username
+
+
+def initial_version():
+    # A random start keeps a recreated epic or contributor (restored
+    # database, test runs) from meeting the cache entries of a previous one
+    # with the same id.
+    return random.getrandbits(62)
+
+
+class DataVersion(models.Model):
+    """
+    Single row whose version changes after any change of the epics,
+    stories or contributors, in the same transaction, so that the lists
+    read one row rather than combining all the versions.
+    """
+    version = models.BigIntegerField(default=initial_version)
+
+    @classmethod
+    def current(cls):
+        version = (
+            cls.objects
+            .filter(pk=1)
+            .values_list("version", flat=True)
+            .first()
+        )
+        if version is None:
+            version = cls.objects.get_or_create(pk=1)[0].version
+        return version
+
+    @classmethod
+    def bump(cls):
+        # A new random version rather than an increment: after a rollback
+        # (restored database, tests) the next versions are not the ones of
+        # the lost changes, whose cache entries would be served again.
+        if not cls.objects.filter(pk=1).update(version=initial_version()):
+            cls.current()
+
+    def __str__(self):
+        return f"Data version {self.version}"
+
+
 class Contributor(models.Model):
     user = models.OneToOneField(
         User,
@@ -15,15 +73,64 @@ class Contributor(models.Model):
         related_name='contributor',
     )
 
+    # Relations read by properties, joined when they are serialized, and
+    # properties listing part of a relation as (relation, condition), read
+    # from a prefetch when the queryset has one (see `epics.optimizer`).
+    property_joins = {"fullname": ["user"]}
+    # Properties computed from the columns of values() rows, as (columns,
+    # function of the column values) (see `epics.compiled`).
+    property_columns = {
+        "fullname": (
+            ["user__first_name", "user__last_name", "user__username"],
+            full_name,
+        ),
+    }
+    related_subsets = {
+        "stories_in_progress": (
+            "stories",
+            models.Q(status=StoryStatus.IN_PROGRESS),
+        ),
+        "stories_suspended": (
+            "stories",
+            models.Q(status=StoryStatus.SUSPENDED),
+        ),
+    }
+
+    def related_subset(self, name):
+        """
+        QuerySet of the subset `name` of `related_subsets`. When it was
+        prefetched it is evaluated from the prefetched (capped) objects,
+        as related managers do with their prefetches; chained calls query
+        the database as usual.
+        """
+        relation, condition = self.related_subsets[name]
+        subset = getattr(self, relation).filter(condition)
+        try:
+            subset._result_cache = getattr(self, f"prefetched_{name}")
+        except AttributeError:
+            return subset
+        subset._prefetch_done = True
+        return subset
+
     @property
     def fullname(self):
-        if self.user.first_name:
-            if self.user.last_name:
-                return f"{self.user.first_name} {self.user.last_name}"
-            else:
-                return f"{self.user.first_name}"
-        else:
-            return self.user.username
+        return full_name(
+            self.user.first_name,
+            self.user.last_name,
+            self.user.username,
+        )
+
+    def profile_changed(self):
+        """
+        Change the versions of the epics showing the profile of the
+        contributor, as owner or assignee of one of their stories, and the
+        data version.
+        """
+        EpicCounters.bump(
+            Epic.objects
+            .filter(models.Q(owner=self) | models.Q(story__assigned_to=self))
+            .values("pk")
+        )
 
     def new_epic(self, title, description):
         return Epic.objects.create(
@@ -32,8 +139,9 @@ class Contributor(models.Model):
             owner=self,
         )
 
+    @transaction.atomic
     def new_story(self, epic, title, description):
-        if epic.owner != self:
+        if epic.owner_id != self.pk:
             raise BadCommand(f"{self} is not the owner")
         story = UserStory.objects.create(
             title=title,
@@ -43,41 +151,55 @@ class Contributor(models.Model):
         story.status_changed(self)
         return story
 
+    @transaction.atomic
+    def new_stories(self, epic, stories):
+        """
+        Create `stories`, dicts of story fields, under `epic` with the same
+        number of queries whatever their number, and return them.
+        """
+        if epic.owner_id != self.pk:
+            raise BadCommand(f"{self} is not the owner")
+        created = UserStory.objects.bulk_create(
+            UserStory(epic=epic, **story) for story in stories
+        )
+        if not created:
+            return created
+        for story in created:
+            story._stored_state = story._current_state()
+        EpicCounters.shift(epic.pk, created=len(created))
+        statuses_changed.send(
+            sender=UserStory,
+            contributor=self,
+            changes=[(story.pk, story.status) for story in created],
+        )
+        return created
+
     def take(self, story):
         if story.status not in (StoryStatus.CREATED, StoryStatus.IN_PROGRESS):
             raise BadCommand(f"Cannot assign {story}")
-        story.assigned_to = self
-        story.status = StoryStatus.IN_PROGRESS
-        story.save()
-        story.status_changed(self)
+        story.compare_and_set(self, StoryStatus.IN_PROGRESS, assigned_to=self)
 
     @property
     def stories_in_progress(self):
-        return self.stories.filter(status=StoryStatus.IN_PROGRESS)
+        return self.related_subset("stories_in_progress")
 
     def suspend(self, story):
         if story.status not in (StoryStatus.CREATED, StoryStatus.IN_PROGRESS):
             raise BadCommand(f"Cannot suspend {story}")
-        if story.epic.owner != self:
+        if story.epic.owner_id != self.pk:
             raise BadCommand(f"{self} is not allowed to suspend {story}")
-        story.status = StoryStatus.SUSPENDED
-        story.save()
-        story.status_changed(self)
+        story.compare_and_set(self, StoryStatus.SUSPENDED)
 
     def resume(self, story):
         if not story.status == StoryStatus.SUSPENDED:
             raise BadCommand(f"Cannot suspend {story}")
-        if story.epic.owner != self:
+        if story.epic.owner_id != self.pk:
             raise BadCommand(f"{self} is not allowed to resume {story}")
-        story.status = (
-            story.assigned_to and StoryStatus.IN_PROGRESS or StoryStatus.CREATED
-        )
-        story.save()
-        story.status_changed(self)
+        story.compare_and_set(self, resumed_status(story.assigned_to_id))
 
     @property
     def stories_suspended(self):
-        return self.stories.filter(status=StoryStatus.SUSPENDED)
+        return self.related_subset("stories_suspended")
 
     def cancel(self, story):
         if story.status not in (
@@ -86,12 +208,9 @@ class Contributor(models.Model):
             StoryStatus.SUSPENDED,
         ):
             raise BadCommand(f"Cannot cancel {story}")
-        if story.epic.owner != self:
+        if story.epic.owner_id != self.pk:
             raise BadCommand(f"{self} is not allowed to cancel {story}")
-        story.status = StoryStatus.CANCELED
-        story.assigned_to = None
-        story.save()
-        story.status_changed(self)
+        story.compare_and_set(self, StoryStatus.CANCELED, assigned_to=None)
 
     def validate(self, story):
         if story.status not in (
@@ -100,17 +219,197 @@ class Contributor(models.Model):
             StoryStatus.SUSPENDED,
         ):
             raise BadCommand(f"Cannot cancel {story}")
-        if story.epic.owner != self:
+        if story.epic.owner_id != self.pk:
             raise BadCommand(f"{self} is not allowed to cancel {story}")
-        story.status = StoryStatus.FINISHED
-        story.assigned_to = None
-        story.save()
-        story.status_changed(self)
+        story.compare_and_set(self, StoryStatus.FINISHED, assigned_to=None)
+
+    def bulk_take(self, stories):
+        return self._bulk_transition(
+            stories,
+            (StoryStatus.CREATED, StoryStatus.IN_PROGRESS),
+            StoryStatus.IN_PROGRESS,
+            owner_only=False,
+            assigned_to=self,
+        )
+
+    def bulk_suspend(self, stories):
+        return self._bulk_transition(
+            stories,
+            (StoryStatus.CREATED, StoryStatus.IN_PROGRESS),
+            StoryStatus.SUSPENDED,
+        )
+
+    def bulk_resume(self, stories):
+        return self._bulk_transition(
+            stories,
+            (StoryStatus.SUSPENDED,),
+            None,
+        )
+
+    def bulk_cancel(self, stories):
+        return self._bulk_transition(
+            stories,
+            (
+                StoryStatus.CREATED,
+                StoryStatus.IN_PROGRESS,
+                StoryStatus.SUSPENDED,
+            ),
+            StoryStatus.CANCELED,
+            assigned_to=None,
+        )
+
+    def bulk_validate(self, stories):
+        return self._bulk_transition(
+            stories,
+            (
+                StoryStatus.CREATED,
+                StoryStatus.IN_PROGRESS,
+                StoryStatus.SUSPENDED,
+            ),
+            StoryStatus.FINISHED,
+            assigned_to=None,
+        )
+
+    @transaction.atomic
+    def _bulk_transition(
+            self, stories, allowed, new_status, owner_only=True, **fields):
+        """
+        Move every story of `stories` (a queryset or an iterable of stories
+        or ids) whose status is in `allowed` to `new_status` with a single
+        UPDATE. A `new_status` of None means resuming: back in progress for
+        assigned stories, created for the others.
+        """
+        if isinstance(stories, models.QuerySet):
+            requested = list(stories.values_list("pk", flat=True))
+        else:
+            requested = [getattr(story, "pk", story) for story in stories]
+        eligible = UserStory.objects.filter(
+            pk__in=requested,
+            status__in=allowed,
+        )
+        if owner_only:
+            eligible = eligible.filter(epic__owner=self)
+        rows = list(
+            eligible
+            .select_for_update(of=("self",))
+            .order_by("pk")
+            .values_list("pk", "epic", "status", "assigned_to")
+        )
+        changes = []
+        deltas = {}
+        for pk, epic_id, status, assigned_to in rows:
+            status_after = new_status or resumed_status(assigned_to)
+            changes.append((pk, status_after))
+            epic_deltas = deltas.setdefault(epic_id, {})
+            for name, delta in (
+                (counter_name(status), -1),
+                (counter_name(status_after), 1),
+            ):
+                epic_deltas[name] = epic_deltas.get(name, 0) + delta
+        changed = [pk for pk, _ in changes]
+        if changed:
+            if new_status is None:
+                fields["status"] = models.Case(
+                    models.When(
+                        assigned_to__isnull=True,
+                        then=models.Value(resumed_status(None)),
+                    ),
+                    default=models.Value(resumed_status(True)),
+                )
+            else:
+                fields["status"] = new_status
+            (
+                UserStory.objects
+                .filter(pk__in=changed, status__in=allowed)
+                .update(**fields)
+            )
+            for epic_id, epic_deltas in deltas.items():
+                EpicCounters.shift(epic_id, **epic_deltas)
+            statuses_changed.send(
+                sender=UserStory,
+                contributor=self,
+                changes=changes,
+            )
+        changed_set = set(changed)
+        return BulkResult(
+            changed=changed,
+            rejected=[pk for pk in requested if pk not in changed_set],
+        )
+
+    @transaction.atomic
+    def run_commands(self, commands, atomic=True):
+        """
+        Run `commands`, (story id, action) pairs with an action of
+        `COMMANDS`, in order and in one transaction, reading the stories
+        with a single query, and return the outcome of each. In atomic mode
+        the first rejected command rolls the whole batch back and the next
+        ones are skipped, otherwise the rejected commands change nothing
+        and the others are applied.
+        """
+        stories = (
+            UserStory.objects
+            .select_related("epic")
+            .in_bulk({pk for pk, _ in commands})
+        )
+        stored = {pk: story.status for pk, story in stories.items()}
+        outcomes = []
+        rejected = False
+        for pk, action in commands:
+            outcome = CommandOutcome(story=pk, action=action)
+            outcomes.append(outcome)
+            story = stories.get(pk)
+            if atomic and rejected:
+                outcome.outcome = CommandOutcome.SKIPPED
+                continue
+            try:
+                if action not in COMMANDS:
+                    raise BadCommand(f"Unknown command {action}")
+                if story is None:
+                    raise BadCommand(f"No story {pk}")
+                getattr(self, action)(story)
+            except BadCommand as e:
+                rejected = True
+                outcome.outcome = CommandOutcome.REJECTED
+                outcome.detail = str(e)
+            else:
+                outcome.outcome = CommandOutcome.APPLIED
+            outcome.status = story and story.status
+        if atomic and rejected:
+            transaction.set_rollback(True)
+            for outcome in outcomes:
+                if outcome.outcome == CommandOutcome.APPLIED:
+                    outcome.outcome = CommandOutcome.ROLLED_BACK
+                outcome.status = stored.get(outcome.story)
+        return outcomes
 
     def __str__(self):
         return f"{self.fullname}"
 
 
+# Workflow methods of `Contributor` a batch of commands can run.
+COMMANDS = ("take", "suspend", "resume", "cancel", "validate")
+
+
+@dataclass
+class BulkResult:
+    changed: list = field(default_factory=list)
+    rejected: list = field(default_factory=list)
+
+
+@dataclass
+class CommandOutcome:
+    APPLIED = "applied"
+    REJECTED = "rejected"
+    ROLLED_BACK = "rolled back"
+    SKIPPED = "skipped"
+
+    story: int
+    action: str
+    outcome: str = None
+    detail: str = ""
+    status: str = None
+
+
 @dataclass
 class Stats:
     created: int = 0
@@ -119,6 +418,11 @@ class Stats:
     canceled: int = 0
     finished: int = 0
 
+    @classmethod
+    def from_counts(cls, *counts):
+        # counters missing for an epic come as nulls from an outer join
+        return cls(*(count or 0 for count in counts))
+
     @property
     def total(self):
         return (
@@ -130,15 +434,43 @@ class Stats:
         )
 
 
-class StoryStatus(models.TextChoices):
-    CREATED = "created"
-    IN_PROGRESS = "in progress"
-    SUSPENDED = "suspended"
-    CANCELED = "canceled"
-    FINISHED = "finished"
+def resumed_status(assigned_to):
+    return assigned_to and StoryStatus.IN_PROGRESS or StoryStatus.CREATED
 
 
 class Epic(models.Model):
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["-pub_date", "id"],
+                name="epic_pub_date_idx",
+            ),
+            models.Index(
+                fields=["owner", "-pub_date"],
+                name="epic_owner_pub_date_idx",
+            ),
+            models.Index(
+                fields=["title", "id"],
+                name="epic_title_idx",
+            ),
+        ]
+
+    # relations read by properties (see `epics.optimizer`) and columns they
+    # are computed from (see `epics.compiled`)
+    property_joins = {"stats": ["counters"]}
+    property_columns = {
+        "stats": (
+            [
+                "counters__created",
+                "counters__in_progress",
+                "counters__suspended",
+                "counters__canceled",
+                "counters__finished",
+            ],
+            Stats.from_counts,
+        ),
+    }
+
     title = models.CharField(max_length=256)
     pub_date = models.DateTimeField("date published", default=timezone.now)
     description = models.TextField()
@@ -150,25 +482,212 @@ class Epic(models.Model):
         related_query_name="epic",
     )
 
+    @property
+    def stats(self):
+        try:
+            return self.counters.stats
+        except EpicCounters.DoesNotExist:
+            return Stats()
+
+    @transaction.atomic
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if adding:
+            EpicCounters.objects.create(epic=self)
+            DataVersion.bump()
+        else:
+            EpicCounters.bump([self.pk])
+
+    def __str__(self):
+        return f"Epic({self.pk}): {self.title}"
+
+
+def counter_name(status):
+    return StoryStatus(status).name.lower()
+
+
+class EpicCounters(models.Model):
+    """
+    Number of stories per status for an epic.
+
+    Kept up to date by `UserStory.save` so that reading `Epic.stats` does
+    not need to aggregate the stories. `rebuild_epic_counters` recomputes
+    them from the stories if they ever drift.
+
+    `version` changes with every change of the epic's stories, values
+    derived from them are cached under it (see `epics.cache`).
+    """
+    class Meta:
+        verbose_name = "Epic counters"
+        verbose_name_plural = "Epic counters"
+
+    epic = models.OneToOneField(
+        Epic,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="counters",
+    )
+    created = models.IntegerField(default=0)
+    in_progress = models.IntegerField(default=0)
+    suspended = models.IntegerField(default=0)
+    canceled = models.IntegerField(default=0)
+    finished = models.IntegerField(default=0)
+    version = models.BigIntegerField(default=initial_version)
+
     @property
     def stats(self):
         return Stats(
-            **{
-                StoryStatus(elem["status"]).name.lower(): elem["count"]
-                for elem in self.stories.values("status")
-                .annotate(count=models.Count("status"))
-                .order_by()
-            }
+            created=self.created,
+            in_progress=self.in_progress,
+            suspended=self.suspended,
+            canceled=self.canceled,
+            finished=self.finished,
+        )
+
+    @staticmethod
+    def count_stories(epic_ids=None):
+        qs = UserStory.objects.all()
+        if epic_ids is not None:
+            qs = qs.filter(epic__in=epic_ids)
+        counts = {}
+        for elem in (
+            qs.values("epic", "status")
+            .annotate(count=models.Count("id"))
+            .order_by()
+        ):
+            counts.setdefault(elem["epic"], {})[
+                counter_name(elem["status"])
+            ] = elem["count"]
+        return counts
+
+    @staticmethod
+    def versions(epic_ids):
+        return dict(
+            EpicCounters.objects
+            .filter(epic__in=epic_ids)
+            .values_list("epic", "version")
+        )
+
+    @classmethod
+    def combined_version(cls, epic_ids=None):
+        """
+        Value changing with the version of any of `epic_ids`, and when
+        epics are added or removed. For all the epics (the default) it is
+        the `DataVersion`, read from one row.
+        """
+        if epic_ids is None:
+            return DataVersion.current()
+        # versions only grow, the sum of their low bits cannot overflow
+        aggregates = cls.objects.filter(epic__in=epic_ids).aggregate(
+            count=models.Count("pk"),
+            last=models.Max("pk"),
+            total=models.Sum(models.F("version") % (1 << 31)),
+        )
+        return "{count}-{last}-{total}".format(**aggregates)
+
+    @classmethod
+    def bump(cls, epic_ids):
+        """
+        Change the version of `epic_ids` for changes of their stories not
+        going through the counters.
+        """
+        cls.objects.filter(epic__in=epic_ids).update(
+            version=models.F("version") + 1
+        )
+        DataVersion.bump()
+
+    @classmethod
+    def rebuild(cls, epic_id):
+        counts = cls.count_stories([epic_id]).get(epic_id, {})
+        _, created = cls.objects.update_or_create(
+            epic_id=epic_id,
+            defaults=asdict(Stats(**counts)),
         )
+        if created:
+            DataVersion.bump()
+        else:
+            cls.bump([epic_id])
+
+    @classmethod
+    def shift(cls, epic_id, rebuild=True, **deltas):
+        # the version changes even when the counts do not (a story taken
+        # over by another contributor, an edited story)
+        deltas = {name: delta for name, delta in deltas.items() if delta}
+        updated = (
+            cls.objects
+            .filter(epic_id=epic_id)
+            .update(
+                version=models.F("version") + 1,
+                **{
+                    name: models.F(name) + delta
+                    for name, delta in deltas.items()
+                },
+            )
+        )
+        if updated:
+            DataVersion.bump()
+        elif rebuild:
+            cls.rebuild(epic_id)
+
+    @classmethod
+    def move(cls, previous, current):
+        """
+        Account for a story going from `previous` to `current`, both
+        being `(epic_id, status)` pairs or None.
+        """
+        if previous == current:
+            if current:
+                cls.shift(current[0])
+            return
+        deltas = {}
+        if previous:
+            deltas.setdefault(previous[0], {})[counter_name(previous[1])] = -1
+        if current:
+            name = counter_name(current[1])
+            epic_deltas = deltas.setdefault(current[0], {})
+            epic_deltas[name] = epic_deltas.get(name, 0) + 1
+        for epic_id, epic_deltas in deltas.items():
+            cls.shift(epic_id, **epic_deltas)
 
     def __str__(self):
-        return f"Epic({self.pk}): {self.title}"
+        return f"Counters of epic {self.epic_id}"
 
 
 class UserStory(models.Model):
     class Meta:
         verbose_name = "User Story"
         verbose_name_plural = "User Stories"
+        indexes = [
+            models.Index(
+                fields=["epic", "status"],
+                name="userstory_epic_status_idx",
+            ),
+            models.Index(
+                fields=["assigned_to", "status"],
+                name="userstory_assignee_status_idx",
+            ),
+            models.Index(
+                fields=["epic", "-pub_date"],
+                name="userstory_epic_pub_date_idx",
+            ),
+            models.Index(
+                fields=["-pub_date", "id"],
+                name="userstory_pub_date_idx",
+            ),
+            models.Index(
+                fields=["status", "-pub_date"],
+                name="userstory_status_pub_date_idx",
+            ),
+            models.Index(
+                fields=["assigned_to", "-pub_date"],
+                name="userstory_assignee_date_idx",
+            ),
+            models.Index(
+                fields=["title", "id"],
+                name="userstory_title_idx",
+            ),
+        ]
 
     epic = models.ForeignKey(
         Epic,
@@ -193,6 +712,75 @@ class UserStory(models.Model):
         related_query_name="story",
     )
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._stored_state = instance._current_state()
+        return instance
+
+    def _current_state(self):
+        if "epic_id" in self.__dict__ and "status" in self.__dict__:
+            return (self.epic_id, self.status)
+        return None
+
+    def _previous_state(self):
+        if self._state.adding:
+            return None
+        stored_state = getattr(self, "_stored_state", None)
+        if stored_state is not None:
+            return stored_state
+        return (
+            UserStory.objects
+            .filter(pk=self.pk)
+            .values_list("epic", "status")
+            .first()
+        )
+
+    @transaction.atomic
+    def save(self, *args, update_fields=None, **kwargs):
+        tracked = (
+            update_fields is None
+            or {"epic", "epic_id", "status"} & set(update_fields)
+        )
+        previous = tracked and self._previous_state()
+        super().save(*args, update_fields=update_fields, **kwargs)
+        current = self._current_state()
+        if not tracked:
+            EpicCounters.bump([self.epic_id])
+            return
+        if current is None:
+            return
+        self._count_move(previous, current)
+
+    def _count_move(self, previous, current):
+        EpicCounters.move(previous, current)
+        self._stored_state = current
+        if previous != current and UserStory.epic.is_cached(self):
+            counters = Epic.counters.related
+            if counters.is_cached(self.epic):
+                counters.delete_cached_value(self.epic)
+
+    @transaction.atomic
+    def compare_and_set(self, contributor, status, **fields):
+        """
+        Move the story to `status`, also writing `fields`, provided it is
+        still stored with the status it was read with. Only the changed
+        columns are written and the signal is only sent on success.
+        """
+        updated = (
+            UserStory.objects
+            .filter(pk=self.pk, status=self.status)
+            .update(status=status, **fields)
+        )
+        if not updated:
+            raise BadCommand(f"{self} has been changed meanwhile")
+        previous = (self.epic_id, self.status)
+        self.status = status
+        for name, value in fields.items():
+            setattr(self, name, value)
+        self._count_move(previous, self._current_state())
+        self.status_changed(contributor)
+
     def status_changed(self, contributor=None):
         status_changed.send(
             sender=self.__class__,
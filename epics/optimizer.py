@@ -0,0 +1,178 @@
+"""
+Joins and prefetches needed to serialize a queryset.
+
+`optimize(queryset, serializer)` walks the fields of a model serializer:
+nested serializers of forward relations and the relations listed in a
+model's `property_joins` for its properties become `select_related`, related
+lists (hyperlinks or nested serializers) become `prefetch_related` with a
+queryset optimized for the nested serializer in turn, and the properties
+of a model's `related_subsets` become filtered `Prefetch` objects. Listing
+a page then costs the same number of queries whatever its size. Related
+lists hold the `EPICS_API_NESTED_LIMIT` most recent objects, read by the
+fields using `CappedListMixin`.
+"""
+from django.conf import settings
+from django.db.models import Prefetch
+from django.db.models.constants import LOOKUP_SEP
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, RelatedField
+
+
+def optimize(queryset, serializer):
+    """
+    `queryset` with the joins and prefetches `serializer` reads, unchanged
+    when `serializer` does not serialize its model.
+    """
+    serializer = getattr(serializer, "child", serializer)
+    model = getattr(getattr(serializer, "Meta", None), "model", None)
+    if model is None or not issubclass(queryset.model, model):
+        return queryset
+    select, prefetch = related_lookups(model, serializer)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    return queryset
+
+
+class OptimizedQuerysetMixin:
+    """
+    View mixin optimizing the queryset for the serializer of the action.
+    """
+
+    def get_queryset(self):
+        return optimize(super().get_queryset(), self.get_serializer())
+
+
+def related_lookups(model, serializer, prefix=""):
+    """
+    `select_related` and `prefetch_related` lookups reading the fields of
+    `serializer` on `model` instances reached through `prefix`.
+    """
+    select = []
+    prefetch = []
+    for field in serializer.fields.values():
+        if field.write_only or field.source == "*":
+            continue
+        opts = model._meta
+        path = prefix
+        for attr in field.source_attrs:
+            relation = model_field(opts, attr)
+            if relation is None:
+                select.extend(
+                    path + join
+                    for join in getattr(opts.model, "property_joins", {})
+                    .get(attr, [])
+                )
+                prefetch.extend(
+                    subset_prefetches(opts.model, attr, field, path)
+                )
+                break
+            if not relation.is_relation:
+                break
+            lookup = path + attr
+            if relation.many_to_many or relation.one_to_many:
+                prefetch.append(
+                    related_prefetch(relation, lookup, field_child(field))
+                )
+                break
+            if attr == field.source_attrs[-1] and reads_key_only(field):
+                break
+            select.append(lookup)
+            opts = relation.related_model._meta
+            path = lookup + LOOKUP_SEP
+        else:
+            if is_nested(field):
+                nested_select, nested_prefetch = related_lookups(
+                    opts.model, field, path,
+                )
+                select.extend(nested_select)
+                prefetch.extend(nested_prefetch)
+    return select, prefetch
+
+
+def subset_prefetches(model, name, field, path):
+    subsets = getattr(model, "related_subsets", {})
+    if name not in subsets:
+        return []
+    relation, condition = subsets[name]
+    related_model = model_field(model._meta, relation).related_model
+    return [
+        Prefetch(
+            path + relation,
+            queryset=capped(optimize(
+                related_model.objects.filter(condition),
+                field_child(field),
+            )),
+            to_attr=f"prefetched_{name}",
+        )
+    ]
+
+
+def model_field(opts, attr):
+    """
+    Field of `opts` read through the attribute `attr`, reverse relations
+    being found by accessor rather than by query name.
+    """
+    for field in opts.get_fields():
+        if field.auto_created and not field.concrete:
+            name = field.get_accessor_name()
+        else:
+            name = field.name
+        if name == attr:
+            return field
+    return None
+
+
+def related_prefetch(relation, lookup, child):
+    queryset = relation.related_model._default_manager.all()
+    if is_nested(child):
+        queryset = optimize(queryset, child)
+    elif relation.one_to_many:
+        # hyperlinks only need the keys
+        queryset = queryset.only(relation.field.name)
+    return Prefetch(
+        lookup,
+        queryset=capped(queryset),
+        to_attr=f"prefetched_{lookup.split(LOOKUP_SEP)[-1]}",
+    )
+
+
+def capped(queryset):
+    return queryset.order_by("-pk")[
+        :getattr(settings, "EPICS_API_NESTED_LIMIT", 100)
+    ]
+
+
+class CappedListMixin:
+    """
+    Related list field reading the capped list prefetched by `optimize`,
+    or querying the same objects when there is none.
+    """
+
+    def get_attribute(self, instance):
+        try:
+            return getattr(instance, f"prefetched_{self.source}")
+        except AttributeError:
+            related = super().get_attribute(instance)
+        if hasattr(related, "all"):
+            return capped(related.all())
+        return related
+
+
+def reads_key_only(field):
+    # related fields of a forward relation only read the key on the row
+    return (
+        isinstance(field, RelatedField)
+        and field.use_pk_only_optimization()
+    )
+
+
+def field_child(field):
+    if isinstance(field, ManyRelatedField):
+        return field.child_relation
+    return getattr(field, "child", field)
+
+
+def is_nested(field):
+    return isinstance(field_child(field), serializers.BaseSerializer)
@@ -0,0 +1,151 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+import json
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from django.db.models.constants import LOOKUP_SEP
+from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(pagination.BasePagination):
+    """
+    Cursor pagination on a unique ordering, the cursor holding the ordering
+    values of the last item of the page so the next page is read with a
+    keyset condition instead of an OFFSET. The ordering is the one asked to
+    an ordering filter of the view, or the `ordering` of the view, made
+    unique with the id.
+    """
+    ordering = ("id",)
+    page_size = api_settings.PAGE_SIZE or 100
+    max_page_size = getattr(settings, "EPICS_API_MAX_PAGE_SIZE", 1000)
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    invalid_cursor_message = "Invalid cursor"
+
+    def get_page_size(self, request):
+        try:
+            return pagination._positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size,
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def get_ordering(self, request, queryset, view):
+        ordering = None
+        for backend in getattr(view, "filter_backends", ()):
+            if hasattr(backend, "get_ordering"):
+                ordering = backend().get_ordering(request, queryset, view)
+        ordering = tuple(
+            ordering or getattr(view, "ordering", None) or self.ordering
+        )
+        if not {"id", "-id", "pk", "-pk"} & set(ordering):
+            ordering += ("id",)
+        return ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self.after(position))
+        page = list(queryset[:self.page_size + 1])
+        self.has_next = len(page) > self.page_size
+        page = page[:self.page_size]
+        self.last = page[-1] if page else None
+        return page
+
+    def after(self, position):
+        """
+        Condition selecting the items placed after `position` in ordering.
+        """
+        condition = Q(pk__in=[])
+        equal = Q()
+        for ordering, value in zip(self.ordering, position):
+            field = ordering.lstrip("-")
+            lookup = "lt" if ordering.startswith("-") else "gt"
+            condition |= equal & Q(**{f"{field}__{lookup}": value})
+            equal &= Q(**{field: value})
+        return condition
+
+    def position_of(self, instance):
+        if isinstance(instance, dict):
+            # values() rows
+            return [
+                instance[ordering.lstrip("-")] for ordering in self.ordering
+            ]
+        position = []
+        for ordering in self.ordering:
+            value = instance
+            for attr in ordering.lstrip("-").split(LOOKUP_SEP):
+                value = getattr(value, attr)
+            position.append(value)
+        return position
+
+    def ordering_fields(self, model):
+        fields = []
+        for ordering in self.ordering:
+            opts = model._meta
+            for name in ordering.lstrip("-").split(LOOKUP_SEP):
+                field = opts.pk if name == "pk" else opts.get_field(name)
+                if field.is_relation:
+                    opts = field.related_model._meta
+            fields.append(field)
+        return fields
+
+    def encode_cursor(self, position):
+        return urlsafe_b64encode(
+            json.dumps([
+                value.isoformat() if hasattr(value, "isoformat") else value
+                for value in position
+            ]).encode()
+        ).decode()
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            values = json.loads(urlsafe_b64decode(encoded.encode()))
+            fields = self.ordering_fields(model)
+            if len(values) != len(fields):
+                raise ValueError
+            return [
+                field.to_python(value)
+                for field, value in zip(fields, values)
+            ]
+        except (TypeError, ValueError, ValidationError, FieldDoesNotExist):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.encode_cursor(self.position_of(self.last)),
+        )
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
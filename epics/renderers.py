@@ -0,0 +1,46 @@
+"""
+JSON renderer encoding with orjson when it is installed.
+"""
+from rest_framework import renderers
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    """
+    `JSONRenderer` giving the same bytes through orjson for compact output
+    of data without floats (orjson writes exponents its own way). Values
+    orjson does not know are converted by the encoder of DRF, anything
+    else goes to `JSONRenderer`.
+    """
+    options = (
+        orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if orjson else 0
+    )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=self.options,
+            )
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # as JSONRenderer does, for javascript
+        return (
+            ret
+            .replace(b"\xe2\x80\xa8", b"\\u2028")
+            .replace(b"\xe2\x80\xa9", b"\\u2029")
+        )
@@ -1,8 +1,18 @@
+from django.urls import path
 from rest_framework import routers
 
-from .views import ContributorViewSet, EpicViewSet, UserStoryViewSet
+from .views import (
+    BatchView,
+    ContributorViewSet,
+    EpicViewSet,
+    UserStoryViewSet,
+)
 
 router = routers.DefaultRouter()
 router.register(r'contributors', ContributorViewSet)
 router.register(r'epics', EpicViewSet)
 router.register(r'stories', UserStoryViewSet)
+
+urlpatterns = router.urls + [
+    path('batch/', BatchView.as_view(), name='batch'),
+]
@@ -1,7 +1,70 @@
 from django.contrib.auth.models import User
 from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS
 
-from .models import Contributor, Epic, UserStory
+from .models import COMMANDS, Contributor, Epic, UserStory
+from .optimizer import CappedListMixin
+
+
+class CappedManyRelatedField(CappedListMixin, serializers.ManyRelatedField):
+    pass
+
+
+class CappedListSerializer(CappedListMixin, serializers.ListSerializer):
+    pass
+
+
+class CappedHyperlinkedRelatedField(serializers.HyperlinkedRelatedField):
+    """
+    Hyperlink whose lists (`many=True`) are capped.
+    """
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return CappedManyRelatedField(**list_kwargs)
+
+
+class SparseFieldsMixin:
+    """
+    Serializer shaped by the query of the request when it is the top one:
+    `fields` names the fields to keep and `expand` the fields of
+    `Meta.expandable` to nest rather than link, both comma separated.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is None or not self.is_top():
+            return fields
+        expandable = getattr(self.Meta, 'expandable', {})
+        for name in query_names(request, 'expand'):
+            if name in expandable:
+                fields[name] = expandable[name]()
+        only = query_names(request, 'fields')
+        if only:
+            fields = {
+                name: field for name, field in fields.items() if name in only
+            }
+        return fields
+
+    def is_top(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+
+def query_names(request, param):
+    return {
+        name.strip()
+        for value in request.query_params.getlist(param)
+        for name in value.split(',')
+        if name.strip()
+    }
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -27,7 +90,17 @@ class StatsSerializer(serializers.Serializer):
     total = serializers.IntegerField()
 
 
-class EpicSerializer(serializers.HyperlinkedModelSerializer):
+class LightEpicSerializer(serializers.HyperlinkedModelSerializer):
+
+    class Meta:
+        model = Epic
+        fields = ['url', 'id', 'pub_date', 'title']
+
+
+class EpicSerializer(SparseFieldsMixin,
+                     serializers.HyperlinkedModelSerializer):
+    serializer_related_field = CappedHyperlinkedRelatedField
+
     class Meta:
         model = Epic
         fields = [
@@ -41,11 +114,18 @@ class EpicSerializer(serializers.HyperlinkedModelSerializer):
             'stats',
         ]
         read_only_fields = ['pub_date', 'stories']
+        expandable = {
+            'stories': lambda: CappedListSerializer(
+                child=UserStorySerializer(),
+                read_only=True,
+            ),
+        }
     owner = LightContributorSerializer(read_only=True)
     stats = StatsSerializer(read_only=True)
 
 
-class UserStorySerializer(serializers.HyperlinkedModelSerializer):
+class UserStorySerializer(SparseFieldsMixin,
+                          serializers.HyperlinkedModelSerializer):
     class Meta:
         model = UserStory
         fields = [
@@ -65,11 +145,16 @@ class UserStorySerializer(serializers.HyperlinkedModelSerializer):
             'epic',
             'status',
         ]
+        expandable = {
+            'epic': lambda: LightEpicSerializer(read_only=True),
+        }
 
     assigned_to = LightContributorSerializer(read_only=True)
 
 
-class ContributorSerializer(serializers.HyperlinkedModelSerializer):
+class ContributorSerializer(SparseFieldsMixin,
+                            serializers.HyperlinkedModelSerializer):
+    serializer_related_field = CappedHyperlinkedRelatedField
 
     class Meta:
         model = Contributor
@@ -84,7 +169,42 @@ class ContributorSerializer(serializers.HyperlinkedModelSerializer):
             'stories_suspended',
         ]
         read_only_fields = ['id', 'epics', 'stories']
+        expandable = {
+            'epics': lambda: CappedListSerializer(
+                child=LightEpicSerializer(),
+                read_only=True,
+            ),
+            'stories': lambda: CappedListSerializer(
+                child=UserStorySerializer(),
+                read_only=True,
+            ),
+        }
 
     user = UserSerializer()
-    stories_in_progress = UserStorySerializer(many=True)
-    stories_suspended = UserStorySerializer(many=True)
+    stories_in_progress = CappedListSerializer(child=UserStorySerializer())
+    stories_suspended = CappedListSerializer(child=UserStorySerializer())
+
+
+class CommandSerializer(serializers.Serializer):
+    story = serializers.IntegerField()
+    action = serializers.ChoiceField(choices=COMMANDS)
+
+
+class BatchSerializer(serializers.Serializer):
+    """
+    Commands to run in order, all or nothing when `atomic`.
+    """
+    atomic = serializers.BooleanField(default=True)
+    commands = CommandSerializer(many=True, allow_empty=False)
+
+    def __init__(self, *args, max_commands=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['commands'].max_length = max_commands
+
+
+class CommandOutcomeSerializer(serializers.Serializer):
+    story = serializers.IntegerField()
+    action = serializers.CharField()
+    outcome = serializers.CharField()
+    detail = serializers.CharField()
+    status = serializers.CharField(allow_null=True)
@@ -2,3 +2,7 @@ from django.dispatch import Signal
 
 
 status_changed = Signal()
+
+# Sent once for many stories by the bulk workflow methods, with `changes`
+# being a list of (story id, new status) pairs.
+statuses_changed = Signal()
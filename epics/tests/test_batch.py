@@ -0,0 +1,171 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from epics.models import Contributor, Epic, StoryStatus, UserStory
+from tracking.models import StatusChange
+
+
+class BatchTestCase(TestCase):
+
+    def setUp(self):
+        self.po_user = User.objects.create(username="po_test")
+        self.product_owner = Contributor.objects.create(user=self.po_user)
+        self.dev_user = User.objects.create(username="dev_test")
+        self.dev = Contributor.objects.create(user=self.dev_user)
+        self.epic = self.product_owner.new_epic(
+            title="A new epic",
+            description="Build a django app.",
+        )
+        self.stories = [
+            self.product_owner.new_story(
+                epic=self.epic,
+                title=f"story {i}",
+                description="a test story",
+            )
+            for i in range(3)
+        ]
+        self.ids = [story.pk for story in self.stories]
+        self.client = APIClient()
+        self.client.force_authenticate(self.po_user)
+
+    def statuses(self):
+        return list(
+            UserStory.objects
+            .filter(pk__in=self.ids)
+            .order_by("pk")
+            .values_list("status", flat=True)
+        )
+
+    def batch(self, commands, **options):
+        return self.client.post(
+            "/epics-api/batch/",
+            {
+                "commands": [
+                    {"story": story, "action": action}
+                    for story, action in commands
+                ],
+                **options,
+            },
+            format="json",
+        )
+
+    def test_run_commands(self):
+        outcomes = self.product_owner.run_commands([
+            (self.ids[0], "take"),
+            (self.ids[0], "suspend"),
+            (self.ids[0], "resume"),
+            (self.ids[1], "validate"),
+        ])
+        self.assertEqual(
+            [(outcome.outcome, outcome.status) for outcome in outcomes],
+            [
+                ("applied", StoryStatus.IN_PROGRESS),
+                ("applied", StoryStatus.SUSPENDED),
+                ("applied", StoryStatus.IN_PROGRESS),
+                ("applied", StoryStatus.FINISHED),
+            ],
+        )
+        self.assertEqual(
+            self.statuses(),
+            [
+                StoryStatus.IN_PROGRESS,
+                StoryStatus.FINISHED,
+                StoryStatus.CREATED,
+            ],
+        )
+        self.assertEqual(
+            StatusChange.objects.filter(story=self.stories[0]).count(),
+            4,
+        )
+
+    def test_atomic_batch_rolls_back(self):
+        response = self.batch([
+            (self.ids[0], "cancel"),
+            (self.ids[1], "resume"),
+            (self.ids[2], "validate"),
+        ])
+        self.assertEqual(response.status_code, 420)
+        self.assertFalse(response.data["applied"])
+        self.assertEqual(
+            [result["outcome"] for result in response.data["results"]],
+            ["rolled back", "rejected", "skipped"],
+        )
+        self.assertEqual(
+            [result["status"] for result in response.data["results"]],
+            [StoryStatus.CREATED] * 3,
+        )
+        self.assertEqual(self.statuses(), [StoryStatus.CREATED] * 3)
+        self.assertEqual(Epic.objects.get(pk=self.epic.pk).stats.created, 3)
+        self.assertEqual(
+            StatusChange.objects.filter(story__in=self.ids).count(),
+            3,
+        )
+
+    def test_best_effort_batch(self):
+        response = self.batch(
+            [
+                (self.ids[0], "cancel"),
+                (self.ids[1], "resume"),
+                (0, "take"),
+                (self.ids[2], "validate"),
+            ],
+            atomic=False,
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.data["applied"])
+        self.assertEqual(
+            [
+                (result["outcome"], result["status"])
+                for result in response.data["results"]
+            ],
+            [
+                ("applied", StoryStatus.CANCELED),
+                ("rejected", StoryStatus.CREATED),
+                ("rejected", None),
+                ("applied", StoryStatus.FINISHED),
+            ],
+        )
+        self.assertEqual(response.data["results"][2]["detail"], "No story 0")
+        self.assertEqual(
+            self.statuses(),
+            [
+                StoryStatus.CANCELED,
+                StoryStatus.CREATED,
+                StoryStatus.FINISHED,
+            ],
+        )
+        stats = Epic.objects.get(pk=self.epic.pk).stats
+        self.assertEqual(stats.canceled, 1)
+        self.assertEqual(stats.finished, 1)
+
+    def test_stories_are_read_once(self):
+        self.client.force_authenticate(self.dev_user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.batch([(pk, "take") for pk in self.ids])
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data["applied"])
+        self.assertEqual(
+            len([
+                query for query in queries.captured_queries
+                if query["sql"].startswith("SELECT")
+                and 'FROM "epics_userstory"' in query["sql"]
+            ]),
+            1,
+        )
+        self.assertEqual(self.dev.stories.count(), 3)
+
+    def test_invalid_batch(self):
+        response = self.batch([(self.ids[0], "delete")])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("commands", response.data)
+        response = self.batch([])
+        self.assertEqual(response.status_code, 400)
+        response = self.batch([(self.ids[0], "take")] * 1001)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.statuses(), [StoryStatus.CREATED] * 3)
+        self.client.logout()
+        response = self.batch([(self.ids[0], "take")])
+        self.assertEqual(response.status_code, 403)
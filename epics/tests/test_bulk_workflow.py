@@ -0,0 +1,83 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from epics.models import Contributor, Epic, UserStory, StoryStatus
+
+
+class BulkWorkflowTestCase(TestCase):
+
+    def setUp(self):
+        self.po_user = User.objects.create(username="po_test")
+        self.product_owner = Contributor.objects.create(user=self.po_user)
+        self.dev1_user = User.objects.create(username="dev1_test")
+        self.dev1 = Contributor.objects.create(user=self.dev1_user)
+        self.epic = self.product_owner.new_epic(
+            title="A new epic",
+            description="Build a django app.",
+        )
+        self.stories = [
+            self.product_owner.new_story(
+                epic=self.epic,
+                title=f"story {i}",
+                description="a test story",
+            )
+            for i in range(4)
+        ]
+        self.ids = [story.pk for story in self.stories]
+
+    def statuses(self):
+        return list(
+            UserStory.objects
+            .filter(pk__in=self.ids)
+            .order_by("pk")
+            .values_list("status", flat=True)
+        )
+
+    def test_bulk_take(self):
+        result = self.dev1.bulk_take(self.ids[:2])
+        self.assertEqual(result.changed, self.ids[:2])
+        self.assertEqual(result.rejected, [])
+        self.assertEqual(self.dev1.stories.count(), 2)
+        self.assertEqual(
+            self.statuses(),
+            [StoryStatus.IN_PROGRESS] * 2 + [StoryStatus.CREATED] * 2,
+        )
+
+    def test_bulk_cancel_reports_rejected(self):
+        self.product_owner.validate(self.stories[0])
+        result = self.product_owner.bulk_cancel(
+            UserStory.objects.filter(pk__in=self.ids).order_by("pk")
+        )
+        self.assertEqual(result.changed, self.ids[1:])
+        self.assertEqual(result.rejected, self.ids[:1])
+        self.assertEqual(
+            self.statuses(),
+            [StoryStatus.FINISHED] + [StoryStatus.CANCELED] * 3,
+        )
+
+    def test_only_owner_can_bulk_validate(self):
+        result = self.dev1.bulk_validate(self.stories)
+        self.assertEqual(result.changed, [])
+        self.assertEqual(result.rejected, self.ids)
+        self.assertEqual(self.statuses(), [StoryStatus.CREATED] * 4)
+
+    def test_bulk_suspend_and_resume(self):
+        self.dev1.take(self.stories[0])
+        self.product_owner.bulk_suspend(self.ids)
+        self.assertEqual(self.statuses(), [StoryStatus.SUSPENDED] * 4)
+        result = self.product_owner.bulk_resume(self.ids + [0])
+        self.assertEqual(result.changed, self.ids)
+        self.assertEqual(result.rejected, [0])
+        self.assertEqual(
+            self.statuses(),
+            [StoryStatus.IN_PROGRESS] + [StoryStatus.CREATED] * 3,
+        )
+
+    def test_bulk_transition_updates_counters(self):
+        self.dev1.bulk_take(self.ids[:1])
+        self.product_owner.bulk_validate(self.ids[1:3])
+        stats = Epic.objects.get(pk=self.epic.pk).stats
+        self.assertEqual(stats.created, 1)
+        self.assertEqual(stats.in_progress, 1)
+        self.assertEqual(stats.finished, 2)
+        self.assertEqual(stats.total, 4)
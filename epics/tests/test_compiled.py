@@ -0,0 +1,120 @@
+from unittest import skipIf
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework.request import Request
+
+from epics.compiled import compile_serializer
+from epics.models import Contributor, Epic
+from epics.renderers import FastJSONRenderer, orjson
+from epics.serializers import (
+    ContributorSerializer,
+    EpicSerializer,
+    UserStorySerializer,
+)
+
+
+@override_settings(EPICS_CACHE_ENABLED=False)
+class CompiledSerializerTestCase(TestCase):
+
+    def setUp(self):
+        self.po_user = User.objects.create(
+            username="po_test",
+            first_name="Zoé",
+            last_name="Ünal",
+        )
+        self.product_owner = Contributor.objects.create(user=self.po_user)
+        self.dev_user = User.objects.create(username="dev_test")
+        self.dev = Contributor.objects.create(user=self.dev_user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.po_user)
+        for i in range(3):
+            epic = self.product_owner.new_epic(
+                title=f"epic {i} ✓",
+                description="line\u2028separated </script>",
+            )
+            for j in range(i + 1):
+                story = self.product_owner.new_story(
+                    epic=epic,
+                    title=f"story {i}.{j}",
+                    description="a test story",
+                )
+            self.dev.take(story)
+        # an epic which lost its counters
+        Epic.objects.bulk_create([
+            Epic(
+                title="epic without counters",
+                description="test epic",
+                owner=self.dev,
+            ),
+        ])
+
+    def test_compiles(self):
+        request = Request(APIRequestFactory().get("/"))
+        context = {"request": request}
+        self.assertIsNotNone(compile_serializer(EpicSerializer(context=context)))
+        self.assertIsNotNone(
+            compile_serializer(UserStorySerializer(context=context))
+        )
+        # lists of nested stories
+        self.assertIsNone(
+            compile_serializer(ContributorSerializer(context=context))
+        )
+
+    def test_same_bytes_as_the_serializers(self):
+        # the versions, the rows and the story lists of the epics
+        for url, queries in (
+            ("/epics-api/epics/", 3),
+            ("/epics-api/epics/?page_size=2", 3),
+            ("/epics-api/epics/?fields=id,stats", 2),
+            ("/epics-api/epics/?fields=id,stories&expand=stories", 3),
+            ("/epics-api/stories/", 2),
+            ("/epics-api/stories/?page_size=3&fields=url,assigned_to", 2),
+            ("/epics-api/stories.json?expand=epic", 2),
+        ):
+            with self.subTest(url=url):
+                with self.assertNumQueries(queries):
+                    compiled = self.client.get(url)
+                self.assertEqual(compiled.status_code, 200)
+                with override_settings(EPICS_API_COMPILED_SERIALIZERS=False):
+                    expected = self.client.get(url)
+                self.assertEqual(compiled.content, expected.content)
+                self.assertEqual(
+                    compiled.content,
+                    JSONRenderer().render(expected.data),
+                )
+                if "page_size" in url:
+                    next_url = compiled.data["next"]
+                    with override_settings(
+                        EPICS_API_COMPILED_SERIALIZERS=False,
+                    ):
+                        self.assertEqual(
+                            self.client.get(next_url).content,
+                            self.client.get(next_url).content,
+                        )
+                    self.assertEqual(next_url, expected.data["next"])
+
+    @skipIf(
+        orjson is None,
+        "orjson is not installed: FastJSONRenderer falls back to "
+        "JSONRenderer and its orjson path is NOT tested",
+    )
+    def test_renderer(self):
+        data = {
+            "title": "epic ✓\u2028\u2029",
+            "count": 3,
+            "done": False,
+            "owner": None,
+            "stories": [{"id": 1}, {"id": 2}],
+        }
+        self.assertEqual(
+            FastJSONRenderer().render(data),
+            JSONRenderer().render(data),
+        )
+        self.assertEqual(
+            FastJSONRenderer().render(data, "application/json; indent=2"),
+            JSONRenderer().render(data, "application/json; indent=2"),
+        )
+        self.assertEqual(FastJSONRenderer().render(None), b"")
@@ -0,0 +1,219 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from epics.conditional import response_cache
+from epics.models import Contributor
+
+
+class ConditionalGetTestCase(TestCase):
+
+    def setUp(self):
+        self.po_user = User.objects.create(username="po_test")
+        self.product_owner = Contributor.objects.create(user=self.po_user)
+        self.dev_user = User.objects.create(username="dev_test")
+        self.dev = Contributor.objects.create(user=self.dev_user)
+        self.epic = self.product_owner.new_epic(
+            title="Test epic",
+            description="test epic",
+        )
+        self.story = self.product_owner.new_story(
+            epic=self.epic,
+            title="a new story",
+            description="a test story",
+        )
+
+    def assertRevalidates(self, client, url, change, queries=1):
+        response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("private", response["Cache-Control"])
+        self.assertNotIn("no-store", response["Cache-Control"])
+        etag = response["ETag"]
+        with self.assertNumQueries(queries):
+            response = client.get(url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 304)
+        change()
+        response = client.get(url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        return response["ETag"]
+
+    def test_api_etags(self):
+        client = APIClient()
+        client.force_authenticate(self.po_user)
+        changes = iter([
+            lambda: self.dev.take(self.story),
+            lambda: self.product_owner.suspend(self.story),
+            lambda: self.product_owner.new_story(
+                epic=self.epic,
+                title="another story",
+                description="a test story",
+            ),
+            lambda: self.product_owner.new_epic(
+                title="another epic",
+                description="test epic",
+            ),
+            lambda: self.product_owner.resume(self.story),
+        ])
+        for url in (
+            f"/epics-api/epics/{self.epic.pk}/",
+            f"/epics-api/stories/{self.story.pk}/",
+            "/epics-api/epics/",
+            "/epics-api/stories/",
+            "/epics-api/contributors/",
+        ):
+            with self.subTest(url=url):
+                self.assertRevalidates(client, url, next(changes))
+        etag = client.get("/epics-api/epics/").headers["ETag"]
+        self.assertNotEqual(
+            client.get("/epics-api/epics/?fields=id").headers["ETag"],
+            etag,
+        )
+        self.assertEqual(
+            client.get("/epics-api/epics/0/").status_code,
+            404,
+        )
+
+    def test_profile_changes_etags(self):
+        client = APIClient()
+        client.force_authenticate(self.po_user)
+        self.dev.take(self.story)
+        for url, change in (
+            (
+                "/epics-api/contributors/",
+                lambda: self.rename(self.po_user, "Po"),
+            ),
+            (
+                f"/epics-api/epics/{self.epic.pk}/",
+                lambda: self.rename(self.po_user, "P"),
+            ),
+            (
+                f"/epics-api/stories/{self.story.pk}/",
+                lambda: self.rename(self.dev_user, "D"),
+            ),
+            (
+                "/epics-api/stories/",
+                lambda: self.rename(self.dev_user, "Dev"),
+            ),
+            ("/epics-api/epics/", self.dev.save),
+        ):
+            with self.subTest(url=url):
+                self.assertRevalidates(client, url, change)
+        # logins do not change what is serialized
+        url = f"/epics-api/stories/{self.story.pk}/"
+        etag = client.get(url).headers["ETag"]
+        self.client.force_login(self.dev_user)
+        response = client.get(url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 304)
+
+    def test_page_etags(self):
+        self.client.force_login(self.po_user)
+        for url, change in (
+            (
+                f"/epic/{self.epic.pk}",
+                lambda: self.dev.take(self.story),
+            ),
+            (
+                f"/story/{self.story.pk}",
+                lambda: self.product_owner.suspend(self.story),
+            ),
+            (
+                "/",
+                lambda: self.product_owner.new_epic(
+                    title="another epic",
+                    description="test epic",
+                ),
+            ),
+        ):
+            with self.subTest(url=url):
+                etag = self.assertRevalidates(
+                    self.client,
+                    url,
+                    change,
+                    # session and user, then the version
+                    queries=3,
+                )
+                self.client.force_login(self.dev_user)
+                response = self.client.get(
+                    url,
+                    headers={"if-none-match": etag},
+                )
+                self.assertEqual(response.status_code, 200)
+                self.client.force_login(self.po_user)
+
+    def test_page_etags_follow_retakes(self):
+        other_dev = Contributor.objects.create(
+            user=User.objects.create(username="other_dev_test"),
+        )
+        self.dev.take(self.story)
+        self.client.force_login(self.po_user)
+        for url, contributor in (
+            (f"/story/{self.story.pk}", other_dev),
+            (f"/epic/{self.epic.pk}", self.dev),
+        ):
+            with self.subTest(url=url):
+                self.assertRevalidates(
+                    self.client,
+                    url,
+                    lambda: contributor.take(self.story),
+                    queries=3,
+                )
+        response = self.client.get(f"/story/{self.story.pk}")
+        self.assertContains(response, "dev_test")
+        self.assertNotContains(response, "other_dev_test")
+
+    def rename(self, user, first_name):
+        user.first_name = first_name
+        user.save()
+
+    def test_response_cache(self):
+        client = APIClient()
+        client.force_authenticate(self.po_user)
+        other_client = APIClient()
+        other_client.force_authenticate(self.dev_user)
+        for url, change in (
+            (
+                f"/epics-api/epics/{self.epic.pk}/",
+                lambda: self.dev.take(self.story),
+            ),
+            # an assignment only: the story stays in progress
+            (
+                f"/epics-api/stories/{self.story.pk}/?fields=assigned_to",
+                lambda: Contributor.objects.create(
+                    user=User.objects.create(username="other_dev_test"),
+                ).take(self.story),
+            ),
+            (
+                "/epics-api/stories/?fields=title,status",
+                lambda: self.product_owner.cancel(self.story),
+            ),
+            (
+                f"/epics-api/epics/{self.epic.pk}/?fields=owner",
+                lambda: self.rename(self.po_user, "Po"),
+            ),
+            (
+                "/epics-api/contributors/?fields=fullname",
+                lambda: self.rename(self.dev_user, "Dev"),
+            ),
+        ):
+            with self.subTest(url=url):
+                response = client.get(url)
+                response_cache.reset_counters()
+                with self.assertNumQueries(1):
+                    cached = other_client.get(url)
+                self.assertEqual(response_cache.hits, 1)
+                self.assertEqual(cached.content, response.content)
+                change()
+                self.assertNotEqual(
+                    client.get(url).content,
+                    response.content,
+                )
+
+    @override_settings(EPICS_CACHE_ENABLED=False)
+    def test_without_response_cache(self):
+        client = APIClient()
+        client.force_authenticate(self.po_user)
+        url = f"/epics-api/stories/{self.story.pk}/"
+        response = client.get(url)
+        with self.assertNumQueries(2):
+            self.assertEqual(client.get(url).content, response.content)
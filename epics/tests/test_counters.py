@@ -0,0 +1,177 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from epics.models import (
+    Contributor,
+    DataVersion,
+    Epic,
+    EpicCounters,
+    StoryStatus,
+    UserStory,
+)
+
+
+class EpicCountersTestCase(TestCase):
+
+    def setUp(self):
+        self.po_user = User.objects.create(username="po_test")
+        self.product_owner = Contributor.objects.create(user=self.po_user)
+        self.dev1_user = User.objects.create(username="dev1_test")
+        self.dev1 = Contributor.objects.create(user=self.dev1_user)
+        self.epic = self.product_owner.new_epic(
+            title="A new epic",
+            description="Build a django app.",
+        )
+
+    def new_story(self, title):
+        return self.product_owner.new_story(
+            epic=self.epic,
+            title=title,
+            description="a test story",
+        )
+
+    def test_new_epic_has_counters(self):
+        self.assertTrue(
+            EpicCounters.objects.filter(epic=self.epic).exists()
+        )
+        self.assertEqual(self.epic.stats.total, 0)
+
+    def test_workflow_updates_counters(self):
+        us1 = self.new_story("us1")
+        us2 = self.new_story("us2")
+        us3 = self.new_story("us3")
+        us4 = self.new_story("us4")
+        stats = Epic.objects.get(pk=self.epic.pk).stats
+        self.assertEqual(stats.created, 4)
+        self.assertEqual(stats.total, 4)
+        self.dev1.take(us1)
+        self.dev1.take(us2)
+        self.product_owner.suspend(us2)
+        self.product_owner.cancel(us3)
+        self.product_owner.validate(us4)
+        stats = Epic.objects.get(pk=self.epic.pk).stats
+        self.assertEqual(stats.created, 0)
+        self.assertEqual(stats.in_progress, 1)
+        self.assertEqual(stats.suspended, 1)
+        self.assertEqual(stats.canceled, 1)
+        self.assertEqual(stats.finished, 1)
+        self.product_owner.resume(us2)
+        stats = Epic.objects.get(pk=self.epic.pk).stats
+        self.assertEqual(stats.in_progress, 2)
+        self.assertEqual(stats.suspended, 0)
+        self.assertEqual(stats.total, 4)
+
+    def test_version_changes_with_stories(self):
+        def version():
+            return EpicCounters.versions([self.epic.pk])[self.epic.pk]
+
+        versions = [version()]
+        us1 = self.new_story("us1")
+        versions.append(version())
+        self.dev1.take(us1)
+        versions.append(version())
+        self.product_owner.bulk_validate([us1.pk])
+        versions.append(version())
+        us1.delete()
+        versions.append(version())
+        self.assertEqual(len(set(versions)), 5)
+
+    def test_version_changes_without_count_changes(self):
+        dev2 = Contributor.objects.create(
+            user=User.objects.create(username="dev2_test"),
+        )
+        us1 = self.new_story("us1")
+        self.dev1.take(us1)
+        client = APIClient()
+        client.force_authenticate(self.po_user)
+        url = f"/epics-api/stories/{us1.pk}/"
+        response = client.get(url)
+        self.assertEqual(response.data["assigned_to"]["id"], self.dev1.pk)
+        etag = response["ETag"]
+        version = EpicCounters.versions([self.epic.pk])[self.epic.pk]
+
+        dev2.take(us1)
+        self.assertNotEqual(
+            EpicCounters.versions([self.epic.pk])[self.epic.pk],
+            version,
+        )
+        response = client.get(url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+        # not served from the response cache
+        self.assertEqual(response.data["assigned_to"]["id"], dev2.pk)
+
+        for change in (
+            lambda: self.dev1.bulk_take([us1.pk]),
+            lambda: UserStory.objects.get(pk=us1.pk).save(),
+            lambda: UserStory(
+                pk=us1.pk,
+                epic=self.epic,
+                title="renamed",
+            ).save(update_fields=["title"]),
+        ):
+            version = EpicCounters.versions([self.epic.pk])[self.epic.pk]
+            change()
+            self.assertNotEqual(
+                EpicCounters.versions([self.epic.pk])[self.epic.pk],
+                version,
+            )
+        self.assertEqual(client.get(url).data["title"], "renamed")
+
+    def test_data_version(self):
+        versions = [DataVersion.current()]
+
+        def changed():
+            versions.append(DataVersion.current())
+            return len(set(versions)) == len(versions)
+
+        us1 = self.new_story("us1")
+        self.assertTrue(changed())
+        self.dev1.take(us1)
+        self.assertTrue(changed())
+        epic = self.product_owner.new_epic(title="e", description="d")
+        self.assertTrue(changed())
+        epic.delete()
+        self.assertTrue(changed())
+        contributor = Contributor.objects.create(
+            user=User.objects.create(username="dev2_test"),
+        )
+        self.assertTrue(changed())
+        contributor.user.first_name = "Dev"
+        contributor.user.save()
+        self.assertTrue(changed())
+        contributor.delete()
+        self.assertTrue(changed())
+        # one row read, nothing aggregated
+        with self.assertNumQueries(1):
+            self.assertEqual(EpicCounters.combined_version(), versions[-1])
+
+    def test_stats_read_without_aggregate(self):
+        self.new_story("us1")
+        epic = Epic.objects.select_related("counters").get(pk=self.epic.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(epic.stats.created, 1)
+
+    def test_deleted_story_is_discounted(self):
+        us1 = self.new_story("us1")
+        self.new_story("us2")
+        us1.delete()
+        stats = Epic.objects.get(pk=self.epic.pk).stats
+        self.assertEqual(stats.created, 1)
+        self.assertEqual(stats.total, 1)
+
+    def test_rebuild_command(self):
+        self.new_story("us1")
+        self.new_story("us2")
+        UserStory.objects.update(status=StoryStatus.FINISHED)
+        with self.assertRaises(CommandError):
+            call_command("rebuild_epic_counters", check=True, stdout=StringIO())
+        call_command("rebuild_epic_counters", stdout=StringIO())
+        stats = Epic.objects.get(pk=self.epic.pk).stats
+        self.assertEqual(stats.created, 0)
+        self.assertEqual(stats.finished, 2)
+        call_command("rebuild_epic_counters", check=True, stdout=StringIO())
@@ -0,0 +1,124 @@
+from datetime import datetime, timezone
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from epics.models import Contributor, Epic, StoryStatus, UserStory
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+class FilterTestCase(TestCase):
+
+    def setUp(self):
+        self.po_user = User.objects.create(username="po_test")
+        self.product_owner = Contributor.objects.create(user=self.po_user)
+        self.dev_user = User.objects.create(username="dev_test")
+        self.dev = Contributor.objects.create(user=self.dev_user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.po_user)
+        self.epics = [
+            Epic.objects.create(
+                title=title,
+                description="test epic",
+                owner=owner,
+                pub_date=utc(2024, 5, day),
+            )
+            for title, owner, day in (
+                ("b epic", self.product_owner, 1),
+                ("a epic", self.dev, 2),
+                ("c epic", self.product_owner, 3),
+            )
+        ]
+        self.stories = {}
+        for day, (title, status, assigned_to) in enumerate(
+            (
+                ("story b", StoryStatus.CREATED, None),
+                ("story d", StoryStatus.IN_PROGRESS, self.dev),
+                ("story a", StoryStatus.SUSPENDED, self.dev),
+                ("story c", StoryStatus.IN_PROGRESS, self.product_owner),
+                ("story e", StoryStatus.CREATED, None),
+            ),
+            start=1,
+        ):
+            self.stories[title] = UserStory.objects.create(
+                epic=self.epics[day % 2],
+                title=title,
+                description="a test story",
+                status=status,
+                assigned_to=assigned_to,
+                pub_date=utc(2024, 5, day),
+            )
+
+    def titles(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [item["title"] for item in response.data["results"]]
+
+    def test_story_filters(self):
+        url = "/epics-api/stories/"
+        self.assertEqual(
+            self.titles(f"{url}?status=in progress"),
+            ["story c", "story d"],
+        )
+        self.assertEqual(
+            self.titles(f"{url}?status__in=suspended,created"),
+            ["story e", "story a", "story b"],
+        )
+        self.assertEqual(
+            self.titles(f"{url}?assigned_to={self.dev.pk}"),
+            ["story a", "story d"],
+        )
+        self.assertEqual(
+            self.titles(f"{url}?assigned_to__isnull=true"),
+            ["story e", "story b"],
+        )
+        self.assertEqual(
+            self.titles(f"{url}?epic={self.epics[1].pk}&status=created"),
+            ["story e", "story b"],
+        )
+        self.assertEqual(
+            self.titles(
+                f"{url}?pub_date__gte=2024-05-02&pub_date__lt=2024-05-05"
+            ),
+            ["story c", "story a", "story d"],
+        )
+        response = self.client.get(f"{url}?status=unknown")
+        self.assertEqual(response.status_code, 400)
+
+    def test_epic_filters(self):
+        url = "/epics-api/epics/"
+        self.assertEqual(
+            self.titles(f"{url}?owner={self.product_owner.pk}"),
+            ["c epic", "b epic"],
+        )
+        self.assertEqual(
+            self.titles(f"{url}?pub_date__lt=2024-05-03"),
+            ["a epic", "b epic"],
+        )
+
+    def test_ordering(self):
+        self.assertEqual(
+            self.titles("/epics-api/epics/?ordering=title"),
+            ["a epic", "b epic", "c epic"],
+        )
+        # not whitelisted
+        self.assertEqual(
+            self.titles("/epics-api/epics/?ordering=description"),
+            ["c epic", "a epic", "b epic"],
+        )
+        pages = []
+        url = "/epics-api/stories/?ordering=status,-title&page_size=2"
+        while url:
+            response = self.client.get(url)
+            pages.append(
+                [story["title"] for story in response.data["results"]]
+            )
+            url = response.data["next"]
+        self.assertEqual(
+            pages,
+            [["story e", "story b"], ["story d", "story c"], ["story a"]],
+        )
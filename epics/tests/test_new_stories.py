@@ -0,0 +1,91 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from epics.exceptions import BadCommand
+from epics.models import Contributor, Epic, StoryStatus, UserStory
+from tracking.models import CurrentInterval, StatusChange
+
+
+class NewStoriesTestCase(TestCase):
+
+    def setUp(self):
+        self.po_user = User.objects.create(username="po_test")
+        self.product_owner = Contributor.objects.create(user=self.po_user)
+        self.dev_user = User.objects.create(username="dev_test")
+        self.dev = Contributor.objects.create(user=self.dev_user)
+        self.epic = Epic.objects.create(
+            title="Test epic",
+            description="test epic",
+            owner=self.product_owner,
+        )
+        self.url = f"/epics-api/epics/{self.epic.pk}/new_stories/"
+
+    def backlog(self, size):
+        return [
+            {"title": f"story {i}", "description": "a test story"}
+            for i in range(size)
+        ]
+
+    def test_new_stories(self):
+        stories = self.product_owner.new_stories(self.epic, self.backlog(3))
+        self.assertEqual(
+            [story.title for story in stories],
+            ["story 0", "story 1", "story 2"],
+        )
+        self.assertEqual(Epic.objects.get(pk=self.epic.pk).stats.created, 3)
+        for story in stories:
+            change = StatusChange.objects.get(story=story)
+            self.assertEqual(change.new_status, StoryStatus.CREATED)
+            self.assertEqual(change.contributor, self.product_owner)
+            self.assertIsNone(change.duration)
+            self.assertEqual(CurrentInterval.objects.get(story=story).change,
+                             change)
+        self.dev.take(stories[0])
+        change = StatusChange.objects.get(
+            story=stories[0],
+            new_status=StoryStatus.CREATED,
+        )
+        self.assertIsNotNone(change.duration)
+        with self.assertRaises(BadCommand):
+            self.dev.new_stories(self.epic, self.backlog(1))
+        self.assertEqual(self.product_owner.new_stories(self.epic, []), [])
+
+    def test_queries_do_not_depend_on_size(self):
+        # new stories have no interval pointer, tracking looks for a last
+        # change to close once for all of them
+        with self.assertNumQueries(13):
+            self.product_owner.new_stories(self.epic, self.backlog(2))
+        with self.assertNumQueries(13):
+            self.product_owner.new_stories(self.epic, self.backlog(50))
+        self.assertEqual(UserStory.objects.count(), 52)
+        self.assertEqual(StatusChange.objects.count(), 52)
+
+    def test_new_stories_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.po_user)
+        response = client.post(self.url, self.backlog(3), format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            [story["title"] for story in response.data],
+            ["story 0", "story 1", "story 2"],
+        )
+        self.assertEqual(
+            [story["status"] for story in response.data],
+            [StoryStatus.CREATED] * 3,
+        )
+
+        backlog = self.backlog(3)
+        backlog[1]["title"] = ""
+        response = client.post(self.url, backlog, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data[0], {})
+        self.assertIn("title", response.data[1])
+        self.assertEqual(UserStory.objects.count(), 3)
+
+        response = client.post(self.url, {"title": "a"}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+        client.force_authenticate(self.dev_user)
+        response = client.post(self.url, self.backlog(1), format="json")
+        self.assertEqual(response.status_code, 403)
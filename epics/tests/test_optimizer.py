@@ -0,0 +1,101 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from epics.models import Contributor, StoryStatus
+from epics.optimizer import optimize
+from epics.serializers import ContributorSerializer
+
+
+class QuerysetOptimizerTestCase(TestCase):
+
+    def setUp(self):
+        self.po_user = User.objects.create(username="po_test")
+        self.product_owner = Contributor.objects.create(user=self.po_user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.po_user)
+
+    def add_team(self, size):
+        """
+        Add an epic of `size` stories, taken by `size` developers, every
+        other one suspended.
+        """
+        epic = self.product_owner.new_epic(
+            title="Test epic",
+            description="test epic",
+        )
+        for i in range(size):
+            user = User.objects.create(
+                username=f"dev{Contributor.objects.count()}_test",
+            )
+            developer = Contributor.objects.create(user=user)
+            story = self.product_owner.new_story(
+                epic=epic,
+                title=f"story {i}",
+                description="a test story",
+            )
+            developer.take(story)
+            if i % 2:
+                self.product_owner.suspend(story)
+
+    def queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response.data
+
+    def test_list_queries_do_not_depend_on_size(self):
+        self.add_team(2)
+        counts = {
+            url: self.queries(url)[0]
+            for url in (
+                "/epics-api/contributors/",
+                "/epics-api/epics/",
+                "/epics-api/stories/",
+            )
+        }
+        self.add_team(6)
+        for url, count in counts.items():
+            with self.subTest(url=url):
+                self.assertEqual(self.queries(url)[0], count)
+
+    def test_prefetched_subsets(self):
+        self.add_team(4)
+        contributors = optimize(
+            Contributor.objects.order_by("user__username"),
+            ContributorSerializer(context={"request": None}),
+        )
+        with self.assertNumQueries(5):
+            self.assertEqual(
+                [
+                    (
+                        len(contributor.stories_in_progress),
+                        len(contributor.stories_suspended),
+                    )
+                    for contributor in contributors
+                ],
+                [(1, 0), (0, 1), (1, 0), (0, 1), (0, 0)],
+            )
+        # the same QuerySets, prefetched or not
+        prefetched = contributors[0].stories_in_progress
+        with self.assertNumQueries(0):
+            self.assertEqual(prefetched.count(), 1)
+            self.assertEqual(prefetched[0].status, StoryStatus.IN_PROGRESS)
+        with self.assertNumQueries(1):
+            self.assertFalse(
+                prefetched.filter(status=StoryStatus.SUSPENDED).exists()
+            )
+        developer = Contributor.objects.get(user__username="dev1_test")
+        self.assertEqual(
+            developer.stories_in_progress.get().status,
+            StoryStatus.IN_PROGRESS,
+        )
+        _, data = self.queries(f"/epics-api/contributors/{developer.pk}/")
+        self.assertEqual(
+            [story["title"] for story in data["stories_in_progress"]],
+            ["story 0"],
+        )
+        self.assertEqual(data["stories_suspended"], [])
+        self.assertEqual(len(data["stories"]), 1)
@@ -0,0 +1,93 @@
+from datetime import datetime, timezone
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from epics.models import Contributor, Epic, UserStory
+
+
+class PaginationTestCase(TestCase):
+
+    def setUp(self):
+        self.po_user = User.objects.create(username="po_test")
+        self.product_owner = Contributor.objects.create(user=self.po_user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.po_user)
+        # epics published in pairs at the same time
+        self.epics = [
+            Epic.objects.create(
+                title=f"epic {i}",
+                description="test epic",
+                owner=self.product_owner,
+                pub_date=datetime(2024, 5, 1 + i // 2, tzinfo=timezone.utc),
+            )
+            for i in range(5)
+        ]
+
+    def read_all(self, url):
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append(response.data["results"])
+            url = response.data["next"]
+        return pages
+
+    def test_epics_are_paginated_by_date_and_id(self):
+        pages = self.read_all("/epics-api/epics/?page_size=2")
+        self.assertEqual(
+            [[epic["title"] for epic in page] for page in pages],
+            [["epic 4", "epic 2"], ["epic 3", "epic 0"], ["epic 1"]],
+        )
+
+    def test_contributors_are_paginated_by_username(self):
+        for name in ("carol", "alice", "bob"):
+            Contributor.objects.create(
+                user=User.objects.create(username=name),
+            )
+        pages = self.read_all("/epics-api/contributors/?page_size=3")
+        self.assertEqual(
+            [
+                [contributor["user"]["username"] for contributor in page]
+                for page in pages
+            ],
+            [["alice", "bob", "carol"], ["po_test"]],
+        )
+
+    @override_settings(EPICS_API_NESTED_LIMIT=3)
+    def test_nested_lists_are_capped(self):
+        epic = self.epics[0]
+        for i in range(5):
+            UserStory.objects.create(
+                epic=epic,
+                title=f"story {i}",
+                description="a test story",
+            )
+        recent = list(
+            UserStory.objects.filter(epic=epic)
+            .order_by("-pk")
+            .values_list("pk", flat=True)[:3]
+        )
+        for url in (
+            "/epics-api/epics/?page_size=1000",
+            f"/epics-api/epics/{epic.pk}/",
+        ):
+            with self.subTest(url=url):
+                data = self.client.get(url).data
+                if "results" in data:
+                    data, = [
+                        item for item in data["results"]
+                        if item["id"] == epic.pk
+                    ]
+                self.assertEqual(
+                    [
+                        int(story.rstrip("/").rsplit("/", 1)[-1])
+                        for story in data["stories"]
+                    ],
+                    recent,
+                )
+        data = self.client.get(
+            f"/epics-api/contributors/{self.product_owner.pk}/"
+        ).data
+        self.assertEqual(len(data["epics"]), 3)
@@ -0,0 +1,120 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from epics.models import Contributor
+
+
+class SparseFieldsTestCase(TestCase):
+
+    def setUp(self):
+        self.po_user = User.objects.create(username="po_test")
+        self.product_owner = Contributor.objects.create(user=self.po_user)
+        self.dev_user = User.objects.create(
+            username="dev_test",
+            first_name="Dev",
+        )
+        self.dev = Contributor.objects.create(user=self.dev_user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.po_user)
+        for i in range(3):
+            epic = self.product_owner.new_epic(
+                title=f"epic {i}",
+                description="test epic",
+            )
+            for j in range(2):
+                story = self.product_owner.new_story(
+                    epic=epic,
+                    title=f"story {i}.{j}",
+                    description="a test story",
+                )
+            self.dev.take(story)
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.data["results"], [
+            query["sql"] for query in queries.captured_queries
+        ]
+
+    def test_default_fields(self):
+        epics, _ = self.get("/epics-api/epics/")
+        self.assertEqual(
+            list(epics[0]),
+            [
+                "id",
+                "url",
+                "pub_date",
+                "title",
+                "description",
+                "owner",
+                "stories",
+                "stats",
+            ],
+        )
+        self.assertEqual(epics[0]["stats"]["in_progress"], 1)
+
+    def test_fields_not_requested_are_not_queried(self):
+        epics, queries = self.get("/epics-api/epics/?fields=id,title")
+        self.assertEqual(
+            [list(epic) for epic in epics],
+            [["id", "title"]] * 3,
+        )
+        # the versions lookup, then the epics
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn("epiccounters", queries[1])
+        self.assertNotIn("auth_user", queries[1])
+
+        epics, queries = self.get("/epics-api/epics/?fields=title&fields=stats")
+        self.assertEqual(epics[0]["stats"]["total"], 2)
+        self.assertEqual(len(queries), 2)
+        self.assertIn("epiccounters", queries[1])
+
+        contributors, queries = self.get(
+            "/epics-api/contributors/?fields=fullname"
+        )
+        self.assertEqual(
+            contributors,
+            [{"fullname": "Dev"}, {"fullname": "po_test"}],
+        )
+        # the data version, then the contributors with their users
+        self.assertEqual(len(queries), 2)
+
+    def test_expand(self):
+        epics, queries = self.get("/epics-api/epics/?fields=title,stories"
+                                  "&expand=stories")
+        self.assertEqual(
+            [
+                sorted(story["title"] for story in epic["stories"])
+                for epic in epics
+            ],
+            [
+                ["story 2.0", "story 2.1"],
+                ["story 1.0", "story 1.1"],
+                ["story 0.0", "story 0.1"],
+            ],
+        )
+        self.assertEqual(
+            epics[0]["stories"][0]["assigned_to"]["fullname"],
+            "Dev",
+        )
+        self.assertEqual(len(queries), 3)
+
+        stories, queries = self.get("/epics-api/stories/?expand=epic")
+        self.assertEqual(
+            {story["title"]: story["epic"]["title"] for story in stories},
+            {f"story {i}.{j}": f"epic {i}" for i in range(3) for j in range(2)},
+        )
+        self.assertEqual(len(queries), 2)
+
+        contributors, queries = self.get(
+            "/epics-api/contributors/?fields=epics&expand=epics,unknown"
+        )
+        self.assertEqual(
+            [len(contributor["epics"]) for contributor in contributors],
+            [0, 3],
+        )
+        self.assertEqual(contributors[1]["epics"][0]["title"], "epic 2")
@@ -1,5 +1,7 @@
 from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 from epics.models import Contributor, Epic, UserStory, StoryStatus
@@ -400,3 +402,42 @@ class WorkflowTestCase(TestCase):
         with self.assertRaises(BadCommand):
             self.dev1.take(us)
         self.assertEqual(us.status, StoryStatus.FINISHED)
+
+    def test_concurrent_take_is_refused(self):
+        epic = self.product_owner.new_epic(
+            title="A new epic",
+            description="Build a django app.",
+        )
+        us = self.product_owner.new_story(
+            epic=epic,
+            title="Build the model",
+            description="A good app needs a good model.",
+        )
+        same_us = UserStory.objects.get(pk=us.pk)
+        self.dev1.take(us)
+        with self.assertRaises(BadCommand):
+            self.dev2.take(same_us)
+        us.refresh_from_db()
+        self.assertEqual(us.assigned_to, self.dev1)
+        self.assertEqual(self.dev2.stories.count(), 0)
+        self.assertEqual(Epic.objects.get(pk=epic.pk).stats.in_progress, 1)
+
+    def test_transition_only_writes_changed_fields(self):
+        epic = self.product_owner.new_epic(
+            title="A new epic",
+            description="Build a django app.",
+        )
+        us = self.product_owner.new_story(
+            epic=epic,
+            title="Build the model",
+            description="A good app needs a good model.",
+        )
+        with CaptureQueriesContext(connection) as queries:
+            self.dev1.take(us)
+        story_writes = [
+            query["sql"] for query in queries.captured_queries
+            if query["sql"].startswith('UPDATE "epics_userstory"')
+        ]
+        self.assertEqual(len(story_writes), 1)
+        self.assertNotIn("description", story_writes[0])
+        self.assertIn('"status" = ', story_writes[0])
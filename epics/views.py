@@ -1,21 +1,56 @@
 from django.contrib.auth.models import User
-from rest_framework import permissions, viewsets, status, exceptions, serializers
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import (
+    exceptions,
+    generics,
+    permissions,
+    serializers,
+    status,
+    viewsets,
+)
+from rest_framework.filters import OrderingFilter
 from rest_framework.decorators import action
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.response import Response
 
+from .compiled import CompiledListMixin
+from .conditional import ConditionalGetMixin
 from .exceptions import BadCommand, APIBadCommand
-from .models import Contributor, Epic, UserStory
-from .serializers import ContributorSerializer, EpicSerializer, UserStorySerializer
+from .filters import EpicFilter, UserStoryFilter
+from .models import (
+    CommandOutcome,
+    Contributor,
+    DataVersion,
+    Epic,
+    EpicCounters,
+    UserStory,
+)
+from .optimizer import OptimizedQuerysetMixin
+from .renderers import FastJSONRenderer
+from .serializers import (
+    BatchSerializer,
+    CommandOutcomeSerializer,
+    ContributorSerializer,
+    EpicSerializer,
+    UserStorySerializer,
+)
 
 
-class ContributorViewSet(viewsets.ReadOnlyModelViewSet):
+class ContributorViewSet(ConditionalGetMixin, OptimizedQuerysetMixin,
+                         viewsets.ReadOnlyModelViewSet):
     """
     API endpoint that allows listing and performing action for contributor.
     """
     queryset = Contributor.objects.all().order_by('user__username')
+    ordering = ('user__username',)
     serializer_class = ContributorSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    def get_version(self):
+        # contributors list their profiles, and their epics and stories
+        # from any epic
+        return DataVersion.current()
+
     @action(
         detail=True,
         methods=['post'],
@@ -38,14 +73,32 @@ class ContributorViewSet(viewsets.ReadOnlyModelViewSet):
                             status=status.HTTP_400_BAD_REQUEST)
 
 
-class EpicViewSet(viewsets.ReadOnlyModelViewSet):
+class EpicViewSet(ConditionalGetMixin, CompiledListMixin,
+                  OptimizedQuerysetMixin, viewsets.ReadOnlyModelViewSet):
     """
     API endpoint that allows listing and performing action on epics.
     """
     queryset = Epic.objects.order_by('-pub_date')
+    ordering = ('-pub_date', 'id')
+    lookup_value_regex = r'\d+'
+    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    filterset_class = EpicFilter
+    ordering_fields = ['pub_date', 'title']
+    max_new_stories = 1000
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
     serializer_class = EpicSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    def get_version(self):
+        if self.detail:
+            return (
+                EpicCounters.objects
+                .filter(epic=self.kwargs['pk'])
+                .values_list('version', flat=True)
+                .first()
+            )
+        return EpicCounters.combined_version()
+
     @action(
         detail=True,
         methods=['post'],
@@ -67,15 +120,57 @@ class EpicViewSet(viewsets.ReadOnlyModelViewSet):
             return Response(serializer.errors,
                             status=status.HTTP_400_BAD_REQUEST)
 
+    @action(
+        detail=True,
+        methods=['post'],
+        name="create new stories under this epic",
+        serializer_class=UserStorySerializer,
+    )
+    def new_stories(self, request, pk=None):
+        epic = self.get_object()
+        if epic.owner.user != request.user:
+            raise exceptions.PermissionDenied(detail="not your epic")
+        serializer = self.get_serializer(
+            data=request.data,
+            many=True,
+            max_length=self.max_new_stories,
+        )
+        if serializer.is_valid():
+            stories = epic.owner.new_stories(epic, serializer.validated_data)
+            return Response(
+                self.get_serializer(stories, many=True).data,
+                status=status.HTTP_201_CREATED,
+            )
+        else:
+            return Response(serializer.errors,
+                            status=status.HTTP_400_BAD_REQUEST)
+
 
-class UserStoryViewSet(viewsets.ReadOnlyModelViewSet):
+class UserStoryViewSet(ConditionalGetMixin, CompiledListMixin,
+                       OptimizedQuerysetMixin, viewsets.ReadOnlyModelViewSet):
     """
     API endpoint that allows listing and performing action on user stories.
     """
     queryset = UserStory.objects.order_by('-pub_date')
+    ordering = ('-pub_date', 'id')
+    lookup_value_regex = r'\d+'
+    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    filterset_class = UserStoryFilter
+    ordering_fields = ['pub_date', 'title', 'status']
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
     serializer_class = UserStorySerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    def get_version(self):
+        if self.detail:
+            return (
+                EpicCounters.objects
+                .filter(epic__story=self.kwargs['pk'])
+                .values_list('version', flat=True)
+                .first()
+            )
+        return EpicCounters.combined_version()
+
     @action(
         detail=True,
         methods=['put'],
@@ -175,3 +270,46 @@ class UserStoryViewSet(viewsets.ReadOnlyModelViewSet):
             )
         except BadCommand as e:
             raise APIBadCommand(str(e))
+
+
+class BatchView(generics.GenericAPIView):
+    """
+    API endpoint running story commands (take, suspend, resume, cancel,
+    validate) in order in one transaction. With `atomic` (the default) a
+    rejected command cancels the whole batch, otherwise only itself.
+    """
+    serializer_class = BatchSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    max_commands = 1000
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('max_commands', self.max_commands)
+        return super().get_serializer(*args, **kwargs)
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors,
+                            status=status.HTTP_400_BAD_REQUEST)
+        atomic = serializer.validated_data['atomic']
+        outcomes = request.user.contributor.run_commands(
+            [
+                (command['story'], command['action'])
+                for command in serializer.validated_data['commands']
+            ],
+            atomic=atomic,
+        )
+        applied = all(
+            outcome.outcome == CommandOutcome.APPLIED for outcome in outcomes
+        )
+        return Response(
+            {
+                'atomic': atomic,
+                'applied': applied,
+                'results': CommandOutcomeSerializer(outcomes, many=True).data,
+            },
+            status=(
+                APIBadCommand.status_code if atomic and not applied
+                else status.HTTP_200_OK
+            ),
+        )
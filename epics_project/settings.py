@@ -39,6 +39,7 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     "rest_framework",
+    "django_filters",
     "djelm",
     "epics.apps.EpicsConfig",
     "tracking.apps.TrackingConfig",
@@ -110,6 +111,44 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# API lists are paginated with cursors, PAGE_SIZE items per page unless the
+# client asks for up to EPICS_API_MAX_PAGE_SIZE. Related lists nested in an
+# item hold its EPICS_API_NESTED_LIMIT most recent objects.
+
+REST_FRAMEWORK = {
+    "DEFAULT_PAGINATION_CLASS": "epics.pagination.KeysetPagination",
+    "PAGE_SIZE": 100,
+}
+EPICS_API_MAX_PAGE_SIZE = 1000
+EPICS_API_NESTED_LIMIT = 100
+# Epic and story lists are serialized from values() rows when their fields
+# allow it (see epics.compiled), and rendered with orjson when installed.
+EPICS_API_COMPILED_SERIALIZERS = True
+
+
+# Status change recording
+# "sync" writes status changes in the request, "buffered" queues them and
+# writes them in batches from a background thread after commit.
+
+TRACKING_WRITER = "sync"
+TRACKING_WRITER_BATCH_SIZE = 500
+TRACKING_WRITER_FLUSH_INTERVAL = 1.0
+
+# Values derived from the stories of an epic (see epics.cache) and API
+# responses (see epics.conditional) are cached in the EPICS_CACHE_ALIAS cache
+# for EPICS_CACHE_TIMEOUT seconds. Entries are keyed by the epic versions
+# kept in the database, point it to a shared backend to share them between
+# processes.
+
+EPICS_CACHE_ENABLED = True
+EPICS_CACHE_ALIAS = "default"
+EPICS_CACHE_TIMEOUT = 3600
+
+# Age after which the status changes of closed stories are moved to the
+# archive by the archive_status_changes command.
+TRACKING_ARCHIVE_AFTER_DAYS = 180
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.0/topics/i18n/
 
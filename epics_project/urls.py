@@ -11,7 +11,8 @@ urlpatterns = [
         RedirectView.as_view(
             url='/static/favicon.ico')),
     path("", include("frontend.urls")),
-    path("epics-api/", include(epics.router.urls)),
+    path("epics-api/", include(epics.urlpatterns)),
+    path("epics-api/", include("tracking.urls")),
     path("admin/", admin.site.urls),
     path('api-auth/', include('rest_framework.urls')),
 ]
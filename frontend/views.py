@@ -5,13 +5,63 @@ from django.middleware.csrf import get_token
 from django.shortcuts import render, redirect
 from django.urls import reverse
 from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 
-from epics.models import Epic, UserStory
+from epics.conditional import make_etag
+from epics.models import Epic, EpicCounters, UserStory
 from epics.exceptions import BadCommand
 
 from . import forms
 
 
+def page_etag(request, *parts):
+    # pages show the user and embed a token made from the CSRF secret,
+    # which get_token sets up when the client has none yet
+    get_token(request)
+    return make_etag(
+        request.user.pk,
+        request.META["CSRF_COOKIE"],
+        *parts,
+    )
+
+
+def epic_version(**filters):
+    return (
+        EpicCounters.objects
+        .filter(**filters)
+        .values_list("version", flat=True)
+        .first()
+    )
+
+
+def story_etag(request, story_id):
+    version = epic_version(epic__story=story_id)
+    if version is None:
+        return None
+    return page_etag(request, "story", story_id, version)
+
+
+def epic_etag(request, epic_id):
+    version = epic_version(epic=epic_id)
+    if version is None:
+        return None
+    return page_etag(request, "epic", epic_id, version)
+
+
+def landing_etag(request):
+    user = request.user
+    return page_etag(
+        request,
+        "landing",
+        user.username,
+        user.first_name,
+        user.last_name,
+        user.email,
+        user.is_staff,
+        EpicCounters.combined_version(),
+    )
+
+
 def with_logout(f):
     def g(*args, context=None, **kwargs):
         logout_url = f"{reverse('rest_framework:logout')}?next=/"
@@ -46,7 +96,8 @@ def with_username(f):
 
 
 @login_required
-@cache_control(no_cache=True, must_revalidate=True, no_store=True)
+@cache_control(private=True, no_cache=True, must_revalidate=True)
+@condition(etag_func=story_etag)
 @with_logout
 @with_csrf
 @with_username
@@ -129,7 +180,8 @@ def new_story(request, epic_id):
 
 
 @login_required
-@cache_control(no_cache=True, must_revalidate=True, no_store=True)
+@cache_control(private=True, no_cache=True, must_revalidate=True)
+@condition(etag_func=epic_etag)
 @with_logout
 @with_csrf
 @with_username
@@ -174,7 +226,8 @@ def epic_view(request, epic_id, *, context):
 
 
 @login_required
-@cache_control(no_cache=True, must_revalidate=True, no_store=True)
+@cache_control(private=True, no_cache=True, must_revalidate=True)
+@condition(etag_func=landing_etag)
 @with_logout
 @with_csrf
 def landing_view(request, *, context):
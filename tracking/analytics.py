@@ -0,0 +1,366 @@
+"""
+Vectorized story metrics.
+
+Status changes are loaded column by column in NumPy arrays, then lead
+times, cycle times, time spent in each status, throughput and epic totals
+are computed without looping over events in Python. Times and durations
+are kept as integer microseconds since the epoch so that sums are exact
+and match the SQL based helpers of `StatusChange`. The database returns
+them as integers already, with the statuses as codes, so that reading a
+column is a single array conversion.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import numpy as np
+from django.db import connections
+from django.db.models import (
+    BigIntegerField,
+    Case,
+    DurationField,
+    Func,
+    IntegerField,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from epics.models import StoryStatus
+from .models import ArchivedStatusChange, StatusChange, Stats
+
+
+STATUSES = list(StoryStatus)
+STATUS_CODES = {status.value: code for code, status in enumerate(STATUSES)}
+CLOSED_STATUSES = np.array([
+    STATUS_CODES[StoryStatus.CANCELED],
+    STATUS_CODES[StoryStatus.FINISHED],
+])
+IN_PROGRESS = STATUS_CODES[StoryStatus.IN_PROGRESS]
+FINISHED = STATUS_CODES[StoryStatus.FINISHED]
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+MICROSECONDS = 1_000_000
+WEEK = 7 * 24 * 3600 * MICROSECONDS
+# 1970-01-01 is a Thursday, weeks start on Mondays
+WEEK_OFFSET = 3 * 24 * 3600 * MICROSECONDS
+NO_TIME = np.iinfo(np.int64).min
+
+
+def microseconds(moment):
+    return (moment - EPOCH) // timedelta(microseconds=1)
+
+
+def to_timedelta(value):
+    return timedelta(microseconds=int(value))
+
+
+@dataclass
+class Events:
+    """
+    Status changes sorted by story then time. `duration` is -1 for open
+    intervals and `story_status` is the current status of the story of
+    each event.
+    """
+    story: np.ndarray
+    epic: np.ndarray
+    status: np.ndarray
+    time: np.ndarray
+    duration: np.ndarray
+    story_status: np.ndarray
+
+    def __len__(self):
+        return len(self.story)
+
+
+class Microseconds(Func):
+    """
+    Microseconds since the epoch of a datetime, or microseconds of a
+    duration, computed by the database.
+    """
+    output_field = BigIntegerField()
+    template = (
+        "CAST(EXTRACT(EPOCH FROM %(expressions)s) * 1000000 AS BIGINT)"
+    )
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        if isinstance(self.source_expressions[0].output_field, DurationField):
+            # stored as integer microseconds already
+            return compiler.compile(self.source_expressions[0])
+        # Stored as "YYYY-MM-DD HH:MM:SS[.ffffff]" UTC text. The julianday
+        # of whole seconds rounds exactly, the fraction is added as is.
+        return super().as_sql(
+            compiler,
+            connection,
+            template=(
+                "(CAST(round((julianday(substr(%(expressions)s, 1, 19))"
+                " - 2440587.5) * 86400) AS INTEGER) * 1000000"
+                " + CAST(substr(%(expressions)s || '.000000', 21, 6)"
+                " AS INTEGER))"
+            ),
+            **extra_context,
+        )
+
+
+def status_code(field):
+    """
+    `STATUS_CODES` of the status in `field`.
+    """
+    return Case(
+        *(
+            When(**{field: value}, then=Value(code))
+            for value, code in STATUS_CODES.items()
+        ),
+        output_field=IntegerField(),
+    )
+
+
+def duration_microseconds(field):
+    """
+    Microseconds of the duration in `field`, -1 when open.
+    """
+    return Coalesce(
+        Microseconds(field),
+        Value(-1, output_field=BigIntegerField()),
+    )
+
+
+def read_chunks(queryset, chunk_size):
+    """
+    Yield the columns of the events of `queryset`, `chunk_size` rows at a
+    time.
+    """
+    sql, params = (
+        queryset
+        .order_by()
+        .values_list(
+            "story",
+            "story__epic",
+            status_code("new_status"),
+            Microseconds("time"),
+            duration_microseconds("duration"),
+            status_code("story__status"),
+        )
+        .query
+        .sql_with_params()
+    )
+    # Raw rows skip the per value conversions of the ORM, every column is
+    # an integer converted in bulk.
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(sql, params)
+        while rows := cursor.fetchmany(chunk_size):
+            story, epic, status, time, duration, story_status = zip(*rows)
+            yield (
+                np.array(story, dtype=np.int64),
+                np.array(epic, dtype=np.int64),
+                np.array(status, dtype=np.int8),
+                np.array(time, dtype=np.int64),
+                np.array(duration, dtype=np.int64),
+                np.array(story_status, dtype=np.int8),
+            )
+
+
+def load_events(querysets=None, chunk_size=50_000):
+    """
+    Load the events of `querysets`, of `StatusChange` or of
+    `ArchivedStatusChange`, every live and archived event by default.
+    """
+    if querysets is None:
+        querysets = [
+            StatusChange.objects.all(),
+            ArchivedStatusChange.objects.all(),
+        ]
+    chunks = [
+        chunk
+        for queryset in querysets
+        for chunk in read_chunks(queryset, chunk_size)
+    ]
+    if chunks:
+        columns = [np.concatenate(column) for column in zip(*chunks)]
+    else:
+        columns = [
+            np.empty(0, dtype=dtype)
+            for dtype in (np.int64, np.int64, np.int8, np.int64, np.int64,
+                          np.int8)
+        ]
+    story, time = columns[0], columns[3]
+    order = np.lexsort((time, story))
+    return Events(*(column[order] for column in columns))
+
+
+def events_for(epic=None, contributor=None, chunk_size=50_000):
+    """
+    Load the events of the stories of `epic` and/or of the stories
+    `contributor` has worked on, with their whole history.
+    """
+    querysets = []
+    # a story's events are either all live or all archived
+    for model in (StatusChange, ArchivedStatusChange):
+        queryset = model.objects.all()
+        if epic is not None:
+            queryset = queryset.filter(story__epic=epic)
+        if contributor is not None:
+            queryset = queryset.filter(
+                story__in=model.objects
+                .filter(contributor=contributor)
+                .filter(new_status=StoryStatus.IN_PROGRESS)
+                .values("story")
+            )
+        querysets.append(queryset)
+    return load_events(querysets, chunk_size=chunk_size)
+
+
+def interval_durations(events, now):
+    """
+    Duration of each event's interval, open intervals of unfinished stories
+    lasting until `now` and those of closed stories lasting 0.
+    """
+    open_interval = events.duration < 0
+    unfinished = ~np.isin(events.story_status, CLOSED_STATUSES)
+    return np.where(
+        open_interval,
+        np.where(unfinished, microseconds(now) - events.time, 0),
+        events.duration,
+    )
+
+
+def totals(events, now=None):
+    """
+    `StatusChange.epic_stats` of the stories of `events`.
+    """
+    now = now or timezone.now()
+    durations = interval_durations(events, now)
+    return Stats(
+        total_time=to_timedelta(durations.sum()),
+        total_work_time=to_timedelta(
+            events.duration[
+                (events.status == IN_PROGRESS) & (events.duration >= 0)
+            ].sum()
+        ),
+    )
+
+
+def totals_by_epic(events, now=None):
+    """
+    `totals` of each epic of `events`, as a dict keyed by epic id.
+    """
+    now = now or timezone.now()
+    durations = interval_durations(events, now)
+    epics, index = np.unique(events.epic, return_inverse=True)
+    # Integer sums, float weights of bincount would lose microseconds
+    total = np.zeros(len(epics), dtype=np.int64)
+    np.add.at(total, index, durations)
+    work = np.zeros(len(epics), dtype=np.int64)
+    np.add.at(
+        work,
+        index,
+        np.where(
+            (events.status == IN_PROGRESS) & (events.duration >= 0),
+            events.duration,
+            0,
+        ),
+    )
+    return {
+        int(epic): Stats(
+            total_time=to_timedelta(epic_total),
+            total_work_time=to_timedelta(epic_work),
+        )
+        for epic, epic_total, epic_work in zip(epics, total, work)
+    }
+
+
+@dataclass
+class StoryMetrics:
+    """
+    Per story metrics, aligned on `story`. Lead and cycle times are in
+    microseconds, -1 for stories not finished (or never started for the
+    cycle time). `time_in_status` has one column per `STATUSES`.
+    """
+    story: np.ndarray
+    lead_time: np.ndarray
+    cycle_time: np.ndarray
+    time_in_status: np.ndarray
+
+    def lead_times(self):
+        return [to_timedelta(value) for value in self.lead_time
+                if value >= 0]
+
+    def cycle_times(self):
+        return [to_timedelta(value) for value in self.cycle_time
+                if value >= 0]
+
+    def as_dict(self, story):
+        index = int(np.searchsorted(self.story, story))
+        if index == len(self.story) or self.story[index] != story:
+            raise KeyError(story)
+        lead_time = self.lead_time[index]
+        cycle_time = self.cycle_time[index]
+        return {
+            "lead_time": to_timedelta(lead_time) if lead_time >= 0 else None,
+            "cycle_time": (
+                to_timedelta(cycle_time) if cycle_time >= 0 else None
+            ),
+            "time_in_status": {
+                status.value: to_timedelta(value)
+                for status, value in zip(STATUSES, self.time_in_status[index])
+            },
+        }
+
+
+def first_per_story(index, mask, values, count):
+    """
+    First of `values` where `mask` per story, NO_TIME when there is none.
+    """
+    result = np.full(count, NO_TIME, dtype=np.int64)
+    selected = np.flatnonzero(mask)[::-1]
+    result[index[selected]] = values[selected]
+    return result
+
+
+def last_per_story(index, mask, values, count):
+    result = np.full(count, NO_TIME, dtype=np.int64)
+    selected = np.flatnonzero(mask)
+    result[index[selected]] = values[selected]
+    return result
+
+
+def story_metrics(events, now=None):
+    """
+    Lead time, cycle time and time in each status of the stories of
+    `events`, open intervals lasting until `now`.
+    """
+    now = now or timezone.now()
+    stories, index = np.unique(events.story, return_inverse=True)
+    count = len(stories)
+    everything = np.ones(len(events), dtype=bool)
+    created = first_per_story(index, everything, events.time, count)
+    started = first_per_story(
+        index, events.status == IN_PROGRESS, events.time, count)
+    finished = last_per_story(
+        index, events.status == FINISHED, events.time, count)
+    done = finished != NO_TIME
+    lead_time = np.where(done, finished - created, -1)
+    cycle_time = np.where(done & (started != NO_TIME), finished - started, -1)
+    time_in_status = np.zeros((count, len(STATUSES)), dtype=np.int64)
+    np.add.at(
+        time_in_status,
+        (index, events.status.astype(np.intp)),
+        interval_durations(events, now),
+    )
+    return StoryMetrics(stories, lead_time, cycle_time, time_in_status)
+
+
+def throughput_per_week(events):
+    """
+    Number of stories finished per week, as week start (Monday midnight
+    UTC) and count arrays covering every week from the first to the last
+    finishing week.
+    """
+    finished = events.time[events.status == FINISHED]
+    if not len(finished):
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    weeks = (finished + WEEK_OFFSET) // WEEK
+    first = weeks.min()
+    counts = np.bincount(weeks - first)
+    starts = (first + np.arange(len(counts))) * WEEK - WEEK_OFFSET
+    return starts, counts
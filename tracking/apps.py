@@ -6,8 +6,28 @@ class TrackingConfig(AppConfig):
     name = "tracking"
 
     def ready(self):
-        from epics.signals import status_changed
+        from django.conf import settings
+        from django.db.models.signals import post_save
+        from epics.signals import status_changed, statuses_changed
         from epics.models import UserStory
-        from .handlers import record_new_status
+        from .handlers import (
+            roll_up_recorded_change,
+            snapshot_stories_epics,
+            snapshot_story_epic,
+        )
+        from .models import StatusChange
+
+        if getattr(settings, "TRACKING_WRITER", "sync") == "buffered":
+            from .writer import writer
+
+            record_new_status = writer.record_new_status
+            record_new_statuses = writer.record_new_statuses
+        else:
+            from .handlers import record_new_status, record_new_statuses
 
         status_changed.connect(record_new_status, UserStory, weak=False)
+        statuses_changed.connect(record_new_statuses, UserStory, weak=False)
+        post_save.connect(roll_up_recorded_change, StatusChange, weak=False)
+        status_changed.connect(snapshot_story_epic, UserStory, weak=False)
+        statuses_changed.connect(
+            snapshot_stories_epics, UserStory, weak=False)
@@ -0,0 +1,48 @@
+"""
+Day arithmetic for the daily rollups, days being those of the project's
+default time zone.
+"""
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+
+
+def day_of(moment):
+    return timezone.localtime(moment, timezone.get_default_timezone()).date()
+
+
+def midnight(day):
+    return timezone.make_aware(
+        datetime.combine(day, time.min),
+        timezone.get_default_timezone(),
+    )
+
+
+def split_by_day(start, duration):
+    """
+    Yield (day, duration) pairs covering `duration` from `start`, cut at
+    each midnight.
+    """
+    end = start + duration
+    day = day_of(start)
+    while start < end:
+        next_day = day + timedelta(days=1)
+        cut = min(midnight(next_day), end)
+        yield day, cut - start
+        start, day = cut, next_day
+
+
+def whole_days(start, end):
+    """
+    Return the first and the last excluded day entirely contained in the
+    period going from `start` to `end`.
+    """
+    first = day_of(start)
+    if midnight(first) < start:
+        first += timedelta(days=1)
+    return first, day_of(end)
+
+
+def clip(start, duration, period_start, period_end):
+    end = start + duration
+    return max(min(end, period_end) - max(start, period_start), timedelta())
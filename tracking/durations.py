@@ -0,0 +1,134 @@
+"""
+Recompute the status change durations from the event times.
+
+The duration of a status change lasts until the next change of the same
+story, the last change of each story is left open (null). Events are
+streamed epic by epic ordered by story and time, the differences are
+computed with NumPy on whole chunks and only the durations that differ
+are written back, the daily work time rollup of the epic being
+recomputed along. Each epic is rebuilt in its own transaction so an
+interrupted rebuild can be resumed after the last epic reported done.
+"""
+from datetime import timedelta
+
+import django
+import numpy as np
+from django.db import transaction
+
+from epics.models import EpicCounters
+from .analytics import Microseconds, duration_microseconds
+from .handlers import open_intervals
+from .models import DailyWorkTime, StatusChange
+
+
+OPEN = -1
+
+
+def chained_durations(stories, times):
+    """
+    Durations in microseconds of events sorted by story and time, OPEN for
+    the last event of each story, the final event included.
+    """
+    durations = np.full(len(times), OPEN, dtype=np.int64)
+    if len(times) > 1:
+        same_story = stories[1:] == stories[:-1]
+        durations[:-1] = np.where(same_story, np.diff(times), OPEN)
+    return durations
+
+
+def stream_epic(epic_id, chunk_size):
+    """
+    Yield (ids, stories, times, durations) arrays of the status changes
+    of `epic_id`, `chunk_size` rows at a time.
+    """
+    rows = (
+        StatusChange.objects
+        .filter(story__epic=epic_id)
+        .order_by("story", "time", "id")
+        .values_list(
+            "id",
+            "story",
+            Microseconds("time"),
+            duration_microseconds("duration"),
+        )
+        .iterator(chunk_size=chunk_size)
+    )
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield to_arrays(chunk)
+            chunk = []
+    if chunk:
+        yield to_arrays(chunk)
+
+
+def to_arrays(rows):
+    return tuple(np.array(column, dtype=np.int64) for column in zip(*rows))
+
+
+def write_durations(ids, durations, batch_size):
+    StatusChange.objects.bulk_update(
+        [
+            StatusChange(
+                id=int(pk),
+                duration=(
+                    None if duration == OPEN
+                    else timedelta(microseconds=int(duration))
+                ),
+            )
+            for pk, duration in zip(ids, durations)
+        ],
+        ["duration"],
+        batch_size=batch_size,
+    )
+
+
+@transaction.atomic
+def rebuild_epic(epic_id, chunk_size=10_000):
+    """
+    Recompute the durations of the status changes of `epic_id`, its daily
+    work time rollup when they changed, and point the current interval of
+    each story at its last change. Return the number of changes read and
+    of durations updated.
+    """
+    read = updated = 0
+    # the last event of a chunk waits for the first one of the next chunk
+    carry = None
+    last_changes = []
+    for chunk in stream_epic(epic_id, chunk_size):
+        if carry is not None:
+            chunk = tuple(
+                np.concatenate((held, values))
+                for held, values in zip(carry, chunk)
+            )
+        ids, stories, times, stored = chunk
+        durations = chained_durations(stories, times)
+        changed = durations[:-1] != stored[:-1]
+        write_durations(ids[:-1][changed], durations[:-1][changed],
+                        chunk_size)
+        ends = np.flatnonzero(stories[1:] != stories[:-1])
+        last_changes.extend(zip(stories[ends], ids[ends]))
+        read += len(ids) - 1
+        updated += int(changed.sum())
+        carry = tuple(column[-1:] for column in chunk)
+    if carry is not None:
+        ids, stories, times, stored = carry
+        if stored[0] != OPEN:
+            write_durations(ids, [OPEN], chunk_size)
+            updated += 1
+        last_changes.append((stories[0], ids[0]))
+        read += 1
+    open_intervals(
+        StatusChange(id=int(pk), story_id=int(story))
+        for story, pk in last_changes
+    )
+    if updated:
+        DailyWorkTime.rebuild([epic_id])
+        EpicCounters.bump([epic_id])
+    return read, updated
+
+
+def setup_worker():
+    # processes started with spawn do not inherit the configured apps
+    django.setup()
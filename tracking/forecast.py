@@ -0,0 +1,118 @@
+"""
+Monte Carlo forecast of the delivery date of an epic.
+
+Each run draws a weekly throughput for every coming week among the
+throughputs of the past weeks of the epic, until the stories still open
+are finished. The delivery dates of the runs give the percentiles.
+"""
+from datetime import timedelta
+
+import numpy as np
+from django.utils import timezone
+
+from epics.cache import EpicCache
+from epics.models import EpicCounters
+from .analytics import FINISHED, WEEK, WEEK_OFFSET, events_for, microseconds
+from .days import day_of
+
+
+PERCENTILES = (50, 85, 95)
+
+forecast_cache = EpicCache("forecast")
+
+
+def weekly_throughput(events, now, history_weeks=52):
+    """
+    Number of stories finished in each full week from the week of the
+    first event, at most `history_weeks` before the current week.
+    """
+    if not len(events):
+        return np.empty(0, dtype=np.int64)
+    current = (microseconds(now) + WEEK_OFFSET) // WEEK
+    first = max((events.time.min() + WEEK_OFFSET) // WEEK,
+                current - history_weeks)
+    weeks = (events.time[events.status == FINISHED] + WEEK_OFFSET) // WEEK
+    weeks = weeks[(weeks >= first) & (weeks < current)]
+    return np.bincount(weeks - first, minlength=current - first)
+
+
+def simulate_weeks(throughput, remaining, runs, rng, max_weeks=520):
+    """
+    Weeks needed to finish `remaining` stories in each of `runs` runs,
+    inf for the runs not done within `max_weeks`.
+
+    The weeks are drawn in blocks of a few times the expected number of
+    weeks, the runs not done at the end of a block drawing another one.
+    """
+    if remaining <= 0:
+        return np.zeros(runs)
+    if not len(throughput) or not throughput.any():
+        return np.full(runs, np.inf)
+    block = 3 * int(np.ceil(remaining / throughput.mean())) + 4
+    weeks = np.full(runs, np.inf)
+    totals = np.zeros(runs, dtype=np.int64)
+    pending = np.arange(runs)
+    start = 0
+    while len(pending) and start < max_weeks:
+        size = min(block, max_weeks - start)
+        sums = totals[pending, None] + rng.choice(
+            throughput, size=(len(pending), size)
+        ).cumsum(axis=1)
+        done = sums >= remaining
+        finished = done.any(axis=1)
+        weeks[pending[finished]] = (
+            start + done[finished].argmax(axis=1) + 1
+        )
+        totals[pending] = sums[:, -1]
+        pending = pending[~finished]
+        start += size
+    return weeks
+
+
+def forecast(epic, runs=10_000, now=None, seed=0):
+    """
+    Delivery forecast of `epic`: its open stories, the weeks of history
+    used and the p50, p85 and p95 dates (None when not expected within
+    ten years).
+    """
+    now = now or timezone.now()
+    stats = epic.stats
+    remaining = stats.created + stats.in_progress + stats.suspended
+    throughput = weekly_throughput(events_for(epic=epic), now)
+    weeks = simulate_weeks(
+        throughput,
+        remaining,
+        runs,
+        np.random.default_rng(seed),
+    )
+    today = day_of(now)
+    result = {
+        "remaining": remaining,
+        "history_weeks": len(throughput),
+        "runs": runs,
+    }
+    for percentile, value in zip(
+        PERCENTILES,
+        np.percentile(weeks, PERCENTILES, method="higher"),
+    ):
+        result[f"p{percentile}"] = (
+            today + timedelta(weeks=int(value)) if np.isfinite(value)
+            else None
+        )
+    return result
+
+
+def cached_forecast(epic, runs=10_000, now=None):
+    """
+    `forecast` of `epic`, computed again after a change of its stories and
+    on each new day, its dates counting from the current day.
+    """
+    now = now or timezone.now()
+    versions = {
+        epic_id: f"{version}:{day_of(now)}:{runs}"
+        for epic_id, version in EpicCounters.versions([epic.pk]).items()
+    }
+    return forecast_cache.get_many(
+        versions,
+        lambda epic_ids: {epic.pk: forecast(epic, runs, now)},
+    ).get(epic.pk) or forecast(epic, runs, now)
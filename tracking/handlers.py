@@ -1,25 +1,212 @@
-from datetime import timedelta
-
-from django.db import IntegrityError, transaction
+from django.db import models, transaction
 from django.utils import timezone
 
-from epics.signals import status_changed
-from .models import StatusChange
+from epics.models import EpicCounters, UserStory
+from .models import (
+    CurrentInterval,
+    DailyEpicSnapshot,
+    DailyWorkTime,
+    Interval,
+    StatusChange,
+)
 
 
-@transaction.atomic
-def record_new_status(sender, contributor, new_status, story, **kwargs):
+INTERVAL_FIELDS = ("pk", "time", "contributor", "story__epic", "new_status")
+
+
+def close_changes(changes, time):
+    """
+    Close `changes`, (pk, time, contributor, epic, status) tuples, at `time`.
+    """
+    changes = list(changes)
+    if not changes:
+        return 0
+    (
+        StatusChange.objects
+        .filter(pk__in=[pk for pk, *_ in changes])
+        .update(
+            duration=models.ExpressionWrapper(
+                models.Value(time) - models.F("time"),
+                output_field=models.DurationField(),
+            )
+        )
+    )
+    DailyWorkTime.add_intervals(
+        Interval(start, time - start, contributor_id, epic_id, status)
+        for _, start, contributor_id, epic_id, status in changes
+    )
+    return len(changes)
+
+
+def close_current_intervals(story_ids, time):
+    """
+    Set the duration of the open interval of each story up to `time` and
+    return the ids of the stories whose interval was closed.
+    """
+    changes = list(
+        StatusChange.objects
+        .filter(
+            pk__in=CurrentInterval.objects
+            .filter(story__in=story_ids)
+            .values("change")
+        )
+        .values_list(*INTERVAL_FIELDS, "story")
+    )
+    close_changes((change[:-1] for change in changes), time)
+    return {change[-1] for change in changes}
+
+
+def close_last_changes(stories, time):
+    # Histories recorded without an interval pointer (hand made, imported)
     last_change = (
         StatusChange.objects
-        .filter(story=story)
+        .filter(story=models.OuterRef("story"), time__lt=time)
         .order_by("-time")
-        .first()
+        .values("pk")[:1]
+    )
+    close_changes(
+        StatusChange.objects
+        .filter(story__in=stories, pk=models.Subquery(last_change))
+        .values_list(*INTERVAL_FIELDS),
+        time,
+    )
+
+
+def close_last_change(story, time):
+    close_last_changes([story], time)
+
+
+def open_intervals(changes):
+    CurrentInterval.objects.bulk_create(
+        [
+            CurrentInterval(story_id=change.story_id, change=change)
+            for change in changes
+        ],
+        update_conflicts=True,
+        unique_fields=["story"],
+        update_fields=["change"],
     )
-    StatusChange.objects.create(
+
+
+@transaction.atomic
+def record_new_status(sender, contributor, new_status, story, **kwargs):
+    now = timezone.now()
+    if not close_current_intervals([story.pk], now):
+        close_last_change(story, now)
+    change = StatusChange.objects.create(
         story=story,
         new_status=new_status,
         contributor=contributor,
+        time=now,
+    )
+    open_intervals([change])
+
+
+@transaction.atomic
+def record_new_statuses(sender, contributor, changes, **kwargs):
+    now = timezone.now()
+    story_ids = {story_id for story_id, _ in changes}
+    closed = close_current_intervals(story_ids, now)
+    if len(closed) < len(story_ids):
+        close_last_changes(story_ids - closed, now)
+    new_changes = StatusChange.objects.bulk_create(
+        StatusChange(
+            story_id=story_id,
+            new_status=new_status,
+            contributor=contributor,
+            time=now,
+        )
+        for story_id, new_status in changes
+    )
+    open_intervals(new_changes)
+
+
+@transaction.atomic
+def write_status_changes(events):
+    """
+    Write `events`, (story id, new status, contributor id, time) tuples in
+    the order they happened, closing intervals exactly as
+    `record_new_status` would have done at the time of each event.
+    """
+    story_ids = {story_id for story_id, *_ in events}
+    epics = dict(
+        UserStory.objects
+        .filter(pk__in=story_ids)
+        .values_list("pk", "epic")
+    )
+    open_changes = {
+        change.story_id: change
+        for change in (
+            StatusChange.objects
+            .filter(
+                pk__in=CurrentInterval.objects
+                .filter(story__in=story_ids)
+                .values("change")
+            )
+            .only("id", "story", "time", "contributor", "new_status")
+        )
+    }
+    closed = []
+    last_changes = {}
+    new_changes = []
+    for story_id, new_status, contributor_id, time in events:
+        previous = last_changes.get(story_id)
+        if previous is None:
+            previous = open_changes.get(story_id)
+            if previous is None:
+                close_last_change(story_id, time)
+            else:
+                closed.append(previous)
+        if previous is not None:
+            previous.duration = time - previous.time
+        change = StatusChange(
+            story_id=story_id,
+            new_status=new_status,
+            contributor_id=contributor_id,
+            time=time,
+        )
+        new_changes.append(change)
+        last_changes[story_id] = change
+    StatusChange.objects.bulk_update(closed, ["duration"])
+    StatusChange.objects.bulk_create(new_changes)
+    open_intervals(last_changes.values())
+    # the transitions bumped the versions before their events were written
+    EpicCounters.bump(set(epics.values()))
+    DailyWorkTime.add_intervals(
+        Interval(
+            change.time,
+            change.duration,
+            change.contributor_id,
+            epics[change.story_id],
+            change.new_status,
+        )
+        for change in closed + new_changes
+        if change.duration is not None
+    )
+
+
+def roll_up_recorded_change(sender, instance, created, raw=False, **kwargs):
+    # Changes created with their duration (imports, fixtures) bypass the
+    # handlers above.
+    if created and not raw and instance.duration is not None:
+        DailyWorkTime.add_intervals([
+            Interval(
+                instance.time,
+                instance.duration,
+                instance.contributor_id,
+                instance.story.epic_id,
+                instance.new_status,
+            )
+        ])
+
+
+def snapshot_story_epic(sender, story, **kwargs):
+    DailyEpicSnapshot.take([story.epic_id])
+
+
+def snapshot_stories_epics(sender, changes, **kwargs):
+    DailyEpicSnapshot.take(
+        UserStory.objects
+        .filter(pk__in=[story_id for story_id, _ in changes])
+        .values("epic")
     )
-    if last_change:
-        last_change.duration = timezone.now() - last_change.time
-        last_change.save()
@@ -0,0 +1,45 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from tracking.models import ArchivedStatusChange
+
+
+class Command(BaseCommand):
+    help = (
+        "Move the status changes of the stories closed for a while to the "
+        "archive, summing their durations per story, contributor and status."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=getattr(settings, "TRACKING_ARCHIVE_AFTER_DAYS", 180),
+            help="archive the stories closed for more than this many days",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="number of stories archived per transaction",
+        )
+
+    def handle(self, *args, days, chunk_size, **options):
+        before = timezone.now() - timedelta(days=days)
+        story_ids = list(ArchivedStatusChange.archivable_stories(before))
+        changes = 0
+        for start in range(0, len(story_ids), chunk_size):
+            chunk = story_ids[start:start + chunk_size]
+            changes += ArchivedStatusChange.archive_stories(chunk)
+            self.stdout.write(
+                f"{start + len(chunk)}/{len(story_ids)} stories archived"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{changes} status change(s) of {len(story_ids)} "
+                "story(ies) archived"
+            )
+        )
@@ -0,0 +1,97 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from tracking.durations import rebuild_epic, setup_worker
+from tracking.models import StatusChange
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the status change durations from the event times, and "
+        "the daily work time rollup along, epic by epic. Epics are rebuilt "
+        "in id order, each in its own transaction: an interrupted rebuild "
+        "resumes with --after."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "epics",
+            nargs="*",
+            type=int,
+            help="ids of the epics to rebuild (all epics by default)",
+        )
+        parser.add_argument(
+            "--after",
+            type=int,
+            default=0,
+            help="skip the epics up to this id, already rebuilt",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=10_000,
+            help="number of status changes read and written at a time",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="number of processes rebuilding epics in parallel",
+        )
+
+    def handle(self, *args, epics, after, chunk_size, workers, **options):
+        epic_ids = (
+            StatusChange.objects
+            .filter(story__epic__gt=after)
+            .values_list("story__epic", flat=True)
+            .distinct()
+            .order_by("story__epic")
+        )
+        if epics:
+            epic_ids = epic_ids.filter(story__epic__in=epics)
+        epic_ids = list(epic_ids)
+        if workers > 1 and connections["default"].vendor == "sqlite":
+            self.stderr.write(
+                "sqlite does not support concurrent writers, "
+                "rebuilding with a single process"
+            )
+            workers = 1
+        if workers > 1:
+            # the workers open their own connections
+            connections.close_all()
+            with ProcessPoolExecutor(
+                workers, initializer=setup_worker
+            ) as pool:
+                results = pool.map(
+                    rebuild_epic,
+                    epic_ids,
+                    [chunk_size] * len(epic_ids),
+                )
+                self.report(epic_ids, results)
+        else:
+            self.report(
+                epic_ids,
+                (rebuild_epic(epic_id, chunk_size) for epic_id in epic_ids),
+            )
+
+    def report(self, epic_ids, results):
+        total_read = total_updated = 0
+        # results come in epic order, all epics before the reported one
+        # are done
+        for done, (epic_id, (read, updated)) in enumerate(
+            zip(epic_ids, results), start=1
+        ):
+            total_read += read
+            total_updated += updated
+            self.stdout.write(
+                f"epic {epic_id} done ({done}/{len(epic_ids)}): "
+                f"{updated}/{read} duration(s) updated"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{total_updated}/{total_read} duration(s) updated in "
+                f"{len(epic_ids)} epic(s)"
+            )
+        )
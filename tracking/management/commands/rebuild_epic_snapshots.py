@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from tracking.models import DailyEpicSnapshot
+
+
+class Command(BaseCommand):
+    help = "Recompute the daily epic snapshots from the status changes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "epics",
+            nargs="*",
+            type=int,
+            help="ids of the epics to rebuild (all epics by default)",
+        )
+
+    def handle(self, *args, epics, **options):
+        rows = DailyEpicSnapshot.rebuild(epics or None)
+        self.stdout.write(self.style.SUCCESS(f"{rows} snapshot(s) written"))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from tracking.models import DailyWorkTime
+
+
+class Command(BaseCommand):
+    help = "Recompute the daily work time rollup from the status changes."
+
+    def handle(self, *args, **options):
+        rows = DailyWorkTime.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"{rows} daily row(s) written"))
@@ -0,0 +1,25 @@
+# Generated by Django 5.0.4 on 2024-05-14 18:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracking', '0003_alter_statuschange_duration'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='statuschange',
+            index=models.Index(
+                fields=['story', '-time'],
+                name='statuschange_story_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='statuschange',
+            index=models.Index(
+                fields=['contributor', 'new_status', 'time'],
+                name='statuschange_contrib_time_idx'),
+        ),
+    ]
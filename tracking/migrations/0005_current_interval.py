@@ -0,0 +1,59 @@
+# Generated by Django 5.0.4 on 2024-05-18 09:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def point_current_intervals(apps, schema_editor):
+    CurrentInterval = apps.get_model("tracking", "CurrentInterval")
+    StatusChange = apps.get_model("tracking", "StatusChange")
+    UserStory = apps.get_model("epics", "UserStory")
+    last_change = (
+        StatusChange.objects
+        .filter(story=models.OuterRef("pk"))
+        .order_by("-time", "-id")
+        .values("id")[:1]
+    )
+    CurrentInterval.objects.bulk_create(
+        (
+            CurrentInterval(story_id=story_id, change_id=change_id)
+            for story_id, change_id in (
+                UserStory.objects
+                .annotate(change=models.Subquery(last_change))
+                .filter(change__isnull=False)
+                .values_list("id", "change")
+                .iterator()
+            )
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('epics', '0006_workflow_indexes'),
+        ('tracking', '0004_tracking_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CurrentInterval',
+            fields=[
+                ('story', models.OneToOneField(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    primary_key=True,
+                    related_name='current_interval',
+                    serialize=False,
+                    to='epics.userstory')),
+                ('change', models.OneToOneField(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='+',
+                    to='tracking.statuschange')),
+            ],
+        ),
+        migrations.RunPython(
+            point_current_intervals,
+            migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,94 @@
+# Generated by Django 5.0.4 on 2024-05-21 21:12
+
+import datetime
+from collections import defaultdict
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from tracking.days import split_by_day
+
+
+def roll_up_work_time(apps, schema_editor):
+    DailyWorkTime = apps.get_model("tracking", "DailyWorkTime")
+    StatusChange = apps.get_model("tracking", "StatusChange")
+    totals = defaultdict(datetime.timedelta)
+    for start, duration, contributor_id, epic_id, status in (
+        StatusChange.objects
+        .filter(duration__isnull=False)
+        .filter(contributor__isnull=False)
+        .values_list(
+            "time", "duration", "contributor", "story__epic", "new_status")
+        .iterator(chunk_size=5000)
+    ):
+        for day, day_duration in split_by_day(start, duration):
+            totals[(day, contributor_id, epic_id, status)] += day_duration
+    DailyWorkTime.objects.bulk_create(
+        (
+            DailyWorkTime(
+                day=day,
+                contributor_id=contributor_id,
+                epic_id=epic_id,
+                status=status,
+                duration=duration,
+            )
+            for (day, contributor_id, epic_id, status), duration
+            in totals.items()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('epics', '0006_workflow_indexes'),
+        ('tracking', '0005_current_interval'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyWorkTime',
+            fields=[
+                ('id', models.BigAutoField(
+                    auto_created=True,
+                    primary_key=True,
+                    serialize=False,
+                    verbose_name='ID')),
+                ('day', models.DateField()),
+                ('status', models.CharField(
+                    choices=[
+                        ('created', 'Created'),
+                        ('in progress', 'In Progress'),
+                        ('suspended', 'Suspended'),
+                        ('canceled', 'Canceled'),
+                        ('finished', 'Finished'),
+                    ],
+                    max_length=20)),
+                ('duration', models.DurationField(
+                    default=datetime.timedelta)),
+                ('contributor', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    to='epics.contributor')),
+                ('epic', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    to='epics.epic')),
+            ],
+            options={
+                'indexes': [
+                    models.Index(
+                        fields=['contributor', 'status', 'day'],
+                        name='dailyworktime_contrib_day_idx'),
+                    models.Index(
+                        fields=['epic', 'contributor', 'status'],
+                        name='dailyworktime_epic_idx'),
+                ],
+                'constraints': [
+                    models.UniqueConstraint(
+                        fields=('day', 'contributor', 'epic', 'status'),
+                        name='dailyworktime_unique_key'),
+                ],
+            },
+        ),
+        migrations.RunPython(roll_up_work_time, migrations.RunPython.noop),
+    ]
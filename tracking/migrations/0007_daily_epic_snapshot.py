@@ -0,0 +1,41 @@
+# Generated by Django 5.0.4 on 2024-05-24 18:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('epics', '0006_workflow_indexes'),
+        ('tracking', '0006_daily_work_time'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyEpicSnapshot',
+            fields=[
+                ('id', models.BigAutoField(
+                    auto_created=True,
+                    primary_key=True,
+                    serialize=False,
+                    verbose_name='ID')),
+                ('day', models.DateField()),
+                ('created', models.IntegerField(default=0)),
+                ('in_progress', models.IntegerField(default=0)),
+                ('suspended', models.IntegerField(default=0)),
+                ('canceled', models.IntegerField(default=0)),
+                ('finished', models.IntegerField(default=0)),
+                ('epic', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    to='epics.epic')),
+            ],
+            options={
+                'constraints': [
+                    models.UniqueConstraint(
+                        fields=('epic', 'day'),
+                        name='dailyepicsnapshot_unique_key'),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 5.0.4 on 2024-05-26 09:52
+
+import datetime
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+STATUS_CHOICES = [
+    ('created', 'Created'),
+    ('in progress', 'In Progress'),
+    ('suspended', 'Suspended'),
+    ('canceled', 'Canceled'),
+    ('finished', 'Finished'),
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('epics', '0006_workflow_indexes'),
+        ('tracking', '0007_daily_epic_snapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedStatusChange',
+            fields=[
+                ('id', models.BigIntegerField(
+                    primary_key=True,
+                    serialize=False)),
+                ('time', models.DateTimeField()),
+                ('new_status', models.CharField(
+                    choices=STATUS_CHOICES,
+                    max_length=20)),
+                ('duration', models.DurationField(blank=True, null=True)),
+                ('contributor', models.ForeignKey(
+                    null=True,
+                    on_delete=django.db.models.deletion.PROTECT,
+                    to='epics.contributor')),
+                ('story', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    to='epics.userstory')),
+            ],
+            options={
+                'indexes': [
+                    models.Index(
+                        fields=['story', 'time'],
+                        name='archivedchange_story_time_idx'),
+                    models.Index(
+                        fields=['contributor', 'new_status', 'time'],
+                        name='archivedchange_contrib_idx'),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name='StoryTimeSummary',
+            fields=[
+                ('id', models.BigAutoField(
+                    auto_created=True,
+                    primary_key=True,
+                    serialize=False,
+                    verbose_name='ID')),
+                ('status', models.CharField(
+                    choices=STATUS_CHOICES,
+                    max_length=20)),
+                ('duration', models.DurationField(
+                    default=datetime.timedelta)),
+                ('changes', models.IntegerField(default=0)),
+                ('contributor', models.ForeignKey(
+                    null=True,
+                    on_delete=django.db.models.deletion.PROTECT,
+                    to='epics.contributor')),
+                ('story', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    to='epics.userstory')),
+            ],
+            options={
+                'verbose_name_plural': 'Story time summaries',
+                'constraints': [
+                    models.UniqueConstraint(
+                        fields=('story', 'contributor', 'status'),
+                        name='storytimesummary_unique_key'),
+                ],
+            },
+        ),
+    ]
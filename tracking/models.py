@@ -1,11 +1,27 @@
+import itertools
+from collections import defaultdict
 from dataclasses import dataclass
-from datetime import timedelta
+from datetime import datetime, timedelta
+from typing import NamedTuple
 
 from django.utils import timezone
-from django.db import models
+from django.db import IntegrityError, models, transaction
 
 
-from epics.models import UserStory, StoryStatus, Contributor
+from epics.cache import EpicCache
+from epics.models import (
+    Contributor,
+    Epic,
+    EpicCounters,
+    StoryStatus,
+    UserStory,
+    counter_name,
+)
+
+from .days import clip, day_of, midnight, split_by_day, whole_days
+
+
+epic_stats_cache = EpicCache("epic_stats")
 
 
 @dataclass
@@ -14,7 +30,65 @@ class Stats:
     total_work_time: int = 0
 
 
+class StatsParts(NamedTuple):
+    """
+    What `StatusChange.epic_stats` needs to be computed at any time, the
+    `open_count` open intervals lasting `open_time` at `time`.
+    """
+    time: datetime
+    closed_time: timedelta
+    open_time: timedelta
+    open_count: int
+    work_time: timedelta
+
+    @classmethod
+    def from_aggregates(cls, time, closed_time=None, open_time=None,
+                        open_count=0, work_time=None, archived_time=None,
+                        archived_work_time=None):
+        return cls(
+            time=time,
+            closed_time=(
+                (closed_time or timedelta()) + (archived_time or timedelta())
+            ),
+            open_time=open_time or timedelta(),
+            open_count=open_count or 0,
+            work_time=(
+                (work_time or timedelta())
+                + (archived_work_time or timedelta())
+            ),
+        )
+
+    def at(self, time):
+        return Stats(
+            total_time=(
+                self.closed_time
+                + self.open_time
+                + self.open_count * (time - self.time)
+            ),
+            total_work_time=self.work_time,
+        )
+
+
+class Interval(NamedTuple):
+    start: object
+    duration: timedelta
+    contributor_id: int
+    epic_id: int
+    status: str
+
+
 class StatusChange(models.Model):
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["story", "-time"],
+                name="statuschange_story_time_idx",
+            ),
+            models.Index(
+                fields=["contributor", "new_status", "time"],
+                name="statuschange_contrib_time_idx",
+            ),
+        ]
 
     time = models.DateTimeField(default=timezone.now)
 
@@ -39,77 +113,766 @@ class StatusChange(models.Model):
     def __str__(self):
         return f"{self.time.isoformat()}: {self.story} {self.new_status}"
 
+    @staticmethod
+    def stats_aggregates(time):
+        """
+        Aggregates of `epic_stats` at `time`: closed intervals have their
+        duration, the open interval of an unfinished story lasts until
+        `time`.
+        """
+        open_interval = (
+            models.Q(duration__isnull=True)
+            & ~models.Q(
+                story__status__in=(StoryStatus.CANCELED, StoryStatus.FINISHED)
+            )
+        )
+        return dict(
+            closed_time=models.Sum("duration"),
+            open_time=models.Sum(
+                models.ExpressionWrapper(
+                    models.Value(time) - models.F("time"),
+                    output_field=models.DurationField(),
+                ),
+                filter=open_interval,
+            ),
+            open_count=models.Count("id", filter=open_interval),
+            work_time=models.Sum(
+                "duration",
+                filter=models.Q(new_status=StoryStatus.IN_PROGRESS),
+            ),
+        )
+
+    @staticmethod
+    def stats_parts(epic_ids, time):
+        """
+        `StatsParts` of each of `epic_ids` at `time`, with one query on the
+        events and one on the summaries of the archived stories.
+        """
+        if not epic_ids:
+            return {}
+        aggregates = {epic_id: {} for epic_id in epic_ids}
+        for queryset, epic_aggregates in (
+            (StatusChange.objects, StatusChange.stats_aggregates(time)),
+            (StoryTimeSummary.objects, StoryTimeSummary.stats_aggregates()),
+        ):
+            for elem in (
+                queryset
+                .filter(story__epic__in=epic_ids)
+                .values("story__epic")
+                .annotate(**epic_aggregates)
+                .order_by()
+            ):
+                aggregates[elem.pop("story__epic")].update(elem)
+        return {
+            epic_id: StatsParts.from_aggregates(time, **epic_aggregates)
+            for epic_id, epic_aggregates in aggregates.items()
+        }
+
     @staticmethod
     def epic_stats(epic, time=None):
+        """
+        Time spent in the stories of `epic` up to `time`, and time spent
+        working on them, the archived stories being read from their
+        summaries.
+        """
+        epic_id = getattr(epic, "pk", epic)
+        return StatusChange.epic_stats_many([epic_id], time)[epic_id]
+
+    @staticmethod
+    def epic_stats_many(epics, time=None):
+        """
+        `epic_stats` of each of `epics` (epics or ids) as a dict keyed by
+        epic id. Their `StatsParts` are cached by epic version, only the
+        epics changed since they were cached are queried.
+        """
         if not time:
             time = timezone.now()
-        qs = (
-            StatusChange.objects
-            .filter(story__epic=epic)
+        epic_ids = [getattr(epic, "pk", epic) for epic in epics]
+        versions = (
+            EpicCounters.versions(epic_ids)
+            if epic_stats_cache.enabled else {}
         )
-        unfinished_stories_events = (
-            qs.exclude(story__status=StoryStatus.CANCELED)
-            .exclude(story__status=StoryStatus.FINISHED)
-        )
-        unfinished_stories_last_events = (
-            unfinished_stories_events.annotate(
-                last_event=models.Window(
-                    models.Max("time"),
-                    partition_by="story"
-                )
-            )
-            .filter(time=models.F("last_event"))
-        )
-        return Stats(
-            total_time=(
-                qs.aggregate(total=models.Sum("duration"))["total"]
-                + (
-                    unfinished_stories_last_events
-                    .annotate(current_duration=time - models.F("time"))
-                    .aggregate(total=models.Sum(models.F("current_duration")))
-                )["total"]
-            ),
-            total_work_time=(
-                qs.filter(new_status=StoryStatus.IN_PROGRESS)
-                .aggregate(total=models.Sum("duration"))
-            )["total"]
+        parts = epic_stats_cache.get_many(
+            versions,
+            lambda missing: StatusChange.stats_parts(missing, time),
         )
+        parts.update(StatusChange.stats_parts(
+            [epic_id for epic_id in epic_ids if epic_id not in parts],
+            time,
+        ))
+        return {epic_id: parts[epic_id].at(time) for epic_id in epic_ids}
 
     @staticmethod
     def epic_contributor_time(epic, contributor):
         return (
-            StatusChange.objects
-            .filter(story__epic=epic)
+            DailyWorkTime.objects
+            .filter(epic=epic)
             .filter(contributor=contributor)
-            .filter(new_status=StoryStatus.IN_PROGRESS)
+            .filter(status=StoryStatus.IN_PROGRESS)
             .aggregate(total=models.Sum("duration"))
         )["total"] or timedelta()
 
     @staticmethod
     def story_contributor_time(story, contributor):
-        return (
+        live = (
             StatusChange.objects
             .filter(story=story)
             .filter(contributor=contributor)
             .filter(new_status=StoryStatus.IN_PROGRESS)
             .aggregate(total=models.Sum("duration"))
         )["total"] or timedelta()
-
-    @staticmethod
-    def period_contributor_time(contributor, start_time, end_time):
-        return (
-            StatusChange.objects
-            .filter(time__gte=start_time)
-            .filter(time__lte=end_time)
+        archived = (
+            StoryTimeSummary.objects
+            .filter(story=story)
             .filter(contributor=contributor)
-            .filter(new_status=StoryStatus.IN_PROGRESS)
+            .filter(status=StoryStatus.IN_PROGRESS)
             .aggregate(total=models.Sum("duration"))
         )["total"] or timedelta()
+        return live + archived
+
+    @staticmethod
+    def period_contributor_time(contributor, start_time, end_time,
+                                include_ongoing=False):
+        """
+        Time spent working by `contributor` between `start_time` and
+        `end_time`, see `team_time_report`.
+        """
+        return StatusChange.team_time_report(
+            start_time,
+            end_time,
+            contributors=[contributor],
+            include_ongoing=include_ongoing,
+        ).get(contributor.pk, timedelta())
+
+    @staticmethod
+    def team_time_report(start_time, end_time, epic=None, contributors=None,
+                         by_epic=False, include_ongoing=False):
+        """
+        Time spent working by each contributor between `start_time` and
+        `end_time`, as a dict keyed by contributor id, or by (contributor
+        id, epic id) pairs with `by_epic`. Intervals crossing the period
+        bounds are clipped. Like the other work time helpers only closed
+        intervals count, unless `include_ongoing` where the ongoing ones
+        last until now.
+
+        Whole days are summed by a single grouped query on the daily
+        rollup, events are only read for the partial days at both ends of
+        the period, back to the earliest start the rollup allows for them
+        (see `DailyWorkTime.earliest_starts`), and for the ongoing
+        intervals.
+        """
+        def key(contributor_id, epic_id):
+            return (contributor_id, epic_id) if by_epic else contributor_id
+
+        totals = defaultdict(timedelta)
+        work_time = DailyWorkTime.objects.filter(
+            status=StoryStatus.IN_PROGRESS,
+        )
+        if epic is not None:
+            work_time = work_time.filter(epic=epic)
+        if contributors is not None:
+            work_time = work_time.filter(contributor__in=contributors)
+        first_day, end_day = whole_days(start_time, end_time)
+        if first_day >= end_day:
+            edges = [(start_time, end_time)]
+        else:
+            edges = [
+                (start_time, midnight(first_day)),
+                (midnight(end_day), end_time),
+            ]
+            for elem in (
+                work_time
+                .filter(day__gte=first_day)
+                .filter(day__lt=end_day)
+                .values("contributor", *(["epic"] if by_epic else []))
+                .annotate(total=models.Sum("duration"))
+                .order_by()
+            ):
+                totals[key(elem["contributor"], elem.get("epic"))] += (
+                    elem["total"]
+                )
+        edges = [(start, end) for start, end in edges if start < end]
+        earliest = DailyWorkTime.earliest_starts(
+            [day_of(start) for start, _ in edges],
+            work_time,
+        )
+        now = timezone.now()
+        # closed intervals overlapping the partial days, ongoing intervals
+        # overlapping the period
+        overlapping = models.Q()
+        for edge_start, edge_end in edges:
+            overlapping |= models.Q(
+                duration__isnull=False,
+                time__gte=earliest[day_of(edge_start)],
+                time__lt=edge_end,
+                end__gt=edge_start,
+            )
+        if include_ongoing:
+            overlapping |= models.Q(duration__isnull=True, time__lt=end_time)
+        if not overlapping:
+            return dict(totals)
+        for model in (StatusChange, ArchivedStatusChange):
+            events = (
+                model.objects
+                .filter(new_status=StoryStatus.IN_PROGRESS)
+                .filter(contributor__isnull=False)
+            )
+            if epic is not None:
+                events = events.filter(story__epic=epic)
+            if contributors is not None:
+                events = events.filter(contributor__in=contributors)
+            for contributor_id, epic_id, start, duration in (
+                events
+                .alias(
+                    end=models.ExpressionWrapper(
+                        models.F("time") + models.F("duration"),
+                        output_field=models.DateTimeField(),
+                    )
+                )
+                .filter(overlapping)
+                .values_list("contributor", "story__epic", "time", "duration")
+            ):
+                if duration is None:
+                    total = clip(start, now - start, start_time, end_time)
+                else:
+                    total = sum(
+                        (
+                            clip(start, duration, edge_start, edge_end)
+                            for edge_start, edge_end in edges
+                        ),
+                        timedelta(),
+                    )
+                if total:
+                    totals[key(contributor_id, epic_id)] += total
+        return dict(totals)
+
+    @staticmethod
+    def story_timeline(story, archived=None):
+        """
+        Status changes of `story` in time order, read from the archive for
+        an archived story. `archived` is looked up when not given.
+        """
+        if archived is None:
+            archived = (
+                ArchivedStatusChange.objects.filter(story=story).exists()
+            )
+        model = ArchivedStatusChange if archived else StatusChange
+        return (
+            model.objects
+            .filter(story=story)
+            .select_related("contributor__user")
+            .only(
+                "time",
+                "new_status",
+                "duration",
+                "contributor__user__username",
+                "contributor__user__first_name",
+                "contributor__user__last_name",
+            )
+            .order_by("time", "id")
+        )
+
+
+class CurrentInterval(models.Model):
+    """
+    Points at the status change a story is currently in, the only one of
+    its changes with an open duration, so that recording a new status does
+    not have to look for the story's last change.
+    """
+    story = models.OneToOneField(
+        UserStory,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="current_interval",
+    )
+    change = models.OneToOneField(
+        StatusChange,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+
+    def __str__(self):
+        return f"{self.story_id}: {self.change_id}"
+
+
+class DailyWorkTime(models.Model):
+    """
+    Time spent in each status per day, contributor and epic, summed from
+    the closed status change intervals, an interval spanning midnight
+    being split between both days.
+    """
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "contributor", "epic", "status"],
+                name="dailyworktime_unique_key",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["contributor", "status", "day"],
+                name="dailyworktime_contrib_day_idx",
+            ),
+            models.Index(
+                fields=["epic", "contributor", "status"],
+                name="dailyworktime_epic_idx",
+            ),
+        ]
+
+    day = models.DateField()
+    contributor = models.ForeignKey(
+        Contributor,
+        on_delete=models.CASCADE,
+    )
+    epic = models.ForeignKey(
+        Epic,
+        on_delete=models.CASCADE,
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=StoryStatus,
+    )
+    duration = models.DurationField(default=timedelta)
+
+    @staticmethod
+    def earliest_starts(days, work_time):
+        """
+        Earliest start of the closed intervals rolled up in `work_time`
+        that overlap each of `days`, as a dict keyed by day, read with one
+        query. An interval started before a day fills all the days in
+        between, each of them being rolled up as a full day: going back
+        over the consecutive full days bounds the start.
+        """
+        if not days:
+            return {}
+        full_days = (
+            work_time
+            .filter(day__lt=max(days))
+            # days are one hour short when the clocks go forward
+            .filter(duration__gte=timedelta(hours=23))
+            .order_by("-day")
+            .values_list("day", flat=True)
+            .distinct()
+            .iterator()
+        )
+        read = set()
+        last_read = next(full_days, None)
+
+        def is_full(day):
+            nonlocal last_read
+            while last_read is not None and last_read >= day:
+                read.add(last_read)
+                last_read = next(full_days, None)
+            return day in read
+
+        starts = {}
+        for day in sorted(set(days), reverse=True):
+            previous = day - timedelta(days=1)
+            while is_full(previous):
+                previous -= timedelta(days=1)
+            starts[day] = midnight(previous)
+        return starts
 
     @staticmethod
-    def story_timeline(story):
+    def sum_by_key(intervals):
+        totals = defaultdict(timedelta)
+        for interval in intervals:
+            # nobody to account the time to
+            if interval.contributor_id is None or not interval.duration:
+                continue
+            for day, duration in split_by_day(
+                    interval.start, interval.duration):
+                totals[(
+                    day,
+                    interval.contributor_id,
+                    interval.epic_id,
+                    interval.status,
+                )] += duration
+        return totals
+
+    @classmethod
+    def add_intervals(cls, intervals):
+        for (day, contributor_id, epic_id, status), duration in (
+            cls.sum_by_key(intervals).items()
+        ):
+            key = dict(
+                day=day,
+                contributor_id=contributor_id,
+                epic_id=epic_id,
+                status=status,
+            )
+            increment = dict(duration=models.F("duration") + duration)
+            if cls.objects.filter(**key).update(**increment):
+                continue
+            try:
+                with transaction.atomic():
+                    cls.objects.create(duration=duration, **key)
+            except IntegrityError:
+                cls.objects.filter(**key).update(**increment)
+
+    @classmethod
+    @transaction.atomic
+    def rebuild(cls, epic_ids=None):
+        """
+        Recompute the rows of `epic_ids` (all epics by default) from the
+        status changes and return how many rows were written.
+        """
+        sources = [
+            StatusChange.objects.all(),
+            ArchivedStatusChange.objects.all(),
+        ]
+        rows = cls.objects.all()
+        if epic_ids is not None:
+            sources = [
+                changes.filter(story__epic__in=epic_ids) for changes in sources
+            ]
+            rows = rows.filter(epic__in=epic_ids)
+        rows.delete()
+        totals = cls.sum_by_key(
+            Interval(*values)
+            for changes in sources
+            for values in (
+                changes
+                .filter(duration__isnull=False)
+                .values_list(
+                    "time",
+                    "duration",
+                    "contributor",
+                    "story__epic",
+                    "new_status",
+                )
+                .iterator(chunk_size=5000)
+            )
+        )
+        cls.objects.bulk_create(
+            (
+                cls(
+                    day=day,
+                    contributor_id=contributor_id,
+                    epic_id=epic_id,
+                    status=status,
+                    duration=duration,
+                )
+                for (day, contributor_id, epic_id, status), duration
+                in totals.items()
+            ),
+            batch_size=1000,
+        )
+        return len(totals)
+
+    def __str__(self):
+        return (
+            f"{self.day}: {self.contributor_id} {self.epic_id} "
+            f"{self.status} {self.duration}"
+        )
+
+
+COUNTER_FIELDS = [counter_name(status) for status in StoryStatus]
+
+
+class DailyEpicSnapshot(models.Model):
+    """
+    Number of stories per status of an epic at the end of a day, the rows
+    of the epic's cumulative flow diagram. Days without any status change
+    have no row, they carry the counts of the previous snapshot.
+    """
+    class Meta:
+        constraints = [
+            # also the index of the range queries on an epic's days
+            models.UniqueConstraint(
+                fields=["epic", "day"],
+                name="dailyepicsnapshot_unique_key",
+            ),
+        ]
+
+    epic = models.ForeignKey(
+        Epic,
+        on_delete=models.CASCADE,
+    )
+    day = models.DateField()
+    created = models.IntegerField(default=0)
+    in_progress = models.IntegerField(default=0)
+    suspended = models.IntegerField(default=0)
+    canceled = models.IntegerField(default=0)
+    finished = models.IntegerField(default=0)
+
+    @classmethod
+    def save_counts(cls, counts):
+        """
+        Write `counts`, a dict of counter values keyed by (epic id, day),
+        replacing the existing snapshots.
+        """
+        cls.objects.bulk_create(
+            (
+                cls(epic_id=epic_id, day=day, **values)
+                for (epic_id, day), values in counts.items()
+            ),
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=["epic", "day"],
+            update_fields=COUNTER_FIELDS,
+        )
+
+    @classmethod
+    def take(cls, epic_ids, time=None):
+        """
+        Copy the current counters of `epic_ids` to the snapshot of the day
+        of `time`.
+        """
+        day = day_of(time or timezone.now())
+        cls.save_counts({
+            (values.pop("epic"), day): values
+            for values in (
+                EpicCounters.objects
+                .filter(epic__in=epic_ids)
+                .values("epic", *COUNTER_FIELDS)
+            )
+        })
+
+    @classmethod
+    @transaction.atomic
+    def rebuild(cls, epic_ids=None):
+        """
+        Replay the status changes of `epic_ids` (all epics by default) to
+        recompute their snapshots and return how many rows were written.
+        """
+        sources = [
+            StatusChange.objects.all(),
+            ArchivedStatusChange.objects.all(),
+        ]
+        snapshots = cls.objects.all()
+        if epic_ids is not None:
+            sources = [
+                changes.filter(story__epic__in=epic_ids) for changes in sources
+            ]
+            snapshots = snapshots.filter(epic__in=epic_ids)
+        snapshots.delete()
+        # status changes per (epic, day), replayed story by story, a story's
+        # changes being either all live or all archived
+        deltas = defaultdict(lambda: defaultdict(int))
+        story_id = status = None
+        for epic_id, change_story_id, new_status, time in (
+            itertools.chain.from_iterable(
+                changes
+                .order_by("story", "time", "id")
+                .values_list("story__epic", "story", "new_status", "time")
+                .iterator(chunk_size=5000)
+                for changes in sources
+            )
+        ):
+            if change_story_id != story_id:
+                story_id, status = change_story_id, None
+            if new_status == status:
+                continue
+            day_deltas = deltas[(epic_id, day_of(time))]
+            if status is not None:
+                day_deltas[counter_name(status)] -= 1
+            day_deltas[counter_name(new_status)] += 1
+            status = new_status
+        counts = {}
+        running = defaultdict(lambda: dict.fromkeys(COUNTER_FIELDS, 0))
+        for epic_id, day in sorted(deltas):
+            values = running[epic_id]
+            for name, delta in deltas[(epic_id, day)].items():
+                values[name] += delta
+            counts[(epic_id, day)] = dict(values)
+        cls.save_counts(counts)
+        return len(counts)
+
+    @classmethod
+    def cumulative_flow(cls, epic, first_day, last_day):
+        """
+        Counts of `epic` for each day from `first_day` to `last_day`, read
+        with a single range query including the last snapshot before
+        `first_day`.
+        """
+        previous = (
+            cls.objects
+            .filter(epic=epic, day__lt=first_day)
+            .order_by("-day")
+            .values("day")[:1]
+        )
+        snapshots = (
+            cls.objects
+            .filter(epic=epic)
+            .filter(
+                models.Q(day__range=(first_day, last_day))
+                | models.Q(day=models.Subquery(previous))
+            )
+            .order_by("day")
+            .values("day", *COUNTER_FIELDS)
+        )
+        days = []
+        counts = dict.fromkeys(COUNTER_FIELDS, 0)
+        snapshots = iter(snapshots)
+        snapshot = next(snapshots, None)
+        day = first_day
+        while day <= last_day:
+            while snapshot is not None and snapshot["day"] <= day:
+                counts = {name: snapshot[name] for name in COUNTER_FIELDS}
+                snapshot = next(snapshots, None)
+            days.append({"day": day, **counts})
+            day += timedelta(days=1)
+        return days
+
+    def __str__(self):
+        return f"{self.day}: {self.epic_id}"
+
+
+CLOSED_STATUSES = (StoryStatus.CANCELED, StoryStatus.FINISHED)
+
+
+class ArchivedStatusChange(models.Model):
+    """
+    Status changes of the stories closed for a long time, moved out of
+    `StatusChange` by `archive_stories` with their ids. The live queries
+    read `StoryTimeSummary` instead, this table keeps the detail for the
+    rebuilds and the period reports.
+    """
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["story", "time"],
+                name="archivedchange_story_time_idx",
+            ),
+            models.Index(
+                fields=["contributor", "new_status", "time"],
+                name="archivedchange_contrib_idx",
+            ),
+        ]
+
+    id = models.BigIntegerField(primary_key=True)
+    time = models.DateTimeField()
+    story = models.ForeignKey(
+        UserStory,
+        on_delete=models.CASCADE,
+    )
+    new_status = models.CharField(
+        max_length=20,
+        choices=StoryStatus,
+    )
+    contributor = models.ForeignKey(
+        Contributor,
+        on_delete=models.PROTECT,
+        null=True,
+    )
+    duration = models.DurationField(null=True, blank=True)
+
+    FIELDS = ("id", "time", "story", "new_status", "contributor", "duration")
+
+    @staticmethod
+    def archivable_stories(before):
+        """
+        Closed stories whose last status change happened before `before`.
+        """
         return (
             StatusChange.objects
-            .select_related("story")
-            .select_related("story__epic")
+            .filter(story__status__in=CLOSED_STATUSES)
+            .values("story")
+            .annotate(last_change=models.Max("time"))
+            .filter(last_change__lt=before)
+            .values_list("story", flat=True)
+            .order_by("story")
+        )
+
+    @classmethod
+    @transaction.atomic
+    def archive_stories(cls, story_ids):
+        """
+        Move the status changes of `story_ids`, closed stories, to the
+        archive and sum their durations in `StoryTimeSummary`. Return the
+        number of status changes archived.
+        """
+        changes = StatusChange.objects.filter(story__in=story_ids)
+        archived = cls.objects.bulk_create(
+            (
+                cls(
+                    id=pk,
+                    time=time,
+                    story_id=story_id,
+                    new_status=new_status,
+                    contributor_id=contributor_id,
+                    duration=duration,
+                )
+                for pk, time, story_id, new_status, contributor_id, duration
+                in changes.values_list(*cls.FIELDS)
+            ),
+            batch_size=1000,
+        )
+        StoryTimeSummary.objects.bulk_create(
+            (
+                StoryTimeSummary(
+                    story_id=elem["story"],
+                    contributor_id=elem["contributor"],
+                    status=elem["new_status"],
+                    duration=elem["total"] or timedelta(),
+                    changes=elem["changes"],
+                )
+                for elem in (
+                    changes
+                    .values("story", "contributor", "new_status")
+                    .annotate(
+                        total=models.Sum("duration"),
+                        changes=models.Count("id"),
+                    )
+                    .order_by()
+                )
+            ),
+            batch_size=1000,
+        )
+        changes.delete()
+        return len(archived)
+
+    def __str__(self):
+        return f"{self.time.isoformat()}: {self.story_id} {self.new_status}"
+
+
+class StoryTimeSummary(models.Model):
+    """
+    Time spent by an archived story in each status per contributor, what
+    the live queries need of the archived status changes.
+    """
+    class Meta:
+        verbose_name_plural = "Story time summaries"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["story", "contributor", "status"],
+                name="storytimesummary_unique_key",
+            ),
+        ]
+
+    story = models.ForeignKey(
+        UserStory,
+        on_delete=models.CASCADE,
+    )
+    contributor = models.ForeignKey(
+        Contributor,
+        on_delete=models.PROTECT,
+        null=True,
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=StoryStatus,
+    )
+    duration = models.DurationField(default=timedelta)
+    changes = models.IntegerField(default=0)
+
+    @staticmethod
+    def stats_aggregates():
+        """
+        Aggregates completing the ones of `StatusChange.stats_aggregates`,
+        archived stories being closed they have no open interval.
+        """
+        return dict(
+            archived_time=models.Sum("duration"),
+            archived_work_time=models.Sum(
+                "duration",
+                filter=models.Q(status=StoryStatus.IN_PROGRESS),
+            ),
+        )
+
+    def __str__(self):
+        return (
+            f"{self.story_id}: {self.contributor_id} {self.status} "
+            f"{self.duration}"
         )
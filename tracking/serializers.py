@@ -0,0 +1,71 @@
+from rest_framework import serializers
+
+from epics.models import Contributor
+from .models import DailyEpicSnapshot, StatusChange
+
+
+class ContributorNameSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Contributor
+        fields = ['id', 'username', 'fullname']
+
+    username = serializers.CharField(source='user.username')
+
+
+class TimelineEventSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = StatusChange
+        fields = ['id', 'time', 'new_status', 'duration', 'contributor']
+
+    contributor = ContributorNameSerializer(read_only=True)
+
+
+class CumulativeFlowQuerySerializer(serializers.Serializer):
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+
+
+class CumulativeFlowDaySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DailyEpicSnapshot
+        fields = [
+            'day',
+            'created',
+            'in_progress',
+            'suspended',
+            'canceled',
+            'finished',
+        ]
+
+
+class TeamTimeQuerySerializer(serializers.Serializer):
+    start = serializers.DateTimeField()
+    end = serializers.DateTimeField()
+    epic = serializers.IntegerField(required=False)
+    by_epic = serializers.BooleanField(default=False)
+    include_ongoing = serializers.BooleanField(default=False)
+
+    def validate(self, data):
+        if data["start"] >= data["end"]:
+            raise serializers.ValidationError("start is not before end")
+        return data
+
+
+class EpicWorkTimeSerializer(serializers.Serializer):
+    epic = serializers.IntegerField()
+    work_time = serializers.DurationField()
+
+
+class ContributorWorkTimeSerializer(serializers.Serializer):
+    contributor = ContributorNameSerializer()
+    work_time = serializers.DurationField()
+    epics = EpicWorkTimeSerializer(many=True, required=False)
+
+
+class ForecastSerializer(serializers.Serializer):
+    remaining = serializers.IntegerField()
+    history_weeks = serializers.IntegerField()
+    runs = serializers.IntegerField()
+    p50 = serializers.DateField(allow_null=True)
+    p85 = serializers.DateField(allow_null=True)
+    p95 = serializers.DateField(allow_null=True)
@@ -0,0 +1,170 @@
+from datetime import date, datetime, timedelta, timezone
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from epics.models import Epic, UserStory, StoryStatus, Contributor
+
+from tracking.days import day_of
+from tracking.models import (
+    ArchivedStatusChange,
+    DailyEpicSnapshot,
+    StatusChange,
+)
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+class EpicSnapshotTestCase(TestCase):
+
+    def setUp(self):
+        self.po_user = User.objects.create(username="po_test")
+        self.product_owner = Contributor.objects.create(user=self.po_user)
+        self.dev1_user = User.objects.create(username="dev1_test")
+        self.dev1 = Contributor.objects.create(user=self.dev1_user)
+        self.epic = Epic.objects.create(
+            title="Test epic",
+            description="test epic",
+            owner=self.product_owner,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.po_user)
+
+    def new_story(self, title):
+        return self.product_owner.new_story(
+            epic=self.epic,
+            title=title,
+            description="a test story",
+        )
+
+    def record(self, story, history):
+        for time, status in history:
+            StatusChange.objects.create(
+                story=story,
+                time=time,
+                new_status=status,
+                contributor=self.product_owner,
+            )
+
+    def url(self, epic):
+        return f"/epics-api/epics/{epic.pk}/cfd/"
+
+    def test_status_change_updates_snapshot(self):
+        us1 = self.new_story("us1")
+        self.new_story("us2")
+        self.dev1.take(us1)
+        self.dev1.bulk_take([us1.pk])
+        snapshot = DailyEpicSnapshot.objects.get(epic=self.epic)
+        self.assertEqual(snapshot.day, day_of(us1.pub_date))
+        self.assertEqual(snapshot.created, 1)
+        self.assertEqual(snapshot.in_progress, 1)
+        self.product_owner.bulk_validate([us1.pk])
+        snapshot.refresh_from_db()
+        self.assertEqual(snapshot.in_progress, 0)
+        self.assertEqual(snapshot.finished, 1)
+
+    def test_rebuild_replays_history(self):
+        us1 = UserStory.objects.create(
+            epic=self.epic,
+            title="story 1",
+            description="a test story",
+            status=StoryStatus.FINISHED,
+        )
+        us2 = UserStory.objects.create(
+            epic=self.epic,
+            title="story 2",
+            description="a test story",
+            status=StoryStatus.SUSPENDED,
+        )
+        self.record(us1, [
+            (utc(2012, 3, 3, 14), StoryStatus.CREATED),
+            (utc(2012, 3, 4, 14), StoryStatus.IN_PROGRESS),
+            (utc(2012, 3, 6, 14), StoryStatus.FINISHED),
+        ])
+        self.record(us2, [
+            (utc(2012, 3, 4, 9), StoryStatus.CREATED),
+            (utc(2012, 3, 4, 10), StoryStatus.IN_PROGRESS),
+            (utc(2012, 3, 6, 10), StoryStatus.SUSPENDED),
+        ])
+        # archived histories are replayed too
+        ArchivedStatusChange.archive_stories([us1.pk])
+        out = StringIO()
+        call_command("rebuild_epic_snapshots", str(self.epic.pk), stdout=out)
+        self.assertIn("3 snapshot(s) written", out.getvalue())
+        days = DailyEpicSnapshot.cumulative_flow(
+            self.epic,
+            date(2012, 3, 2),
+            date(2012, 3, 7),
+        )
+        self.assertEqual(
+            [
+                (day["day"].day, day["created"], day["in_progress"],
+                 day["suspended"], day["finished"])
+                for day in days
+            ],
+            [
+                (2, 0, 0, 0, 0),
+                (3, 1, 0, 0, 0),
+                (4, 0, 2, 0, 0),
+                (5, 0, 2, 0, 0),
+                (6, 0, 0, 1, 1),
+                (7, 0, 0, 1, 1),
+            ],
+        )
+
+    def test_cfd_endpoint(self):
+        story = UserStory.objects.create(
+            epic=self.epic,
+            title="story",
+            description="a test story",
+        )
+        self.record(story, [
+            (utc(2012, 3, 3, 14), StoryStatus.CREATED),
+            (utc(2012, 3, 10, 14), StoryStatus.CANCELED),
+        ])
+        DailyEpicSnapshot.rebuild()
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                f"{self.url(self.epic)}?start=2012-03-09&end=2012-03-11"
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(day["day"], day["created"], day["canceled"])
+             for day in response.data],
+            [
+                ("2012-03-09", 1, 0),
+                ("2012-03-10", 0, 1),
+                ("2012-03-11", 0, 1),
+            ],
+        )
+
+    def test_cfd_defaults_to_last_days(self):
+        self.new_story("us1")
+        response = self.client.get(self.url(self.epic))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 30)
+        self.assertEqual(response.data[-1]["created"], 1)
+        self.assertEqual(response.data[0]["created"], 0)
+
+    def test_cfd_invalid_range(self):
+        response = self.client.get(
+            f"{self.url(self.epic)}?start=2012-03-09&end=2012-03-01"
+        )
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(
+            f"{self.url(self.epic)}?start=2010-01-01&end=2012-03-01"
+        )
+        self.assertEqual(response.status_code, 400)
+        # checked against the default end, today
+        tomorrow = day_of(datetime.now(timezone.utc)) + timedelta(days=1)
+        response = self.client.get(
+            f"{self.url(self.epic)}?start={tomorrow.isoformat()}"
+        )
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get("/epics-api/epics/0/cfd/")
+        self.assertEqual(response.status_code, 404)
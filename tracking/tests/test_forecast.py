@@ -0,0 +1,140 @@
+from datetime import date, datetime, timezone, timedelta
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from epics.models import Epic, UserStory, StoryStatus, Contributor
+
+from tracking import analytics
+from tracking.forecast import (
+    cached_forecast,
+    forecast,
+    forecast_cache,
+    simulate_weeks,
+    weekly_throughput,
+)
+from tracking.models import StatusChange
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+class ForecastTestCase(TestCase):
+
+    def setUp(self):
+        self.po_user = User.objects.create(username="po_test")
+        self.product_owner = Contributor.objects.create(user=self.po_user)
+        self.epic = Epic.objects.create(
+            title="Test epic",
+            description="test epic",
+            owner=self.product_owner,
+        )
+        # two stories finished per week over four weeks from Monday the
+        # 5th of March 2012, four stories left
+        for i in range(12):
+            story = UserStory.objects.create(
+                epic=self.epic,
+                title=f"story {i}",
+                description="a test story",
+                status=StoryStatus.FINISHED if i < 8 else StoryStatus.CREATED,
+            )
+            StatusChange.objects.create(
+                story=story,
+                time=utc(2012, 3, 5, 10),
+                new_status=StoryStatus.CREATED,
+                contributor=self.product_owner,
+            )
+            if i < 8:
+                StatusChange.objects.create(
+                    story=story,
+                    time=utc(2012, 3, 5, 12) + timedelta(weeks=i // 2),
+                    new_status=StoryStatus.FINISHED,
+                    contributor=self.product_owner,
+                )
+        self.now = utc(2012, 4, 4, 12)
+
+    def test_weekly_throughput(self):
+        events = analytics.events_for(epic=self.epic)
+        self.assertEqual(
+            weekly_throughput(events, self.now).tolist(),
+            [2, 2, 2, 2],
+        )
+        self.assertEqual(
+            weekly_throughput(events, self.now, history_weeks=2).tolist(),
+            [2, 2],
+        )
+
+    def test_simulate_weeks(self):
+        rng = np.random.default_rng(0)
+        weeks = simulate_weeks(np.array([1, 3]), 6, 10_000, rng)
+        self.assertEqual(weeks.min(), 2)
+        self.assertEqual(weeks.max(), 6)
+        self.assertTrue(
+            np.isinf(simulate_weeks(np.array([0, 0]), 1, 10, rng)).all()
+        )
+        self.assertFalse(simulate_weeks(np.array([]), 0, 10, rng).any())
+
+    def test_simulate_weeks_past_the_first_block(self):
+        # one story every 100 weeks on average: the first block covers
+        # 304 weeks, the runs not done by then draw more weeks
+        throughput = np.array([0] * 99 + [1])
+        weeks = simulate_weeks(
+            throughput, 1, 10_000, np.random.default_rng(0),
+        )
+        finite = weeks[np.isfinite(weeks)]
+        self.assertGreater(finite.max(), 304)
+        self.assertLessEqual(finite.max(), 520)
+        self.assertLess(len(finite), len(weeks))
+        weeks = simulate_weeks(
+            throughput, 1, 1_000, np.random.default_rng(0), max_weeks=5_000,
+        )
+        self.assertTrue(np.isfinite(weeks).all())
+        self.assertEqual(weeks.min(), 1)
+
+    def test_forecast(self):
+        result = forecast(self.epic, now=self.now)
+        self.assertEqual(result["remaining"], 4)
+        self.assertEqual(result["history_weeks"], 4)
+        for percentile in ("p50", "p85", "p95"):
+            self.assertEqual(result[percentile], date(2012, 4, 18))
+
+    def test_forecast_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.po_user)
+        url = f"/epics-api/epics/{self.epic.pk}/forecast/"
+        response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["remaining"], 4)
+        # no finished story in the last year
+        self.assertIsNone(response.data["p50"])
+        with self.assertNumQueries(2):
+            self.assertEqual(client.get(url).data, response.data)
+        self.product_owner.new_story(
+            epic=self.epic,
+            title="story 13",
+            description="a test story",
+        )
+        self.assertEqual(client.get(url).data["remaining"], 5)
+        self.assertEqual(
+            client.get("/epics-api/epics/0/forecast/").status_code,
+            404,
+        )
+
+    def test_cached_forecast_follows_the_day(self):
+        forecast_cache.reset_counters()
+        result = cached_forecast(self.epic, now=self.now)
+        self.assertEqual(result["p50"], date(2012, 4, 18))
+        self.assertEqual(
+            cached_forecast(self.epic, now=self.now + timedelta(hours=6)),
+            result,
+        )
+        self.assertEqual(forecast_cache.hits, 1)
+        tomorrow = self.now + timedelta(days=1)
+        self.assertEqual(
+            cached_forecast(self.epic, now=tomorrow)["p50"],
+            date(2012, 4, 19),
+        )
+        self.assertEqual(forecast_cache.misses, 2)
@@ -0,0 +1,135 @@
+from datetime import datetime, timezone, timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from epics.models import Epic, UserStory, StoryStatus, Contributor
+
+from tracking.models import CurrentInterval, DailyWorkTime, StatusChange
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+class RebuildDurationsTestCase(TestCase):
+
+    def setUp(self):
+        self.po_user = User.objects.create(username="po_test")
+        self.product_owner = Contributor.objects.create(user=self.po_user)
+        self.epic = Epic.objects.create(
+            title="Test epic",
+            description="test epic",
+            owner=self.product_owner,
+        )
+        self.other_epic = Epic.objects.create(
+            title="Other epic",
+            description="test epic",
+            owner=self.product_owner,
+        )
+        self.stories = [
+            UserStory.objects.create(
+                epic=epic,
+                title=f"story {i}",
+                description="a test story",
+            )
+            for i, epic in enumerate(
+                [self.epic, self.epic, self.epic, self.other_epic]
+            )
+        ]
+        # imported histories, without or with wrong durations
+        statuses = [
+            StoryStatus.CREATED,
+            StoryStatus.SUSPENDED,
+            StoryStatus.CREATED,
+        ]
+        for i, story in enumerate(self.stories):
+            for hours, status in enumerate(statuses):
+                StatusChange.objects.create(
+                    story=story,
+                    time=utc(2012, 3, 3, 14) + timedelta(hours=hours * (i + 1)),
+                    new_status=status,
+                    contributor=self.product_owner,
+                    duration=timedelta(minutes=1) if hours % 2 else None,
+                )
+
+    def durations(self, story):
+        return list(
+            StatusChange.objects
+            .filter(story=story)
+            .order_by("time")
+            .values_list("duration", flat=True)
+        )
+
+    def rebuild(self, *args, **options):
+        out = StringIO()
+        call_command("rebuild_durations", *args, stdout=out, **options)
+        return out.getvalue()
+
+    def test_rebuild_durations(self):
+        # chunks smaller than a story's history
+        out = self.rebuild(chunk_size=2)
+        self.assertIn("8/12 duration(s) updated in 2 epic(s)", out)
+        for i, story in enumerate(self.stories):
+            self.assertEqual(
+                self.durations(story),
+                [timedelta(hours=i + 1), timedelta(hours=i + 1), None],
+            )
+            self.assertEqual(
+                CurrentInterval.objects.get(story=story).change,
+                StatusChange.objects.filter(story=story).latest("time"),
+            )
+        # nothing left to write on a second run
+        self.assertIn("0/12 duration(s) updated", self.rebuild())
+
+    def rollup(self):
+        return sorted(
+            DailyWorkTime.objects
+            .values_list("day", "contributor", "epic", "status", "duration")
+        )
+
+    def test_rebuild_updates_rollup(self):
+        self.assertIn(
+            (utc(2012, 3, 3).date(), self.product_owner.pk, self.epic.pk,
+             StoryStatus.SUSPENDED, timedelta(minutes=3)),
+            self.rollup(),
+        )
+        self.rebuild(self.other_epic.pk)
+        rebuilt = self.rollup()
+        self.assertIn(
+            (utc(2012, 3, 3).date(), self.product_owner.pk,
+             self.other_epic.pk, StoryStatus.CREATED, timedelta(hours=4)),
+            rebuilt,
+        )
+        # the other epic is left as it was
+        self.assertIn(
+            (utc(2012, 3, 3).date(), self.product_owner.pk, self.epic.pk,
+             StoryStatus.SUSPENDED, timedelta(minutes=3)),
+            rebuilt,
+        )
+        self.rebuild()
+        rebuilt = self.rollup()
+        DailyWorkTime.rebuild()
+        self.assertEqual(rebuilt, self.rollup())
+
+    def test_rebuild_resumes_after_epic(self):
+        out = self.rebuild(after=self.epic.pk)
+        self.assertIn("2/3 duration(s) updated in 1 epic(s)", out)
+        self.assertEqual(
+            self.durations(self.stories[0]),
+            [None, timedelta(minutes=1), None],
+        )
+        self.assertEqual(
+            self.durations(self.stories[3]),
+            [timedelta(hours=4), timedelta(hours=4), None],
+        )
+
+    def test_rebuild_selected_epics(self):
+        out = self.rebuild(str(self.epic.pk))
+        self.assertIn(f"epic {self.epic.pk} done (1/1)", out)
+        self.assertEqual(
+            self.durations(self.stories[3]),
+            [None, timedelta(minutes=1), None],
+        )
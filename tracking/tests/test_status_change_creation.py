@@ -1,12 +1,14 @@
 from datetime import timedelta
 
 from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 
 from epics.models import Epic, UserStory, StoryStatus, Contributor
 
-from tracking.models import StatusChange
+from tracking.models import CurrentInterval, StatusChange
 
 
 class StatusChangeTestCase(TestCase):
@@ -284,3 +286,117 @@ class StatusChangeTestCase(TestCase):
             previous_change.duration,
             timedelta()
         )
+
+    def test_bulk_transition_triggers_status_changes_creation(self):
+        stories = [
+            self.product_owner.new_story(
+                epic=self.epic,
+                title=f"story {i}",
+                description="a test story",
+            )
+            for i in range(3)
+        ]
+        self.product_owner.validate(stories[2])
+        self.assertEqual(StatusChange.objects.count(), 4)
+        with self.assertNumQueries(15):
+            self.product_owner.bulk_cancel(stories)
+        self.assertEqual(StatusChange.objects.count(), 6)
+        for story in stories[:2]:
+            changes = StatusChange.objects.filter(story=story).order_by("time")
+            self.assertEqual(
+                [change.new_status for change in changes],
+                [StoryStatus.CREATED, StoryStatus.CANCELED],
+            )
+            self.assertEqual(changes[1].contributor, self.product_owner)
+            self.assertGreater(changes[0].duration, timedelta())
+            self.assertIsNone(changes[1].duration)
+
+    def test_current_interval_follows_status_changes(self):
+        us = self.product_owner.new_story(
+            epic=self.epic,
+            title="a new story",
+            description="a test story",
+        )
+        first_change = StatusChange.objects.get(story=us)
+        self.assertEqual(
+            CurrentInterval.objects.get(story=us).change,
+            first_change,
+        )
+        with CaptureQueriesContext(connection) as queries:
+            self.dev1.take(us)
+        self.assertFalse([
+            query for query in queries.captured_queries
+            if "ORDER BY" in query["sql"]
+        ])
+        new_change = StatusChange.objects.get(
+            story=us,
+            new_status=StoryStatus.IN_PROGRESS,
+        )
+        self.assertEqual(
+            CurrentInterval.objects.get(story=us).change,
+            new_change,
+        )
+        first_change.refresh_from_db()
+        self.assertEqual(
+            first_change.duration,
+            new_change.time - first_change.time,
+        )
+        self.assertIsNone(new_change.duration)
+
+    def test_story_without_current_interval_closes_last_change(self):
+        us = self.product_owner.new_story(
+            epic=self.epic,
+            title="a new story",
+            description="a test story",
+        )
+        CurrentInterval.objects.all().delete()
+        self.dev1.take(us)
+        first_change, new_change = StatusChange.objects.order_by("time")
+        self.assertEqual(
+            first_change.duration,
+            new_change.time - first_change.time,
+        )
+        self.assertEqual(
+            CurrentInterval.objects.get(story=us).change,
+            new_change,
+        )
+
+    def test_bulk_transition_closes_last_change_without_pointer(self):
+        stories = [
+            self.product_owner.new_story(
+                epic=self.epic,
+                title=f"story {i}",
+                description="a test story",
+            )
+            for i in range(2)
+        ]
+        # imported history: changes without any interval pointer
+        StatusChange.objects.filter(story=stories[1]).delete()
+        CurrentInterval.objects.all().delete()
+        imported = StatusChange.objects.create(
+            story=stories[1],
+            new_status=StoryStatus.CREATED,
+            contributor=self.product_owner,
+            time=StatusChange.objects.get(story=stories[0]).time
+            - timedelta(days=2),
+        )
+        self.dev1.bulk_take(stories)
+        for story in stories:
+            first_change, new_change = (
+                StatusChange.objects.filter(story=story).order_by("time")
+            )
+            self.assertEqual(
+                first_change.duration,
+                new_change.time - first_change.time,
+            )
+            self.assertIsNone(new_change.duration)
+            self.assertEqual(
+                CurrentInterval.objects.get(story=story).change,
+                new_change,
+            )
+        imported.refresh_from_db()
+        self.assertGreater(imported.duration, timedelta(days=2))
+        self.assertEqual(
+            StatusChange.objects.filter(duration__isnull=True).count(),
+            2,
+        )
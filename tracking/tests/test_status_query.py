@@ -1,12 +1,21 @@
 from datetime import datetime, timezone, timedelta
+from io import StringIO
 
 from django.contrib.auth.models import User
-from django.test import TestCase
+from django.core.management import call_command
+from django.test import TestCase, override_settings
 
 
 from epics.models import Epic, UserStory, StoryStatus, Contributor
 
-from tracking.models import StatusChange
+from tracking import analytics
+from tracking.models import (
+    ArchivedStatusChange,
+    DailyWorkTime,
+    StatusChange,
+    StoryTimeSummary,
+    epic_stats_cache,
+)
 
 
 class StatusChangeTestCase(TestCase):
@@ -178,10 +187,11 @@ class StatusChangeTestCase(TestCase):
         )
 
     def test_epic_stats(self):
-        stats = StatusChange.epic_stats(
-            self.epic,
-            time=datetime(2012, 3, 7, 16, 0, tzinfo=timezone.utc),
-        )
+        with self.assertNumQueries(3):
+            stats = StatusChange.epic_stats(
+                self.epic,
+                time=datetime(2012, 3, 7, 16, 0, tzinfo=timezone.utc),
+            )
         self.assertEqual(
             stats.total_time,
             timedelta(days=15),
@@ -312,3 +322,212 @@ class StatusChangeTestCase(TestCase):
             us5_dev2_time,
             timedelta(),
         )
+
+    def test_epic_stats_many(self):
+        other_epic = Epic.objects.create(
+            title="Another epic",
+            description="test epic",
+            owner=self.product_owner,
+        )
+        time = datetime(2012, 3, 7, 16, 0, tzinfo=timezone.utc)
+        with self.assertNumQueries(3):
+            stats = StatusChange.epic_stats_many(
+                [self.epic, other_epic.pk],
+                time=time,
+            )
+        self.assertEqual(stats[self.epic.pk], StatusChange.epic_stats(
+            self.epic,
+            time=time,
+        ))
+        self.assertEqual(stats[other_epic.pk].total_time, timedelta())
+        self.assertEqual(stats[other_epic.pk].total_work_time, timedelta())
+
+    def test_epic_stats_cache(self):
+        time = datetime(2012, 3, 7, 16, 0, tzinfo=timezone.utc)
+        epic_stats_cache.reset_counters()
+        expected = StatusChange.epic_stats(self.epic, time=time)
+        # cached parts are valid at any time
+        with self.assertNumQueries(1):
+            later = StatusChange.epic_stats(
+                self.epic,
+                time=time + timedelta(days=1),
+            )
+        self.assertEqual(later.total_time, timedelta(days=16))
+        self.assertEqual(later.total_work_time, expected.total_work_time)
+        self.assertEqual(
+            (epic_stats_cache.hits, epic_stats_cache.misses),
+            (1, 1),
+        )
+        self.product_owner.new_story(
+            epic=self.epic,
+            title="story 6",
+            description="a test story",
+        )
+        with self.assertNumQueries(3):
+            stats = StatusChange.epic_stats(self.epic, time=time)
+        self.assertEqual(epic_stats_cache.misses, 2)
+        with override_settings(EPICS_CACHE_ENABLED=False):
+            self.assertEqual(
+                stats,
+                StatusChange.epic_stats(self.epic, time=time),
+            )
+        self.assertNotEqual(stats, expected)
+
+    @override_settings(EPICS_CACHE_ENABLED=False)
+    def test_epic_stats_without_cache(self):
+        epic_stats_cache.reset_counters()
+        for _ in range(2):
+            with self.assertNumQueries(2):
+                StatusChange.epic_stats(self.epic)
+        self.assertEqual(
+            (epic_stats_cache.hits, epic_stats_cache.misses),
+            (0, 0),
+        )
+
+    def test_archived_stories_keep_their_time(self):
+        time = datetime(2012, 3, 7, 16, 0, tzinfo=timezone.utc)
+        stories = [self.us1, self.us2, self.us3, self.us4, self.us5]
+        contributors = [self.dev1, self.dev2]
+        period = (
+            datetime(2012, 3, 4, 20, 0, tzinfo=timezone.utc),
+            datetime(2012, 3, 6, 17, 0, tzinfo=timezone.utc),
+        )
+
+        def measures():
+            return (
+                StatusChange.epic_stats(self.epic, time=time),
+                StatusChange.epic_stats_many([self.epic], time=time),
+                [
+                    StatusChange.story_contributor_time(story, contributor)
+                    for story in stories for contributor in contributors
+                ],
+                [
+                    StatusChange.period_contributor_time(contributor, *period)
+                    for contributor in contributors
+                ],
+            )
+
+        expected = measures()
+        out = StringIO()
+        call_command("archive_status_changes", days=30, stdout=out)
+        self.assertIn("16 status change(s) of 4 story(ies)", out.getvalue())
+        self.assertEqual(
+            list(StatusChange.objects.values_list("story", flat=True)),
+            [self.us5.pk],
+        )
+        self.assertEqual(ArchivedStatusChange.objects.count(), 16)
+        self.assertEqual(
+            StoryTimeSummary.objects.get(
+                story=self.us4,
+                contributor=self.dev2,
+                status=StoryStatus.IN_PROGRESS,
+            ).duration,
+            timedelta(days=1, hours=1),
+        )
+        self.assertEqual(measures(), expected)
+        self.assertEqual(
+            analytics.totals(analytics.events_for(epic=self.epic), now=time),
+            expected[0],
+        )
+        self.assertEqual(
+            StatusChange.epic_stats(self.epic, time=time).total_time,
+            timedelta(days=15),
+        )
+        rollup = list(DailyWorkTime.objects.values_list(
+            "day", "contributor", "epic", "status", "duration"
+        ).order_by("day", "contributor", "status"))
+        DailyWorkTime.rebuild()
+        self.assertEqual(
+            list(DailyWorkTime.objects.values_list(
+                "day", "contributor", "epic", "status", "duration"
+            ).order_by("day", "contributor", "status")),
+            rollup,
+        )
+
+    def test_analytics_totals(self):
+        time = datetime(2012, 3, 7, 16, 0, tzinfo=timezone.utc)
+        events = analytics.events_for(epic=self.epic)
+        self.assertEqual(len(events), 17)
+        self.assertEqual(
+            analytics.totals(events, now=time),
+            StatusChange.epic_stats(self.epic, time=time),
+        )
+        self.assertEqual(
+            analytics.totals_by_epic(events, now=time),
+            StatusChange.epic_stats_many([self.epic], time=time),
+        )
+
+    def test_analytics_microseconds(self):
+        change = StatusChange.objects.get(
+            story=self.us1,
+            new_status=StoryStatus.CREATED,
+        )
+        change.time += timedelta(microseconds=123)
+        change.duration -= timedelta(microseconds=123)
+        change.save()
+        events = analytics.events_for(epic=self.epic)
+        first = events.story.tolist().index(self.us1.pk)
+        self.assertEqual(
+            analytics.to_timedelta(events.time[first]),
+            change.time - analytics.EPOCH,
+        )
+        self.assertEqual(
+            analytics.to_timedelta(events.duration[first]),
+            change.duration,
+        )
+        self.assertEqual(events.duration[first + 2], -1)
+        self.assertEqual(
+            events.status[first],
+            analytics.STATUS_CODES[StoryStatus.CREATED],
+        )
+        self.assertEqual(
+            events.story_status[first],
+            analytics.STATUS_CODES[StoryStatus.FINISHED],
+        )
+
+    def test_analytics_story_metrics(self):
+        time = datetime(2012, 3, 7, 16, 0, tzinfo=timezone.utc)
+        metrics = analytics.story_metrics(
+            analytics.events_for(epic=self.epic),
+            now=time,
+        )
+        us1 = metrics.as_dict(self.us1.pk)
+        self.assertEqual(us1["lead_time"], timedelta(days=2))
+        self.assertEqual(us1["cycle_time"], timedelta(days=1))
+        us2 = metrics.as_dict(self.us2.pk)
+        self.assertIsNone(us2["lead_time"])
+        self.assertIsNone(us2["cycle_time"])
+        us4 = metrics.as_dict(self.us4.pk)
+        self.assertEqual(us4["lead_time"], timedelta(days=4))
+        self.assertEqual(us4["cycle_time"], timedelta(days=3))
+        self.assertEqual(
+            us4["time_in_status"][StoryStatus.IN_PROGRESS],
+            timedelta(days=2),
+        )
+        us5 = metrics.as_dict(self.us5.pk)
+        self.assertEqual(
+            us5["time_in_status"][StoryStatus.CREATED],
+            timedelta(days=4),
+        )
+        self.assertEqual(
+            sorted(metrics.cycle_times()),
+            [timedelta(days=1), timedelta(days=1), timedelta(days=3)],
+        )
+
+    def test_analytics_contributor_filter(self):
+        events = analytics.events_for(contributor=self.dev1)
+        self.assertEqual(
+            set(events.story.tolist()),
+            {self.us1.pk, self.us4.pk},
+        )
+
+    def test_analytics_throughput(self):
+        starts, counts = analytics.throughput_per_week(
+            analytics.events_for(epic=self.epic)
+        )
+        self.assertEqual(
+            [analytics.EPOCH + timedelta(microseconds=int(start))
+             for start in starts],
+            [datetime(2012, 3, 5, tzinfo=timezone.utc)],
+        )
+        self.assertEqual(counts.tolist(), [3])
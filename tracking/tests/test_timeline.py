@@ -0,0 +1,132 @@
+from datetime import datetime, timezone, timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from epics.models import Epic, UserStory, StoryStatus, Contributor
+
+from tracking.models import ArchivedStatusChange, StatusChange
+
+
+class StoryTimelineTestCase(TestCase):
+
+    def setUp(self):
+        self.po_user = User.objects.create(
+            username="po_test",
+            first_name="Product",
+            last_name="Owner",
+        )
+        self.product_owner = Contributor.objects.create(user=self.po_user)
+        self.epic = Epic.objects.create(
+            title="Test epic",
+            description="test epic",
+            owner=self.product_owner,
+        )
+        self.story = UserStory.objects.create(
+            epic=self.epic,
+            title="story",
+            description="a test story",
+        )
+        other_story = UserStory.objects.create(
+            epic=self.epic,
+            title="other story",
+            description="a test story",
+        )
+        start = datetime(2012, 3, 3, 14, 0, tzinfo=timezone.utc)
+        statuses = [StoryStatus.SUSPENDED, StoryStatus.CREATED] * 3
+        for story in (self.story, other_story):
+            for i, status in enumerate(statuses):
+                StatusChange.objects.create(
+                    story=story,
+                    # two changes share each time, the id breaks the tie
+                    time=start + timedelta(hours=i // 2),
+                    new_status=status,
+                    contributor=self.product_owner,
+                )
+        self.client = APIClient()
+        self.client.force_authenticate(self.po_user)
+
+    def url(self, story):
+        return f"/epics-api/stories/{story.pk}/timeline/"
+
+    def test_story_timeline(self):
+        timeline = StatusChange.story_timeline(self.story)
+        self.assertEqual(len(timeline), 6)
+        self.assertEqual(
+            list(timeline),
+            list(
+                StatusChange.objects
+                .filter(story=self.story)
+                .order_by("time", "id")
+            ),
+        )
+
+    def test_timeline_is_paginated_with_cursors(self):
+        expected = list(
+            StatusChange.objects
+            .filter(story=self.story)
+            .order_by("time", "id")
+            .values_list("id", flat=True)
+        )
+        seen = []
+        url = f"{self.url(self.story)}?page_size=4"
+        while url:
+            with self.assertNumQueries(2):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen += [event["id"] for event in response.data["results"]]
+            url = response.data["next"]
+        self.assertEqual(seen, expected)
+        event = response.data["results"][0]
+        self.assertEqual(
+            event["contributor"],
+            {
+                "id": self.product_owner.pk,
+                "username": "po_test",
+                "fullname": "Product Owner",
+            },
+        )
+        self.assertEqual(event["new_status"], StoryStatus.SUSPENDED)
+
+    def test_archived_story_timeline(self):
+        expected = list(
+            StatusChange.objects
+            .filter(story=self.story)
+            .order_by("time", "id")
+            .values_list("id", "new_status")
+        )
+        UserStory.objects.filter(pk=self.story.pk).update(
+            status=StoryStatus.CANCELED,
+        )
+        ArchivedStatusChange.archive_stories([self.story.pk])
+        self.assertFalse(StatusChange.objects.filter(story=self.story))
+        self.assertEqual(
+            [
+                (event.id, event.new_status)
+                for event in StatusChange.story_timeline(self.story)
+            ],
+            expected,
+        )
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url(self.story))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [
+                (event["id"], event["new_status"])
+                for event in response.data["results"]
+            ],
+            expected,
+        )
+        self.assertEqual(
+            response.data["results"][0]["contributor"]["username"],
+            "po_test",
+        )
+
+    def test_invalid_cursor(self):
+        response = self.client.get(f"{self.url(self.story)}?cursor=foo")
+        self.assertEqual(response.status_code, 404)
+
+    def test_unknown_story(self):
+        response = self.client.get("/epics-api/stories/0/timeline/")
+        self.assertEqual(response.status_code, 404)
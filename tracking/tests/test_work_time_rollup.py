@@ -0,0 +1,341 @@
+from datetime import date, datetime, timezone, timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from epics.models import Epic, UserStory, StoryStatus, Contributor
+
+from tracking.days import split_by_day
+from tracking.models import DailyWorkTime, StatusChange
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+class WorkTimeRollupTestCase(TestCase):
+
+    def setUp(self):
+        self.po_user = User.objects.create(username="po_test")
+        self.product_owner = Contributor.objects.create(user=self.po_user)
+        self.dev1_user = User.objects.create(username="dev1_test")
+        self.dev1 = Contributor.objects.create(user=self.dev1_user)
+        self.dev2_user = User.objects.create(username="dev2_test")
+        self.dev2 = Contributor.objects.create(user=self.dev2_user)
+        self.epic = Epic.objects.create(
+            title="Test epic",
+            description="test epic",
+            owner=self.product_owner,
+        )
+        us1 = UserStory.objects.create(
+            epic=self.epic,
+            title="story 1",
+            description="a test story",
+            status=StoryStatus.FINISHED,
+        )
+        us2 = UserStory.objects.create(
+            epic=self.epic,
+            title="story 2",
+            description="a test story",
+            status=StoryStatus.FINISHED,
+        )
+        for story, time, status, contributor, duration in [
+            (us1, utc(2012, 3, 4, 15, 30), StoryStatus.IN_PROGRESS,
+             self.dev2, timedelta(days=1)),
+            (us1, utc(2012, 3, 5, 15, 30), StoryStatus.FINISHED,
+             self.product_owner, None),
+            (us2, utc(2012, 3, 6, 15, 0), StoryStatus.IN_PROGRESS,
+             self.dev2, timedelta(hours=1)),
+            (us2, utc(2012, 3, 6, 16, 0), StoryStatus.IN_PROGRESS,
+             self.dev1, timedelta(hours=10)),
+            (us2, utc(2012, 3, 7, 2, 0), StoryStatus.FINISHED,
+             self.product_owner, None),
+        ]:
+            StatusChange.objects.create(
+                story=story,
+                time=time,
+                new_status=status,
+                contributor=contributor,
+                duration=duration,
+            )
+
+    def rollup(self):
+        return sorted(
+            DailyWorkTime.objects
+            .values_list("day", "contributor", "status", "duration")
+        )
+
+    def test_split_by_day(self):
+        self.assertEqual(
+            list(split_by_day(utc(2012, 3, 4, 15, 30), timedelta(days=1))),
+            [
+                (date(2012, 3, 4), timedelta(hours=8, minutes=30)),
+                (date(2012, 3, 5), timedelta(hours=15, minutes=30)),
+            ],
+        )
+
+    def test_intervals_are_split_at_midnight(self):
+        self.assertEqual(
+            self.rollup(),
+            [
+                (date(2012, 3, 4), self.dev2.pk, StoryStatus.IN_PROGRESS,
+                 timedelta(hours=8, minutes=30)),
+                (date(2012, 3, 5), self.dev2.pk, StoryStatus.IN_PROGRESS,
+                 timedelta(hours=15, minutes=30)),
+                (date(2012, 3, 6), self.dev1.pk, StoryStatus.IN_PROGRESS,
+                 timedelta(hours=8)),
+                (date(2012, 3, 6), self.dev2.pk, StoryStatus.IN_PROGRESS,
+                 timedelta(hours=1)),
+                (date(2012, 3, 7), self.dev1.pk, StoryStatus.IN_PROGRESS,
+                 timedelta(hours=2)),
+            ],
+        )
+
+    def test_period_contributor_time(self):
+        self.assertEqual(
+            StatusChange.period_contributor_time(
+                self.dev2, utc(2012, 3, 4), utc(2012, 3, 8)),
+            timedelta(days=1, hours=1),
+        )
+        self.assertEqual(
+            StatusChange.period_contributor_time(
+                self.dev2, utc(2012, 3, 5, 12), utc(2012, 3, 6, 15, 30)),
+            timedelta(hours=4),
+        )
+        self.assertEqual(
+            StatusChange.period_contributor_time(
+                self.dev1, utc(2012, 3, 5, 12), utc(2012, 3, 7, 1)),
+            timedelta(hours=9),
+        )
+        self.assertEqual(
+            StatusChange.period_contributor_time(
+                self.dev1, utc(2012, 3, 7, 12), utc(2012, 3, 9)),
+            timedelta(),
+        )
+
+    def test_period_counts_ongoing_work(self):
+        us = UserStory.objects.create(
+            epic=self.epic,
+            title="story 3",
+            description="a test story",
+            status=StoryStatus.IN_PROGRESS,
+        )
+        StatusChange.objects.create(
+            story=us,
+            time=utc(2012, 3, 8, 12),
+            new_status=StoryStatus.IN_PROGRESS,
+            contributor=self.dev1,
+        )
+        self.assertEqual(
+            StatusChange.period_contributor_time(
+                self.dev1, utc(2012, 3, 7, 12), utc(2012, 3, 10),
+                include_ongoing=True),
+            timedelta(days=1, hours=12),
+        )
+        # closed intervals only by default, like the other helpers
+        self.assertEqual(
+            StatusChange.period_contributor_time(
+                self.dev1, utc(2012, 3, 7, 12), utc(2012, 3, 10)),
+            timedelta(),
+        )
+        self.assertEqual(
+            StatusChange.team_time_report(
+                utc(2012, 3, 8), utc(2012, 3, 10), include_ongoing=True),
+            {self.dev1.pk: timedelta(hours=36)},
+        )
+        self.assertEqual(
+            StatusChange.team_time_report(utc(2012, 3, 8), utc(2012, 3, 10)),
+            {},
+        )
+        client = APIClient()
+        client.force_authenticate(self.po_user)
+        query = {
+            "start": "2012-03-08T00:00:00Z",
+            "end": "2012-03-10T00:00:00Z",
+        }
+        url = "/epics-api/reports/team-time/"
+        self.assertEqual(client.get(url, query).data, [])
+        response = client.get(url, {**query, "include_ongoing": "true"})
+        self.assertEqual(
+            [
+                (row["contributor"]["username"], row["work_time"])
+                for row in response.data
+            ],
+            [("dev1_test", "1 12:00:00")],
+        )
+
+    def test_team_time_report(self):
+        other_epic = Epic.objects.create(
+            title="Other epic",
+            description="test epic",
+            owner=self.product_owner,
+        )
+        us = UserStory.objects.create(
+            epic=other_epic,
+            title="story 3",
+            description="a test story",
+            status=StoryStatus.FINISHED,
+        )
+        StatusChange.objects.create(
+            story=us,
+            time=utc(2012, 3, 5, 22),
+            new_status=StoryStatus.IN_PROGRESS,
+            contributor=self.dev2,
+            duration=timedelta(hours=4),
+        )
+        start, end = utc(2012, 3, 5, 12), utc(2012, 3, 7, 1)
+        # the whole days, the start bounds of the edges and the events
+        with self.assertNumQueries(4):
+            report = StatusChange.team_time_report(start, end)
+        self.assertEqual(
+            report,
+            {
+                self.dev1.pk: timedelta(hours=9),
+                self.dev2.pk: timedelta(hours=8, minutes=30),
+            },
+        )
+        for contributor in (self.dev1, self.dev2):
+            self.assertEqual(
+                StatusChange.period_contributor_time(contributor, start, end),
+                report[contributor.pk],
+            )
+        self.assertEqual(
+            StatusChange.team_time_report(start, end, by_epic=True),
+            {
+                (self.dev1.pk, self.epic.pk): timedelta(hours=9),
+                (self.dev2.pk, self.epic.pk): timedelta(hours=4, minutes=30),
+                (self.dev2.pk, other_epic.pk): timedelta(hours=4),
+            },
+        )
+        self.assertEqual(
+            StatusChange.team_time_report(start, end, epic=other_epic),
+            {self.dev2.pk: timedelta(hours=4)},
+        )
+
+    def test_edges_read_back_to_the_full_days(self):
+        us = UserStory.objects.create(
+            epic=self.epic,
+            title="story 3",
+            description="a test story",
+            status=StoryStatus.FINISHED,
+        )
+        StatusChange.objects.create(
+            story=us,
+            time=utc(2012, 2, 27, 20),
+            new_status=StoryStatus.IN_PROGRESS,
+            contributor=self.dev1,
+            duration=timedelta(days=3),
+        )
+        self.assertEqual(
+            DailyWorkTime.earliest_starts(
+                [date(2012, 3, 1), date(2012, 3, 5), date(2012, 2, 29)],
+                DailyWorkTime.objects.filter(contributor=self.dev1),
+            ),
+            {
+                date(2012, 3, 5): utc(2012, 3, 4),
+                date(2012, 3, 1): utc(2012, 2, 27),
+                date(2012, 2, 29): utc(2012, 2, 27),
+            },
+        )
+        self.assertEqual(
+            StatusChange.period_contributor_time(
+                self.dev1, utc(2012, 3, 1, 12), utc(2012, 3, 1, 18)),
+            timedelta(hours=6),
+        )
+        self.assertEqual(
+            StatusChange.period_contributor_time(
+                self.dev1, utc(2012, 2, 29, 12), utc(2012, 3, 1, 21)),
+            timedelta(hours=32),
+        )
+
+    def test_team_report_edges_of_long_intervals(self):
+        us = UserStory.objects.create(
+            epic=self.epic,
+            title="story 3",
+            description="a test story",
+            status=StoryStatus.FINISHED,
+        )
+        StatusChange.objects.create(
+            story=us,
+            time=utc(2012, 3, 1, 20),
+            new_status=StoryStatus.IN_PROGRESS,
+            contributor=self.dev1,
+            duration=timedelta(days=3, hours=16),
+        )
+        # dev1 from the long interval up to 12:00 on the 5th, then as in
+        # setUp; dev2 from the start of the period as in setUp
+        self.assertEqual(
+            StatusChange.team_time_report(
+                utc(2012, 3, 4, 18), utc(2012, 3, 7, 1)),
+            {
+                self.dev1.pk: timedelta(hours=18 + 9),
+                self.dev2.pk: timedelta(hours=22, minutes=30),
+            },
+        )
+
+    def test_team_time_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.po_user)
+        response = client.get(
+            "/epics-api/reports/team-time/",
+            {
+                "start": "2012-03-04T00:00:00Z",
+                "end": "2012-03-08T00:00:00Z",
+                "by_epic": "true",
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [
+                (row["contributor"]["username"], row["work_time"],
+                 row["epics"])
+                for row in response.data
+            ],
+            [
+                ("dev1_test", "10:00:00",
+                 [{"epic": self.epic.pk, "work_time": "10:00:00"}]),
+                ("dev2_test", "1 01:00:00",
+                 [{"epic": self.epic.pk, "work_time": "1 01:00:00"}]),
+            ],
+        )
+        response = client.get(
+            "/epics-api/reports/team-time/",
+            {"start": "2012-03-08T00:00:00Z", "end": "2012-03-04T00:00:00Z"},
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_epic_contributor_time(self):
+        self.assertEqual(
+            StatusChange.epic_contributor_time(self.epic, self.dev1),
+            timedelta(hours=10),
+        )
+        self.assertEqual(
+            StatusChange.epic_contributor_time(self.epic, self.dev2),
+            timedelta(days=1, hours=1),
+        )
+
+    def test_workflow_rolls_up_closed_intervals(self):
+        us = self.product_owner.new_story(
+            epic=self.epic,
+            title="a new story",
+            description="a test story",
+        )
+        self.dev1.take(us)
+        self.product_owner.validate(us)
+        in_progress = StatusChange.objects.get(
+            story=us,
+            new_status=StoryStatus.IN_PROGRESS,
+        )
+        self.assertEqual(
+            StatusChange.epic_contributor_time(self.epic, self.dev1),
+            timedelta(hours=10) + in_progress.duration,
+        )
+
+    def test_rebuild_command(self):
+        expected = self.rollup()
+        DailyWorkTime.objects.update(duration=timedelta())
+        call_command("rebuild_work_time", stdout=StringIO())
+        self.assertEqual(self.rollup(), expected)
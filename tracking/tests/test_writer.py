@@ -0,0 +1,117 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from epics.models import Epic, UserStory, StoryStatus, Contributor
+
+from tracking.models import CurrentInterval, StatusChange
+from tracking.writer import StatusChangeWriter
+
+
+class StatusChangeWriterTestCase(TestCase):
+
+    def setUp(self):
+        self.po_user = User.objects.create(username="po_test")
+        self.product_owner = Contributor.objects.create(user=self.po_user)
+        self.dev1_user = User.objects.create(username="dev1_test")
+        self.dev1 = Contributor.objects.create(user=self.dev1_user)
+        self.epic = Epic.objects.create(
+            title="Test epic",
+            description="test epic",
+            owner=self.product_owner,
+        )
+        self.us1 = UserStory.objects.create(
+            epic=self.epic,
+            title="story 1",
+            description="a test story",
+        )
+        self.us2 = UserStory.objects.create(
+            epic=self.epic,
+            title="story 2",
+            description="a test story",
+        )
+
+    def record(self, writer, story, contributor, new_status):
+        with self.captureOnCommitCallbacks(execute=True):
+            writer.record_new_status(
+                UserStory,
+                contributor=contributor,
+                new_status=new_status,
+                story=story,
+            )
+
+    def assert_contiguous(self, story):
+        changes = list(StatusChange.objects.filter(story=story).order_by("time"))
+        for change, next_change in zip(changes, changes[1:]):
+            self.assertEqual(change.duration, next_change.time - change.time)
+        self.assertIsNone(changes[-1].duration)
+        self.assertEqual(
+            CurrentInterval.objects.get(story=story).change,
+            changes[-1],
+        )
+        return changes
+
+    def test_events_are_written_on_flush(self):
+        # the thread does not flush on its own during the test
+        writer = StatusChangeWriter(batch_size=100, flush_interval=60)
+        self.record(writer, self.us1, self.product_owner, StoryStatus.CREATED)
+        self.record(writer, self.us2, self.product_owner, StoryStatus.CREATED)
+        self.record(writer, self.us1, self.dev1, StoryStatus.IN_PROGRESS)
+        self.assertEqual(StatusChange.objects.count(), 0)
+        self.assertEqual(writer.flush(), 3)
+        self.assertEqual(StatusChange.objects.count(), 3)
+        changes = self.assert_contiguous(self.us1)
+        self.assertEqual(
+            [(change.new_status, change.contributor) for change in changes],
+            [
+                (StoryStatus.CREATED, self.product_owner),
+                (StoryStatus.IN_PROGRESS, self.dev1),
+            ],
+        )
+        self.record(writer, self.us1, self.product_owner, StoryStatus.FINISHED)
+        self.record(writer, self.us2, self.product_owner, StoryStatus.CANCELED)
+        writer.stop()
+        self.assertEqual(StatusChange.objects.count(), 5)
+        self.assert_contiguous(self.us1)
+        self.assert_contiguous(self.us2)
+
+    def test_thread_starts_with_the_first_event(self):
+        writer = StatusChangeWriter(flush_interval=60)
+        self.assertIsNone(writer._thread)
+        self.record(writer, self.us1, self.product_owner, StoryStatus.CREATED)
+        thread = writer._thread
+        self.assertTrue(thread.is_alive())
+        self.record(writer, self.us2, self.product_owner, StoryStatus.CREATED)
+        self.assertIs(writer._thread, thread)
+        self.assertEqual(StatusChange.objects.count(), 0)
+        writer.stop()
+        self.assertFalse(thread.is_alive())
+        self.assertIsNone(writer._thread)
+        self.assertEqual(StatusChange.objects.count(), 2)
+
+    def test_nothing_is_written_without_commit(self):
+        writer = StatusChangeWriter(synchronous=True)
+        writer.record_new_status(
+            UserStory,
+            contributor=self.dev1,
+            new_status=StoryStatus.IN_PROGRESS,
+            story=self.us1,
+        )
+        writer.flush()
+        self.assertEqual(StatusChange.objects.count(), 0)
+
+    def test_synchronous_writer(self):
+        writer = StatusChangeWriter(synchronous=True)
+        self.record(writer, self.us1, self.product_owner, StoryStatus.CREATED)
+        self.assertEqual(StatusChange.objects.count(), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            writer.record_new_statuses(
+                UserStory,
+                contributor=self.product_owner,
+                changes=[
+                    (self.us1.pk, StoryStatus.CANCELED),
+                    (self.us2.pk, StoryStatus.CREATED),
+                ],
+            )
+        self.assertEqual(StatusChange.objects.count(), 3)
+        self.assert_contiguous(self.us1)
+        self.assert_contiguous(self.us2)
@@ -0,0 +1,26 @@
+from django.urls import path
+
+from . import views
+
+urlpatterns = [
+    path(
+        "stories/<int:pk>/timeline/",
+        views.StoryTimelineView.as_view(),
+        name="story-timeline",
+    ),
+    path(
+        "epics/<int:pk>/cfd/",
+        views.CumulativeFlowView.as_view(),
+        name="epic-cfd",
+    ),
+    path(
+        "epics/<int:pk>/forecast/",
+        views.ForecastView.as_view(),
+        name="epic-forecast",
+    ),
+    path(
+        "reports/team-time/",
+        views.TeamTimeReportView.as_view(),
+        name="team-time-report",
+    ),
+]
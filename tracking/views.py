@@ -1,3 +1,140 @@
-from django.shortcuts import render
+from collections import defaultdict
+from datetime import timedelta
 
-# Create your views here.
+from django.db.models import Exists, OuterRef
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from rest_framework import generics, permissions, serializers, views
+from rest_framework.response import Response
+
+from epics.models import Contributor, Epic, UserStory
+from epics.pagination import KeysetPagination
+from .days import day_of
+from .forecast import cached_forecast
+from .models import ArchivedStatusChange, DailyEpicSnapshot, StatusChange
+from .serializers import (
+    ContributorWorkTimeSerializer,
+    CumulativeFlowDaySerializer,
+    CumulativeFlowQuerySerializer,
+    ForecastSerializer,
+    TeamTimeQuerySerializer,
+    TimelineEventSerializer,
+)
+
+
+class TimelinePagination(KeysetPagination):
+    ordering = ("time", "id")
+
+
+class StoryTimelineView(generics.ListAPIView):
+    """
+    API endpoint listing the status changes of a story in time order.
+    """
+    serializer_class = TimelineEventSerializer
+    pagination_class = TimelinePagination
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        story = get_object_or_404(
+            UserStory.objects.only("id").annotate(
+                archived=Exists(
+                    ArchivedStatusChange.objects.filter(story=OuterRef("pk"))
+                ),
+            ),
+            pk=self.kwargs["pk"],
+        )
+        return StatusChange.story_timeline(story, archived=story.archived)
+
+
+class CumulativeFlowView(views.APIView):
+    """
+    API endpoint giving the number of stories per status of an epic for
+    each day from `start` to `end` (the last 30 days by default).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    default_days = 30
+    max_days = 366
+
+    def get(self, request, pk):
+        epic = get_object_or_404(Epic.objects.only("id"), pk=pk)
+        query = CumulativeFlowQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        end = query.validated_data.get("end") or day_of(timezone.now())
+        start = query.validated_data.get("start") or (
+            end - timedelta(days=self.default_days - 1)
+        )
+        if start > end:
+            raise serializers.ValidationError("start is after end")
+        if (end - start).days >= self.max_days:
+            raise serializers.ValidationError(
+                f"at most {self.max_days} days can be requested"
+            )
+        days = DailyEpicSnapshot.cumulative_flow(epic, start, end)
+        return Response(CumulativeFlowDaySerializer(days, many=True).data)
+
+
+class TeamTimeReportView(views.APIView):
+    """
+    API endpoint giving the time spent working by each contributor between
+    `start` and `end`, optionally restricted to an `epic` and broken down
+    per epic with `by_epic`. Ongoing work counts up to now with
+    `include_ongoing`.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        query = TeamTimeQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        by_epic = query.validated_data["by_epic"]
+        report = StatusChange.team_time_report(
+            query.validated_data["start"],
+            query.validated_data["end"],
+            epic=query.validated_data.get("epic"),
+            by_epic=by_epic,
+            include_ongoing=query.validated_data["include_ongoing"],
+        )
+        work_times = defaultdict(timedelta)
+        epics = defaultdict(list)
+        for key, work_time in report.items():
+            if by_epic:
+                contributor_id, epic_id = key
+                epics[contributor_id].append(
+                    {"epic": epic_id, "work_time": work_time}
+                )
+            else:
+                contributor_id = key
+            work_times[contributor_id] += work_time
+        rows = []
+        for contributor in (
+            Contributor.objects
+            .filter(pk__in=work_times)
+            .select_related("user")
+            .order_by("user__username")
+        ):
+            row = {
+                "contributor": contributor,
+                "work_time": work_times[contributor.pk],
+            }
+            if by_epic:
+                row["epics"] = sorted(
+                    epics[contributor.pk],
+                    key=lambda epic: epic["epic"],
+                )
+            rows.append(row)
+        return Response(ContributorWorkTimeSerializer(rows, many=True).data)
+
+
+class ForecastView(views.APIView):
+    """
+    API endpoint giving the dates by which the open stories of an epic are
+    finished in 50, 85 and 95% of simulated futures, drawn from its past
+    weekly throughput.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk):
+        epic = get_object_or_404(
+            Epic.objects.select_related("counters"),
+            pk=pk,
+        )
+        return Response(ForecastSerializer(cached_forecast(epic)).data)
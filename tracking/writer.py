@@ -0,0 +1,135 @@
+"""
+Buffered status change writer.
+
+When `TRACKING_WRITER` is "buffered", status changes are not written by
+the `status_changed` receivers but queued once the transition's
+transaction commits, then written in batches by a background thread,
+either when `TRACKING_WRITER_BATCH_SIZE` events are waiting or every
+`TRACKING_WRITER_FLUSH_INTERVAL` seconds. Event times are taken when the
+status changes so durations are the ones the synchronous handlers would
+have recorded. The thread is started by the first queued event, so
+processes that never change a status (management commands, workers) do
+not run one, and the events still queued are written at exit.
+
+Events are kept in process memory: those still queued when the process is
+killed are lost, and stories changed concurrently by several processes
+within one flush interval can have their events written out of order.
+"""
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .handlers import write_status_changes
+
+
+logger = logging.getLogger(__name__)
+
+
+class StatusChangeWriter:
+
+    def __init__(self, batch_size=500, flush_interval=1.0, synchronous=False):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.synchronous = synchronous
+        self._pending = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._wake_up = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def record_new_status(self, sender, contributor, new_status, story,
+                          **kwargs):
+        self._record([(story.pk, new_status, contributor)])
+
+    def record_new_statuses(self, sender, contributor, changes, **kwargs):
+        self._record([
+            (story_id, new_status, contributor)
+            for story_id, new_status in changes
+        ])
+
+    def _record(self, changes):
+        now = timezone.now()
+        events = [
+            (story_id, new_status, contributor and contributor.pk, now)
+            for story_id, new_status, contributor in changes
+        ]
+        transaction.on_commit(lambda: self.enqueue(events))
+
+    def enqueue(self, events):
+        with self._lock:
+            self._pending.extend(events)
+            full = len(self._pending) >= self.batch_size
+        if self.synchronous:
+            self.flush()
+            return
+        self.start()
+        if full:
+            self._wake_up.set()
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                events, self._pending = self._pending, []
+            if events:
+                try:
+                    write_status_changes(events)
+                except Exception:
+                    with self._lock:
+                        self._pending[:0] = events
+                    raise
+            return len(events)
+
+    def start(self):
+        """
+        Start the background thread, and stop it at exit, unless running.
+        """
+        with self._start_lock:
+            if self.synchronous or self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._run,
+                name="status-change-writer",
+                daemon=True,
+            )
+            self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        """
+        Stop the background thread once every queued event is written.
+        """
+        with self._start_lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stopping.set()
+            self._wake_up.set()
+            thread.join()
+            self._stopping.clear()
+        self.flush()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wake_up.wait(self.flush_interval)
+            self._wake_up.clear()
+            if self._stopping.is_set():
+                # `stop` writes what is left
+                break
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("cannot write status changes, will retry")
+            finally:
+                close_old_connections()
+
+
+writer = StatusChangeWriter(
+    batch_size=getattr(settings, "TRACKING_WRITER_BATCH_SIZE", 500),
+    flush_interval=getattr(settings, "TRACKING_WRITER_FLUSH_INTERVAL", 1.0),
+    synchronous=getattr(settings, "TRACKING_WRITER_SYNCHRONOUS", False),
+)